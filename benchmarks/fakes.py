@@ -0,0 +1,144 @@
+"""
+Deterministic stand-ins for the paid / remote parts of the pipeline:
+
+- FakeLLM: returns prompt-derived output after a configurable latency.
+- FakeCrew: drop-in for crewai.Crew that answers with FakeLLM.
+- SMTPSink: a local SMTP server that accepts and counts every message.
+"""
+import hashlib
+import json
+import random
+import re
+import socketserver
+import threading
+import time
+
+from services.segments import NAME_PLACEHOLDER
+
+class FakeLLM:
+    """
+    Same prompt -> same output. Latency is latency +/- jitter seconds (seeded per
+    prompt, so runs are reproducible).
+    """
+
+    def __init__(self, latency=0.05, jitter=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def complete(self, prompt):
+        digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()
+        with self._lock:
+            self.calls += 1
+        delay = self.latency + random.Random(digest).uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        readers = re.findall(r"^\s*- (r\d+):", prompt, re.MULTILINE)
+        if readers and "JSON object" in prompt:
+            # Batched personalization: one intro per reader id
+            return json.dumps({r: f"<p>Dear {NAME_PLACEHOLDER},</p><p>Intro {r} ({digest[:8]})</p>" for r in readers})
+        if "MASTER DIGEST" in prompt:
+            # Personalization: keep the placeholder the real prompt asks for
+            return (f"<p>Dear {NAME_PLACEHOLDER},</p><p>Your brief ({digest[:8]}):</p>"
+                    + prompt.split("=== MASTER DIGEST ===", 1)[1][:2000])
+        headlines = re.findall(r"^\d+\. (.+?) \|", prompt, re.MULTILINE)
+        if headlines:
+            # Desk analysis: one bullet per story
+            return "\n".join(f"- {h}: impact assessed ({digest[:6]})" for h in headlines[:8])
+        # Editor: wrap whatever desk reports were appended
+        sections = re.findall(r"^=== (.+?) ===$", prompt, re.MULTILINE)
+        return "".join(f"<h2>{name}</h2><p>Summary {digest[:8]}</p>" for name in sections) or f"<p>{digest}</p>"
+
+class FakeCrew:
+    """
+    Accepts the same arguments as crewai.Crew; kickoff() runs every task through
+    the shared FakeLLM and returns the last output.
+    """
+    llm = FakeLLM()
+
+    def __init__(self, agents, tasks, process=None, verbose=False, **kwargs):
+        self.agents = agents
+        self.tasks = tasks
+
+    def kickoff(self):
+        # Prompts are reported where the real LLM reports them, for token accounting
+        from crew.llm import meter_prompt
+
+        output = ""
+        for agent, task in zip(self.agents, self.tasks):
+            prompt = f"{agent.role}\n{task.description}\n{output}"
+            meter_prompt(prompt)
+            output = self.llm.complete(prompt)
+        return output
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+    def handle(self):
+        self._reply("220 sink ESMTP ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("utf-8", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.wfile.write(b"250-sink\r\n250-AUTH PLAIN\r\n250 8BITMIME\r\n")
+            elif verb == "AUTH":
+                # Any credentials are accepted; PLAIN may come with or without an initial response
+                if len(command.split()) < 3:
+                    self._reply("334 ")
+                    self.rfile.readline()
+                self._reply("235 2.7.0 Authentication successful")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                for data_line in self.rfile:
+                    if data_line in (b".\r\n", b".\n"):
+                        break
+                    size += len(data_line)
+                self.server.record(size)
+                self._reply("250 2.0.0 Ok: queued")
+            elif verb == "QUIT":
+                self._reply("221 2.0.0 Bye")
+                return
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self._reply("250 2.0.0 Ok")
+            else:
+                self._reply("502 5.5.2 Command not recognized")
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """
+    Local SMTP server on 127.0.0.1 (random port) that accepts everything.
+    Use as a context manager; .messages and .bytes count what was received.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        super().__init__((host, port), _SMTPHandler)
+        self.messages = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def record(self, size):
+        with self._lock:
+            self.messages += 1
+            self.bytes += size
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="smtp-sink", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,114 @@
+"""
+Import-time benchmark for the CLI entry point.
+
+Runs the commands below under `python -X importtime`, reports the total and the
+slowest modules, and fails if:
+  - a lightweight command imports the LLM stack (crewai / litellm), or
+  - total import time regressed beyond the tolerance vs. the saved baseline.
+
+Usage:
+    python benchmarks/import_time.py            # compare against the baseline
+    python benchmarks/import_time.py --update   # record a new baseline
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "import_time_baseline.json")
+
+# name -> python arguments. Each is measured in a fresh interpreter.
+SCENARIOS = {
+    "import main": ["-c", "import main"],
+    "parse args": ["-c", "import main; main.parse_args(['fetch'])"],
+    "import fetcher": ["-c", "import services.news_fetcher"],
+    "import renderer": ["-c", "import services.renderer"],
+}
+
+# Modules that must never be loaded by the scenarios above
+FORBIDDEN = ("crewai", "litellm")
+
+def measure(args, repeat=3):
+    """
+    Returns (best total microseconds, {module: cumulative us}) over repeat runs.
+    """
+    best_total, best_modules = None, {}
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(args)} failed:\n{proc.stderr[-2000:]}")
+
+        modules = {}
+        total = 0
+        for line in proc.stderr.splitlines():
+            # "import time:  self [us] | cumulative | imported package"
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+            modules[name.strip()] = int(cumulative_us)
+            total += int(self_us)
+        if best_total is None or total < best_total:
+            best_total, best_modules = total, modules
+    return best_total, best_modules
+
+def load_baseline():
+    try:
+        with open(BASELINE_PATH, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--update", action="store_true", help="Write the measured totals as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed relative slowdown vs. baseline before failing (default 0.5 = +50%%).")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest modules to list per scenario.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the fastest is kept.")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline()
+    results = {}
+    failures = []
+
+    for scenario, scenario_args in SCENARIOS.items():
+        total, modules = measure(scenario_args, args.repeat)
+        results[scenario] = total
+        print(f"\n== {scenario}: {total / 1000:.1f} ms ({len(modules)} modules) ==")
+        top_level = {name: us for name, us in modules.items() if "." not in name}
+        for name, us in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {us / 1000:8.1f} ms  {name}")
+
+        leaked = sorted(name for name in modules if name.split(".")[0] in FORBIDDEN)
+        if leaked:
+            failures.append(f"{scenario}: imports the LLM stack ({', '.join(leaked[:5])})")
+
+        previous = baseline.get(scenario)
+        if previous:
+            change = (total - previous) / previous
+            print(f"  baseline {previous / 1000:.1f} ms ({change:+.0%})")
+            if change > args.tolerance:
+                failures.append(f"{scenario}: {total / 1000:.1f} ms vs baseline {previous / 1000:.1f} ms ({change:+.0%})")
+
+    if args.update:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {BASELINE_PATH}")
+        return 0
+
+    if failures:
+        print("\nREGRESSIONS:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nOK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,382 @@
+"""
+Offline end-to-end benchmark: no Google News, GNews, LLM provider or real SMTP.
+
+- Feeds are replayed from fixtures (synthetic by default, or recorded with --record).
+- Link checks answer "ok" after --link-latency seconds.
+- The crews run against FakeLLM (--llm-latency seconds per call); needs crewai
+  installed, otherwise research/personalization are skipped and delivery sends
+  the shared digest.
+- Mailer talks to a local SMTP sink.
+
+Reports throughput and latency for fetch (RSS and GNews), dedup, research,
+personalization and delivery at each size.
+
+Usage:
+    python benchmarks/offline_bench.py                          # 10..10k articles, 1..1000 recipients
+    python benchmarks/offline_bench.py --articles 100 --recipients 10 --llm-latency 0.2
+    python benchmarks/offline_bench.py --record                 # capture live feeds for config/topics.yaml
+    python benchmarks/offline_bench.py --source recorded        # replay them
+    python benchmarks/offline_bench.py --recipients 100 --batch-size 10  # batched personalization
+    python benchmarks/offline_bench.py --json bench.json
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import fixtures  # noqa: E402
+from fakes import FakeCrew, FakeLLM, SMTPSink  # noqa: E402
+
+FEED_SIZE = 100  # Google News returns up to ~100 items per query
+PROFILES = [
+    {"role": role, "interests": interests, "tone": tone}
+    for role, interests in [
+        ("CEO", ["strategy", "macro"]), ("COO", ["operations", "warehousing"]), ("CTO", ["automation", "AI"]),
+        ("Head of Policy", ["regulation", "infrastructure"]), ("HR Director", ["talent", "hiring"]),
+    ]
+    for tone in ("formal", "concise")
+]
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(math.ceil(q * len(values))) - 1)]
+
+def isolate(tmp):
+    """
+    Points every cache and output at a scratch directory.
+    """
+    os.environ.update({
+        "FEED_CACHE_PATH": "", "LINK_CACHE_PATH": "", "LLM_CACHE_PATH": "", "ARTICLE_HISTORY_PATH": "", "URL_RESOLVER_PATH": "",
+        "TEMPLATE_CACHE_DIR": os.path.join(tmp, "jinja"), "RUNS_DIR": os.path.join(tmp, "runs"),
+        "LLM_HEALTH_PATH": os.path.join(tmp, "llm_health.json"),
+        "OPENAI_API_KEY": "sk-offline-benchmark", "OPENAI_MODEL_NAME": "gpt-4o", "GNEWS_API_KEY": "offline",
+    })
+
+def reset_fetcher():
+    from services.news_fetcher import NewsFetcher
+    from services.title_index import TitleIndex
+
+    NewsFetcher._seen_urls = set()
+    NewsFetcher._seen_titles = set()
+    NewsFetcher._title_index = TitleIndex(0.85)
+    NewsFetcher._link_cache = None
+    NewsFetcher._feed_cache = None
+    NewsFetcher._article_history = None
+    NewsFetcher._url_resolver = None
+
+def synthetic_sections(total_articles):
+    """
+    Desk sections with enough keyword queries to produce total_articles feed items.
+    """
+    from services.article_store import section_queries
+
+    names = ["GLOBAL MACRO RADAR", "LOGISTICS TECH LAB", "GOVERNMENT & POLICY",
+             "GLOBAL BEST PRACTICES", "THE LOGISTICS TALENT BENCH"]
+    queries = max(1, math.ceil(total_articles / FEED_SIZE))
+    sections = [{"name": name, "keywords": []} for name in names]
+    for q in range(queries):
+        sections[q % len(sections)]["keywords"] += [f"{names[q % len(names)].split()[-1].lower()} {q} {k}" for k in "abc"]
+    sections = [s for s in sections if s["keywords"]]
+    plan = [query for section in sections for query in section_queries(section)]
+    sizes = {query: min(FEED_SIZE, total_articles - i * FEED_SIZE) for i, query in enumerate(plan)}
+    return sections, sizes
+
+def stage(report, name):
+    entry = report["stages"].get(name, {})
+    calls = entry.get("calls", 0)
+    return calls, entry.get("seconds", 0.0), entry.get("max_seconds", 0.0)
+
+def bench_fetch(total_articles, args, results, recorded_sections=None):
+    from services.news_fetcher import NewsFetcher
+    from services.metrics import reset_metrics
+
+    reset_fetcher()
+    fetcher = NewsFetcher()
+    if recorded_sections is not None:
+        from services.article_store import section_queries
+        sections = recorded_sections
+        payloads = {}
+        for section in sections:
+            for query in section_queries(section):
+                body = fixtures.load_recorded(query)
+                if body is None:
+                    sys.exit(f"No recorded feed for '{query}'. Run with --record first.")
+                payloads[fetcher._rss_url(query)] = body
+    else:
+        sections, sizes = synthetic_sections(total_articles)
+        payloads = {fetcher._rss_url(q): fixtures.make_rss(q, n, seed=args.seed) for q, n in sizes.items()}
+    feed_bytes = sum(len(body) for body in payloads.values())
+
+    def download(self, rss_url, headers=None):
+        return 200, payloads.get(rss_url), {"content-type": "application/rss+xml"}
+
+    class Response:
+        status_code = 200
+        headers = {"content-type": "application/rss+xml"}
+
+        def __init__(self, body):
+            self.body = body or b""
+
+        def iter_content(self, chunk_size):
+            for i in range(0, len(self.body), chunk_size):
+                yield self.body[i:i + chunk_size]
+
+        def raise_for_status(self):
+            pass
+
+        def close(self):
+            pass
+
+    class Session:
+        def get(self, url, **kwargs):
+            return Response(payloads.get(url))
+
+    def check_link(self, url, session=None):
+        if args.link_latency:
+            time.sleep(args.link_latency)
+        return True, url
+
+    quota = args.quota or FEED_SIZE
+    metrics = reset_metrics()
+    with patch.object(NewsFetcher, "_download_feed", download), \
+            patch.object(NewsFetcher, "_feed_session", Session()), \
+            patch.object(NewsFetcher, "_check_link", check_link), \
+            patch.object(NewsFetcher, "max_articles", quota):
+        started = time.perf_counter()
+        store = fetcher.build_article_store(sections)
+        elapsed = time.perf_counter() - started
+    report = metrics.report()
+
+    items = sum(body.count(b"<item>") for body in payloads.values())
+    # Streamed feeds are parsed while they are read ("fetch.stream"), buffered ones in one go
+    parse_calls, parse_seconds, parse_max = stage(report, "fetch.stream" if "fetch.stream" in report["stages"] else "fetch.parse")
+    results.append({
+        "scenario": "fetch (rss)", "size": total_articles if recorded_sections is None else "recorded",
+        "seconds": elapsed, "items": items, "kept": len(store), "feed_bytes": feed_bytes,
+        "throughput": items / elapsed if elapsed else 0.0, "unit": "items/s",
+        "latency_avg": parse_seconds / parse_calls if parse_calls else 0.0, "latency_max": parse_max,
+        "latency_of": "feed parse", "parsed": report["stages"].get("fetch.stream", {}).get("entries", items),
+    })
+    dedup_calls, dedup_seconds, dedup_max = stage(report, "fetch.dedup")
+    results.append({
+        "scenario": "dedup", "size": results[-1]["size"], "seconds": dedup_seconds, "items": items,
+        "throughput": items / dedup_seconds if dedup_seconds else 0.0, "unit": "items/s",
+        "latency_avg": dedup_seconds / dedup_calls if dedup_calls else 0.0, "latency_max": dedup_max,
+        "latency_of": "per feed",
+    })
+    return store
+
+def bench_gnews(total_articles, args, results):
+    from services.news_fetcher import NewsFetcher
+
+    class Response:
+        def __init__(self, data):
+            self._data = data
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return self._data
+
+    reset_fetcher()
+    _, sizes = synthetic_sections(total_articles)
+    payloads = {q: fixtures.make_gnews(q, n, seed=args.seed) for q, n in sizes.items()}
+    latencies = []
+
+    def get(url, params=None, **kwargs):
+        return Response(payloads[params["q"]])
+
+    def check_link(self, url, session=None):
+        if args.link_latency:
+            time.sleep(args.link_latency)
+        return True, url
+
+    fetcher = NewsFetcher()
+    kept = 0
+    with patch("services.news_fetcher.requests.get", get), patch.object(NewsFetcher, "_check_link", check_link):
+        started = time.perf_counter()
+        for query in payloads:
+            t0 = time.perf_counter()
+            kept += len(fetcher.fetch_news_gnews(query))
+            latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+    results.append({
+        "scenario": "fetch (gnews)", "size": total_articles, "seconds": elapsed, "items": total_articles, "kept": kept,
+        "throughput": total_articles / elapsed if elapsed else 0.0, "unit": "items/s",
+        "latency_avg": sum(latencies) / len(latencies), "latency_max": max(latencies), "latency_of": "per query",
+    })
+
+def crew_available():
+    try:
+        import crewai  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def bench_research(store, size, args, results):
+    from services.metrics import reset_metrics
+    import crew.crew as crew_module
+
+    FakeCrew.llm = FakeLLM(args.llm_latency, args.llm_jitter)
+    metrics = reset_metrics()
+    with patch.object(crew_module, "Crew", FakeCrew):
+        news_crew = crew_module.NewsCuratorCrew(use_cache=False)
+        started = time.perf_counter()
+        digest = news_crew._run_research_crews(store)
+        elapsed = time.perf_counter() - started
+    report = metrics.report()
+    desk_calls, desk_seconds, desk_max = stage(report, "llm.desk")
+    tokens = sum(entry.get("tokens_in", 0) for entry in report["stages"].values())
+    results.append({
+        "scenario": "research", "size": size, "seconds": elapsed, "items": len(store),
+        "throughput": len(store) / elapsed if elapsed else 0.0, "unit": "articles/s",
+        "latency_avg": desk_seconds / desk_calls if desk_calls else 0.0, "latency_max": desk_max,
+        "latency_of": "desk", "llm_calls": FakeCrew.llm.calls, "tokens_in": tokens,
+    })
+    return news_crew, digest
+
+def bench_delivery(recipient_count, digest, news_crew, args, results):
+    import main
+    from services.metrics import reset_metrics
+
+    recipients = [
+        {"name": f"Reader {i}", "email": f"reader{i}@example.com", **PROFILES[i % len(PROFILES)]}
+        for i in range(recipient_count)
+    ]
+    if news_crew is not None:
+        FakeCrew.llm = FakeLLM(args.llm_latency, args.llm_jitter)
+    metrics = reset_metrics()
+    with SMTPSink() as sink:
+        os.environ.update({
+            "SMTP_HOST": "127.0.0.1", "SMTP_PORT": str(sink.port), "SMTP_STARTTLS": "false",
+            "SMTP_USERNAME": "bench@example.com", "SMTP_PASSWORD": "offline",
+            "PERSONALIZE_BATCH_SIZE": str(args.batch_size),
+        })
+        context = patch("crew.crew.Crew", FakeCrew) if news_crew is not None else _nullcontext()
+        with context:
+            started = time.perf_counter()
+            outcomes = main.deliver(recipients, digest, news_crew)
+            elapsed = time.perf_counter() - started
+        delivered = sink.messages
+    report = metrics.report()
+
+    if news_crew is not None:
+        label, unit = ("llm.personalize_batch", "batch") if args.batch_size > 1 else ("llm.personalize", "segment")
+        calls, seconds, longest = stage(report, label)
+        results.append({
+            "scenario": "personalization" + (f" (batch {args.batch_size})" if args.batch_size > 1 else ""), "size": recipient_count, "seconds": seconds, "items": calls,
+            "throughput": calls / seconds if seconds else 0.0, "unit": f"{unit}s/s",
+            "latency_avg": seconds / calls if calls else 0.0, "latency_max": longest, "latency_of": unit,
+        })
+    latencies = [o["elapsed"] for o in outcomes]
+    results.append({
+        "scenario": "delivery", "size": recipient_count, "seconds": elapsed, "items": recipient_count,
+        "sent": sum(1 for o in outcomes if o["sent"]), "received": delivered,
+        "throughput": recipient_count / elapsed if elapsed else 0.0, "unit": "recipients/s",
+        "latency_avg": sum(latencies) / len(latencies), "latency_p50": percentile(latencies, 0.5),
+        "latency_p95": percentile(latencies, 0.95), "latency_max": max(latencies), "latency_of": "recipient",
+    })
+
+class _nullcontext:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+def print_table(results):
+    header = ["scenario", "size", "seconds", "throughput", "latency avg", "p95", "max", "(latency of)", "parsed/kept"]
+    rows = [header]
+    for r in results:
+        rows.append([
+            r["scenario"], str(r["size"]), f"{r['seconds']:.3f}", f"{r['throughput']:,.1f} {r['unit']}",
+            f"{r['latency_avg'] * 1000:.1f} ms", f"{r['latency_p95'] * 1000:.1f} ms" if "latency_p95" in r else "-",
+            f"{r['latency_max'] * 1000:.1f} ms", r["latency_of"],
+            f"{r['parsed']}/{r['kept']}" if "parsed" in r else "-",
+        ])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    for i, row in enumerate(rows):
+        print("  ".join(cell.ljust(w) for cell, w in zip(row, widths)))
+        if i == 0:
+            print("-" * (sum(widths) + 2 * (len(widths) - 1)))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--recipients", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--source", choices=["synthetic", "recorded"], default="synthetic")
+    parser.add_argument("--record", action="store_true", help="Download live feeds for config/topics.yaml into benchmarks/fixtures/rss.")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per fake LLM call.")
+    parser.add_argument("--llm-jitter", type=float, default=0.0)
+    parser.add_argument("--link-latency", type=float, default=0.0, help="Seconds per fake link check.")
+    parser.add_argument("--quota", type=int, default=None, help="Articles kept per query (default: the whole feed).")
+    parser.add_argument("--buffered", action="store_true", help="Download and parse whole feeds instead of streaming them.")
+    parser.add_argument("--batch-size", type=int, default=0,
+                        help="Personalize this many profiles per LLM call (PERSONALIZE_BATCH_SIZE).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args(argv)
+
+    import yaml
+    topics = yaml.safe_load(open("config/topics.yaml"))["topics"]
+    if args.record:
+        from services.article_store import section_queries
+        from services.news_fetcher import NewsFetcher
+        queries = [query for section in topics for query in section_queries(section)]
+        saved = fixtures.record(queries, NewsFetcher()._rss_url)
+        print(f"Recorded {saved} feeds into {os.path.join(fixtures.FIXTURE_DIR, 'rss')}")
+        return 0
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate(tmp)
+        os.environ["FEED_STREAMING"] = "false" if args.buffered else "true"
+        logging.disable(logging.WARNING)
+        has_crew = crew_available()
+        if not has_crew:
+            print("crewai is not installed: skipping research/personalization, delivery sends the shared digest.\n")
+
+        sizes = ["recorded"] if args.source == "recorded" else args.articles
+        stores = {}
+        for size in sizes:
+            store = bench_fetch(size, args, results, recorded_sections=topics if size == "recorded" else None)
+            stores[size] = store
+            if size != "recorded":
+                bench_gnews(size, args, results)
+
+        # Research on each store; delivery reuses the digest of the smallest one
+        digest, news_crew = None, None
+        for size in sizes:
+            if has_crew:
+                crew_for_size, digest_for_size = bench_research(stores[size], size, args, results)
+                if digest is None:
+                    news_crew, digest = crew_for_size, digest_for_size
+        if digest is None:
+            from services.digest_renderer import render_store_digest
+            from services.segments import NAME_PLACEHOLDER
+            digest = render_store_digest(stores[sizes[0]], greeting_name=NAME_PLACEHOLDER)
+
+        for count in args.recipients:
+            bench_delivery(count, digest, news_crew, args, results)
+        logging.disable(logging.NOTSET)
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2, default=str)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
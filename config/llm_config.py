@@ -1,96 +1,256 @@
 import os
+import json
+import time
+import threading
 import logging
-from litellm import completion
+import requests
+from services.llm_scheduler import LLMScheduler
 
 logger = logging.getLogger(__name__)
 
-def configure_llm():
+# Provider chain, in fallback order. rpm / tpm are the default rate limits
+# (entry-level tiers; 0 = unlimited), overridable with e.g. GEMINI_RPM / GEMINI_TPM.
+PROVIDERS = [
+    {
+        "name": "gemini",
+        "model": "gemini/gemini-1.5-flash",
+        "key_env": "GEMINI_API_KEY",
+        "rpm": 15,
+        "tpm": 1_000_000,
+    },
+    {
+        "name": "openai",
+        "model": "gpt-4o",
+        "key_env": "OPENAI_API_KEY",
+        "rpm": 500,
+        "tpm": 30_000,
+    },
+    {
+        "name": "openrouter",
+        "model": "openrouter/mistralai/mistral-7b-instruct:free",
+        "key_env": "OPENROUTER_API_KEY",
+        "rpm": 20,
+        "tpm": 0,
+    },
+]
+
+# litellm / openai exception names that mean "this provider is unusable right now"
+PROVIDER_ERRORS = {
+    "RateLimitError", "AuthenticationError", "PermissionDeniedError", "NotFoundError",
+    "APIConnectionError", "ServiceUnavailableError", "InternalServerError", "Timeout", "APITimeoutError",
+}
+
+def is_provider_error(error):
+    return any(cls.__name__ in PROVIDER_ERRORS for cls in type(error).__mro__)
+
+class ProviderRegistry:
     """
-    Configures the LLM provider with 3-step fallback logic:
-    1. Try Gemini (gemini/gemini-1.5-flash) using GEMINI_API_KEY.
-    2. Fallback to OpenAI (gpt-4o) using OPENAI_API_KEY.
-    3. Fallback to OpenRouter (mistralai/mistral-7b-instruct:free).
-    
-    Sets the necessary environment variables for CrewAI to pick up the winner.
+    Picks the LLM provider without making billable completion calls.
+
+    The last known-good provider and recent failure timestamps are kept on disk.
+    Selection prefers the last good provider, skips providers that failed within
+    the cooldown, and verifies candidates with cheap, free checks (model lookup /
+    key info). Quota or rate-limit problems that only show up on a real request
+    are handled lazily: the crew calls failover() and the next provider is used.
     """
-    gemini_key = os.getenv("GEMINI_API_KEY")
-    openai_key = os.getenv("OPENAI_API_KEY")
-    openrouter_key = os.getenv("OPENROUTER_API_KEY")
-    openrouter_base = os.getenv("OPENROUTER_API_BASE")
-    
-    # 1. Try Gemini (Primary)
-    if gemini_key:
-        logger.info("Attempting to connect to Gemini (gemini/gemini-1.5-flash)...")
+
+    def __init__(self, state_path, cooldown=6 * 3600, trust_window=3600):
+        self.state_path = state_path
+        self.cooldown = cooldown
+        self.trust_window = trust_window
+        self.current = None
+        self._keys = {p["name"]: os.getenv(p["key_env"]) for p in PROVIDERS}
+        self._openrouter_base = os.getenv("OPENROUTER_API_BASE")
+        self._lock = threading.Lock()
+        self.state = self._load_state()
+        for p in PROVIDERS:
+            if not self._keys[p["name"]]:
+                logger.warning(f"{p['key_env']} not found.")
+
+    def _load_state(self):
         try:
-            # Litellm format for Gemini is usually gemini/model-name
-            # We pass custom_llm_provider="gemini" explicitly to avoid "Provider NOT provided" errors
-            # And we MUST use the model name without prefix when provider is explicit
-            response = completion(
-                model="gemini-1.5-flash",
-                custom_llm_provider="gemini",
-                messages=[{"role": "user", "content": "Hello"}],
-                api_key=gemini_key
-            )
-            logger.info("Successfully connected to Gemini.")
-            
-            # Set env vars for CrewAI
-            os.environ["GEMINI_API_KEY"] = gemini_key
-            os.environ["OPENAI_MODEL_NAME"] = "gemini/gemini-1.5-flash"
-            
-            # Clear OpenAI specific vars to avoid confusion if they exist
-            if "OPENAI_API_BASE" in os.environ:
-                del os.environ["OPENAI_API_BASE"]
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"last_good": None, "last_good_at": 0, "failures": {}}
+
+    def _save_state(self):
+        if not self.state_path:
             return
-        except Exception as e:
-            logger.warning(f"Failed to connect to Gemini: {e}")
-    else:
-        logger.warning("GEMINI_API_KEY not found.")
-
-    # 2. Try OpenAI (Fallback 1)
-    if openai_key:
-        logger.info("Falling back to OpenAI (gpt-4o)...")
         try:
-            response = completion(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": "Hello"}],
-                api_key=openai_key
+            if os.path.dirname(self.state_path):
+                os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            with open(self.state_path, 'w') as f:
+                json.dump(self.state, f, indent=2)
+        except OSError as e:
+            logger.warning(f"Could not save LLM provider state: {e}")
+
+    def _recently_failed(self, name):
+        failures = self.state["failures"].get(name, [])
+        return bool(failures) and time.time() - failures[-1] < self.cooldown
+
+    def _record_failure(self, name):
+        failures = self.state["failures"].setdefault(name, [])
+        failures.append(time.time())
+        del failures[:-10]
+        if self.state.get("last_good") == name:
+            self.state["last_good"] = None
+        self._save_state()
+
+    def _record_success(self, name):
+        self.state["last_good"] = name
+        self.state["last_good_at"] = time.time()
+        self.state["failures"].pop(name, None)
+        self._save_state()
+
+    def _check(self, provider):
+        """
+        Cheap, non-billable connectivity/key check for a provider.
+        """
+        key = self._keys[provider["name"]]
+        if provider["name"] == "gemini":
+            model = provider["model"].split("/", 1)[1]
+            response = requests.get(
+                f"https://generativelanguage.googleapis.com/v1beta/models/{model}",
+                params={"key": key}, timeout=5
+            )
+        elif provider["name"] == "openai":
+            response = requests.get(
+                f"https://api.openai.com/v1/models/{provider['model']}",
+                headers={"Authorization": f"Bearer {key}"}, timeout=5
             )
-            logger.info("Successfully connected to OpenAI.")
-            # Ensure env vars are set for CrewAI
-            os.environ["OPENAI_API_KEY"] = openai_key
-            os.environ["OPENAI_MODEL_NAME"] = "gpt-4o"
+        else:
+            base = (self._openrouter_base or "https://openrouter.ai/api/v1").rstrip("/")
+            response = requests.get(f"{base}/auth/key", headers={"Authorization": f"Bearer {key}"}, timeout=5)
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+    def _activate(self, provider):
+        """
+        Sets the environment variables CrewAI picks the model up from.
+        """
+        key = self._keys[provider["name"]]
+        if provider["name"] == "openrouter":
+            os.environ["OPENAI_API_KEY"] = key
+            if self._openrouter_base:
+                os.environ["OPENAI_API_BASE"] = self._openrouter_base
+        else:
+            os.environ[provider["key_env"]] = key
+            # Clear OpenAI specific vars to avoid confusion if they exist
             if "OPENAI_API_BASE" in os.environ:
                 del os.environ["OPENAI_API_BASE"]
-            return
-        except Exception as e:
-            logger.warning(f"Failed to connect to OpenAI: {e}")
-    else:
-        logger.warning("OPENAI_API_KEY not found.")
-
-    # 3. Try OpenRouter (Fallback 2)
-    if openrouter_key:
-        logger.info("Falling back to OpenRouter (openrouter/mistralai/mistral-7b-instruct:free)...")
-        try:
-            response = completion(
-                model="openrouter/mistralai/mistral-7b-instruct:free",
-                messages=[{"role": "user", "content": "Hello"}],
-                api_key=openrouter_key,
-                api_base=openrouter_base
-            )
-            logger.info("Successfully connected to OpenRouter.")
-            
-            # Set env vars for CrewAI to use this provider
-            os.environ["OPENAI_API_KEY"] = openrouter_key
-            os.environ["OPENAI_API_BASE"] = openrouter_base
-            os.environ["OPENAI_MODEL_NAME"] = "openrouter/mistralai/mistral-7b-instruct:free"
-            return
-        except Exception as e:
-             logger.error(f"Failed to connect to OpenRouter: {e}")
-    else:
-        logger.warning("OPENROUTER_API_KEY not found.")
-
-    # 4. Exit if all failed
-    # 4. Exit if all failed -> NOW JUST LOG AND RETURN
-    logger.critical("All LLM providers failed. Continuing in OFFLINE/FALLBACK mode.")
-    # raise SystemExit("Fatal Error: Could not connect to any LLM provider.")
-    return
+        os.environ["OPENAI_MODEL_NAME"] = provider["model"]
+        self.current = provider["name"]
+
+    def _candidates(self, exclude=()):
+        available = [p for p in PROVIDERS if self._keys[p["name"]] and p["name"] not in exclude]
+        last_good = self.state.get("last_good")
+        # Last known-good provider first, then the normal chain order
+        available.sort(key=lambda p: p["name"] != last_good)
+        fresh = [p for p in available if not self._recently_failed(p["name"])]
+        # If everything failed recently, still try them rather than giving up
+        return fresh or available
+
+    def select(self, exclude=()):
+        """
+        Activates the first healthy provider. Returns its name, or None.
+        """
+        with self._lock:
+            for provider in self._candidates(exclude):
+                name = provider["name"]
+                trusted = (name == self.state.get("last_good")
+                           and time.time() - self.state.get("last_good_at", 0) < self.trust_window)
+                if not trusted:
+                    try:
+                        self._check(provider)
+                    except Exception as e:
+                        logger.warning(f"Provider check failed for {name}: {e}")
+                        self._record_failure(name)
+                        continue
+                self._activate(provider)
+                if not trusted:
+                    # Only a real check renews the trust window
+                    self._record_success(name)
+                logger.info(f"Using LLM provider {name} ({provider['model']})" + (" [cached]" if trusted else ""))
+                return name
+
+            logger.critical("All LLM providers failed. Continuing in OFFLINE/FALLBACK mode.")
+            self.current = None
+            return None
+
+    def failover(self, error=None, failed=None):
+        """
+        Marks the provider a request was sent to (failed, default: current) as failed
+        after a real request error and switches to the next one.
+        Returns True if a different provider is now active.
+        """
+        if error is not None and not is_provider_error(error):
+            return False
+        failed = failed or self.current
+        if failed is None:
+            return False
+        with self._lock:
+            if self.current != failed:
+                # Another thread already failed over from this provider
+                return self.current is not None
+            logger.warning(f"LLM provider {failed} failed during the run: {error}. Failing over.")
+            self._record_failure(failed)
+        return self.select(exclude=(failed,)) is not None
+
+_registry = None
+_scheduler = None
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        _registry = ProviderRegistry(os.getenv("LLM_HEALTH_PATH", ".cache/llm_health.json"))
+    return _registry
+
+def get_scheduler():
+    """
+    Returns the process-wide LLM call scheduler, with per-provider limits from
+    PROVIDERS and the <PROVIDER>_RPM / <PROVIDER>_TPM environment variables.
+    """
+    global _scheduler
+    if _scheduler is None:
+        limits = {
+            p["name"]: {
+                "rpm": int(os.getenv(f"{p['name'].upper()}_RPM", p["rpm"])),
+                "tpm": int(os.getenv(f"{p['name'].upper()}_TPM", p["tpm"])),
+            }
+            for p in PROVIDERS
+        }
+        _scheduler = LLMScheduler(limits, max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")))
+    return _scheduler
+
+def configure_llm():
+    """
+    Configures the LLM provider with 3-step fallback logic:
+    1. Gemini (gemini/gemini-1.5-flash) using GEMINI_API_KEY.
+    2. OpenAI (gpt-4o) using OPENAI_API_KEY.
+    3. OpenRouter (mistralai/mistral-7b-instruct:free).
+
+    Uses cheap key/model checks and the cached last known-good provider instead of
+    live completions. Sets the necessary environment variables for CrewAI to pick up
+    the winner. If none is usable, logs and continues in OFFLINE/FALLBACK mode.
+    """
+    return get_registry().select()
+
+def current_provider():
+    return get_registry().current
+
+def failover_llm(error=None, failed=None):
+    """
+    Switches to the next provider after a real failure during the crew run.
+    """
+    return get_registry().failover(error, failed)
+
+def current_llm_settings():
+    """
+    Returns the model/key/base URL of the active provider for building LLM clients.
+    """
+    return {
+        "model": os.getenv("OPENAI_MODEL_NAME"),
+        "api_key": os.getenv("OPENAI_API_KEY") if get_registry().current != "gemini" else os.getenv("GEMINI_API_KEY"),
+        "base_url": os.getenv("OPENAI_API_BASE"),
+    }
@@ -1,31 +1,6 @@
 from crewai import Agent
-from crewai.tools import BaseTool
-from services.news_fetcher import NewsFetcher
-
-# Keep the same tool
-class NewsSearchTool(BaseTool):
-    name: str = "News Search Tool"
-    description: str = "Search for news articles by topic."
-
-    def _run(self, topic: str) -> str:
-        fetcher = NewsFetcher()
-        articles = fetcher.fetch_news(topic)
-        output = f"Reference News for topic '{topic}':\n\n"
-        for i, art in enumerate(articles, 1):
-            output += f"{i}. TITLE: {art['title']}\n   SOURCE: {art['source']} ({art['date']})\n   URL: {art['url']}\n   CONTENT: {art['content']}\n\n"
-        return output
 
 class LogisticsCrewAgents:
-    def research_agent(self):
-        return Agent(
-            role='Logistics Intelligence Researcher',
-            goal='Fetch high-signal news across 5 mandatory categories: Macro, Tech, Policy, Best Practices, Talent.',
-            backstory='You are an elite research analyst for the global logistics industry. You know exactly where to look for high-impact updates.',
-            tools=[NewsSearchTool()],
-            verbose=True,
-            memory=True
-        )
-
     def editor_agent(self):
         return Agent(
             role='Chief Intelligence Editor',
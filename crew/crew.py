@@ -1,84 +1,212 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from crewai import Crew, Process
 from crew.agents import LogisticsCrewAgents
 from crew.tasks import LogisticsCrewTasks
+from crew.llm import scheduled_llm, metered_prompts
+from services.news_fetcher import NewsFetcher
+from services.llm_cache import LLMCache
+from services.token_budget import TokenBudget, count_tokens
+from services.metrics import get_metrics
+from services.digest_renderer import render_digest
+from services.run_store import RunStore
+from services.segments import parse_intros
+from services.compose_stream import strip_fences
+
+logger = logging.getLogger(__name__)
 
 class NewsCuratorCrew:
-    def __init__(self):
+    def __init__(self, desk_concurrency=None, use_cache=True, run_store=None):
         self.agents = LogisticsCrewAgents()
         self.tasks = LogisticsCrewTasks()
+        # Shared by every agent so all calls go through the rate-limited scheduler;
+        # created once, before any desk thread starts. None when no provider is active.
+        self.llm = scheduled_llm()
+        # Optional stage checkpoints (articles, desk analyses) for resumable runs
+        self.run_store = run_store
+        # Max analysis desks running at once (keep under provider rate limits)
+        self.desk_concurrency = max(1, desk_concurrency or int(os.getenv("DESK_CONCURRENCY", "5")))
 
-    def run_research_phase(self, topics):
-        # Agents
-        researcher = self.agents.research_agent()
-        macro_agent = self.agents.macro_impact_agent()
-        tech_agent = self.agents.tech_signal_agent()
-        policy_agent = self.agents.infra_policy_agent()
-        practice_agent = self.agents.best_practices_agent()
-        talent_agent = self.agents.talent_insights_agent()
-        editor_agent = self.agents.editor_agent()
-        
-        # Tasks
-        fetch_task = self.tasks.fetch_news_task(researcher, topics)
-        
-        macro_task = self.tasks.analyze_macro_task(macro_agent, context=[fetch_task])
-        tech_task = self.tasks.analyze_tech_task(tech_agent, context=[fetch_task])
-        policy_task = self.tasks.analyze_policy_task(policy_agent, context=[fetch_task])
-        practice_task = self.tasks.analyze_best_practices_task(practice_agent, context=[fetch_task])
-        talent_task = self.tasks.analyze_talent_task(talent_agent, context=[fetch_task])
-        
-        compile_task = self.tasks.compile_newsletter_task(
-            editor_agent, 
-            context=[macro_task, tech_task, policy_task, practice_task, talent_task],
-            recipients=[] 
-        )
+        # Content-addressed cache of crew outputs, so reruns replay identical LLM work
+        self.cache = None
+        cache_path = os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite")
+        if use_cache and cache_path:
+            self.cache = LLMCache(
+                cache_path,
+                ttl=float(os.getenv("LLM_CACHE_TTL_HOURS", "24")) * 3600,
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "500"))
+            )
 
-        crew = Crew(
-            agents=[researcher, macro_agent, tech_agent, policy_agent, practice_agent, talent_agent, editor_agent],
-            tasks=[fetch_task, macro_task, tech_task, policy_task, practice_task, talent_task, compile_task],
-            process=Process.sequential, 
-            verbose=True
+        # Token accounting and per-task input budgets
+        self.budget = TokenBudget(
+            budgets={
+                task: int(os.getenv(f"TOKEN_BUDGET_{task.upper()}", default))
+                for task, default in TokenBudget.DEFAULT_BUDGETS.items()
+            },
+            model=os.getenv("OPENAI_MODEL_NAME")
         )
 
+    def run_research_phase(self, topics):
+        """
+        Returns (master digest, fallback). fallback is True when the LLM research
+        failed and the digest is the GNews/offline one, which should not be
+        checkpointed so a resumed run retries the research.
+        """
+        store = None
         try:
-            result = crew.kickoff()
-            return result
+            store = self.run_store.load_articles() if self.run_store is not None else None
+            if store is None:
+                store = NewsFetcher().build_article_store(topics)
+                if self.run_store is not None:
+                    self.run_store.save_articles(store)
+            if self.llm is None:
+                raise RuntimeError("no LLM provider is active")
+            return self._run_research_crews(store), False
         except Exception as e:
-            import logging
-            from services.news_fetcher import NewsFetcher
-            
-            logger = logging.getLogger(__name__)
             logger.error(f"LLM Crew Execution Failed: {e}. Initiating GNews Fallback.")
-            
-            fetcher = NewsFetcher()
-            fallback_digest = "<h3>OFFLINE MODE - GNEWS FALLBACK</h3><br>"
-            
-            try:
-                for topic_data in topics:
-                    if isinstance(topic_data, dict):
-                        topic_name = topic_data.get('name', 'Unknown')
-                        keywords = topic_data.get('keywords', [])
-                        # Construct a better query using top 3 keywords
-                        search_query = " OR ".join(keywords[:3]) if keywords else topic_name
-                    else:
-                        topic_name = str(topic_data)
-                        search_query = topic_name
-                        
-                    fallback_digest += f"<h4>Topic: {topic_name}</h4><ul>"
-                    # Use the constructed query for fetching
-                    articles = fetcher.fetch_news(search_query, lookback_hours=168)
-                    
-                    if not articles:
-                        fallback_digest += "<li>No recent news found.</li>"
-                    
-                    for article in articles:
-                        fallback_digest += f"<li><a href='{article['url']}'>{article['title']}</a> - {article['source']} ({article['date']})<br>{article['content']}</li>"
-                    
-                    fallback_digest += "</ul><br>"
-                
-                return fallback_digest
-            except Exception as fallback_error:
-                logger.error(f"Fallback also failed: {fallback_error}")
-                return "<h2>System Offline</h2><p>Unable to generate newsletter due to multiple failures.</p>"
+            return self._gnews_fallback(topics, store), True
+
+    def _cache_key(self, agents, tasks):
+        model = os.getenv("OPENAI_MODEL_NAME", "")
+        parts = [agent.role for agent in agents]
+        parts += [f"{task.description}\n{task.expected_output}" for task in tasks]
+        return LLMCache.make_key(model, *parts)
+
+    def _kickoff(self, agents, tasks, label):
+        """
+        Runs a crew, replaying a cached output when the model and prompts are identical.
+        Prompts are measured under label as the LLM sends them, so crewai's system
+        prompt and the context handed from one task to the next are counted too.
+        """
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(agents, tasks)
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"LLM cache hit for {agents[-1].role}, replaying stored output")
+                get_metrics().add(f"llm.{label}", cache_hits=1)
+                return cached
+
+        with get_metrics().stage(f"llm.{label}") as record:
+            # Rate limits, retries and provider failover happen per call inside the LLM
+            self._bind_llm(agents)
+            crew = Crew(
+                agents=agents,
+                tasks=tasks,
+                process=Process.sequential,
+                verbose=True
+            )
+            sent = []
+            with metered_prompts(lambda prompt: sent.append(self.budget.measure(label, prompt))):
+                output = str(crew.kickoff())
+            record["tokens_in"] = sum(sent)
+
+            record["tokens_out"] = count_tokens(output, self.budget.model)
+            record["cost_usd"] = self._estimate_cost(record["tokens_in"], record["tokens_out"])
+
+        if key is not None:
+            # Keyed by the model that actually produced the output
+            self.cache.put(self._cache_key(agents, tasks), output, model=os.getenv("OPENAI_MODEL_NAME"))
+        return output
+
+    @staticmethod
+    def _estimate_cost(tokens_in, tokens_out):
+        """
+        Rough USD cost of a call from litellm's price table (0 if the model is unknown).
+        """
+        try:
+            import litellm
+            prompt_cost, completion_cost = litellm.cost_per_token(
+                model=os.getenv("OPENAI_MODEL_NAME", ""), prompt_tokens=tokens_in, completion_tokens=tokens_out
+            )
+            return prompt_cost + completion_cost
+        except Exception:
+            return 0.0
+
+    def _bind_llm(self, agents):
+        if self.llm is None:
+            raise RuntimeError("no LLM provider is active")
+        for agent in agents:
+            agent.llm = self.llm
+
+    def _run_desk(self, name, agent_factory, task_factory, section_news):
+        if self.run_store is not None:
+            saved = self.run_store.read_text(RunStore.desk_name(name))
+            if saved is not None:
+                logger.info(f"Desk {name}: using checkpointed analysis")
+                return saved
+
+        agent = agent_factory()
+        task = task_factory(agent, context=None)
+        section_news = self.budget.fit("desk", section_news)
+        task.description += f"\n\n=== RAW NEWS: {name} ===\n{section_news}\n================"
+        logger.info(f"Desk started: {name}")
+        output = self._kickoff([agent], [task], "desk")
+        logger.info(f"Desk finished: {name}")
+        if self.run_store is not None:
+            self.run_store.write_text(RunStore.desk_name(name), output)
+        return output
+
+    def _run_research_crews(self, store):
+        """
+        Article store -> five analysis desks (in parallel) -> editor.
+        Each desk only gets the compact records routed to its section. The desks are
+        independent, so they run concurrently on a bounded pool and are joined, in a
+        fixed order, before the editor compiles them.
+        """
+        desks = [
+            ("GLOBAL MACRO RADAR", self.agents.macro_impact_agent, self.tasks.analyze_macro_task),
+            ("LOGISTICS TECH LAB", self.agents.tech_signal_agent, self.tasks.analyze_tech_task),
+            ("GOVERNMENT & POLICY", self.agents.infra_policy_agent, self.tasks.analyze_policy_task),
+            ("GLOBAL BEST PRACTICES", self.agents.best_practices_agent, self.tasks.analyze_best_practices_task),
+            ("THE LOGISTICS TALENT BENCH", self.agents.talent_insights_agent, self.tasks.analyze_talent_task),
+        ]
+        logger.info(f"Running {len(desks)} analysis desks with concurrency {self.desk_concurrency}")
+        with ThreadPoolExecutor(max_workers=self.desk_concurrency, thread_name_prefix="desk") as executor:
+            futures = [
+                executor.submit(self._run_desk, name, agent_factory, task_factory, store.render_section(name))
+                for name, agent_factory, task_factory in desks
+            ]
+            desk_outputs = [future.result() for future in futures]
+
+        # Editor
+        editor_agent = self.agents.editor_agent()
+        compile_task = self.tasks.compile_newsletter_task(editor_agent, context=None, recipients=[])
+        desk_reports = "".join(f"\n\n=== {name} ===\n{output}" for (name, _, _), output in zip(desks, desk_outputs))
+        compile_task.description += self.budget.fit("editor", desk_reports)
+        return self._kickoff([editor_agent], [compile_task], "editor")
+
+    def _gnews_fallback(self, topics, store=None):
+        fetcher = NewsFetcher()
+        
+        try:
+            sections = []
+            for topic_data in topics:
+                if isinstance(topic_data, dict):
+                    topic_name = topic_data.get('name', 'Unknown')
+                    keywords = topic_data.get('keywords', [])
+                    # Construct a better query using top 3 keywords
+                    search_query = " OR ".join(keywords[:3]) if keywords else topic_name
+                else:
+                    topic_name = str(topic_data)
+                    search_query = topic_name
+                sections.append((topic_name, search_query))
+
+            if store is not None and len(store):
+                # Articles were already fetched for the desks; reuse them instead of re-fetching
+                results = {query: store.route(name) for name, query in sections}
+            else:
+                # Fetch all sections concurrently using the constructed queries
+                results = fetcher.fetch_news_many([query for _, query in sections], lookback_hours=168)
+
+            return render_digest(
+                [(topic_name, results.get(search_query, [])) for topic_name, search_query in sections],
+                banner="OFFLINE MODE - GNEWS FALLBACK"
+            )
+        except Exception as fallback_error:
+            logger.error(f"Fallback also failed: {fallback_error}")
+            return "<h2>System Offline</h2><p>Unable to generate newsletter due to multiple failures.</p>"
 
     def run_personalization_phase(self, recipient, master_digest):
         # Agents
@@ -88,22 +216,92 @@ class NewsCuratorCrew:
         # Tasks
         # We manually inject the master digest into the description as a "context" string
         personalize_task = self.tasks.personalize_task(personalizer, recipient, context=None)
-        personalize_task.description += f"\n\n=== MASTER DIGEST ===\n{master_digest}\n====================="
+        digest = self.budget.fit("personalize", master_digest)
+        personalize_task.description += f"\n\n=== MASTER DIGEST ===\n{digest}\n====================="
         
         compose_task = self.tasks.compose_email_task(composer, recipient, context=[personalize_task])
 
-        crew = Crew(
-            agents=[personalizer, composer],
-            tasks=[personalize_task, compose_task],
-            process=Process.sequential,
-            verbose=True
-        )
-
         try:
-            result = crew.kickoff()
-            return result
+            return self._kickoff([personalizer, composer], [personalize_task, compose_task], "personalize")
         except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
             logger.error(f"Personalization Crew Execution Failed: {e}. Falling back to Master Digest.")
             return master_digest
+
+    def run_batch_personalization(self, profiles, master_digest):
+        """
+        Writes the intros for several recipient profiles in one call: the digest is
+        sent once and the model answers with JSON intros keyed by profile id.
+        Returns the intros in profile order (None where missing, or for all on failure).
+        """
+        personalizer = self.agents.personalization_agent()
+        ids = [f"r{i}" for i in range(1, len(profiles) + 1)]
+        task = self.tasks.personalize_batch_task(personalizer, dict(zip(ids, profiles)))
+        digest = self.budget.fit("personalize", master_digest)
+        task.description += f"\n\n=== MASTER DIGEST ===\n{digest}\n====================="
+
+        try:
+            output = self._kickoff([personalizer], [task], "personalize_batch")
+        except Exception as e:
+            logger.error(f"Batch Personalization Failed: {e}.")
+            return [None] * len(profiles)
+
+        intros = parse_intros(output, ids)
+        if len(intros) < len(ids):
+            logger.warning(f"Batch personalization returned {len(intros)} of {len(ids)} intros")
+        return [intros.get(i) for i in ids]
+
+    def stream_personalization_phase(self, recipient, master_digest):
+        """
+        Like run_personalization_phase, but the composer's HTML is yielded in chunks
+        as the model streams it. The personalized brief is produced first (one
+        regular call); the composer's prompt is sent directly to the scheduled LLM.
+        Failures are raised (possibly after some chunks); only complete output is cached.
+        """
+        personalizer = self.agents.personalization_agent()
+        composer = self.agents.email_composer_agent()
+        personalize_task = self.tasks.personalize_task(personalizer, recipient, context=None)
+        digest = self.budget.fit("personalize", master_digest)
+        personalize_task.description += f"\n\n=== MASTER DIGEST ===\n{digest}\n====================="
+        compose_task = self.tasks.compose_email_task(composer, recipient, context=None)
+
+        key = None
+        if self.cache is not None:
+            key = self._cache_key([personalizer, composer], [personalize_task, compose_task])
+            cached = self.cache.get(key)
+            if cached is not None:
+                get_metrics().add("llm.compose", cache_hits=1)
+                yield cached
+                return
+
+        brief = self._kickoff([personalizer], [personalize_task], "personalize")
+
+        messages = [
+            {"role": "system", "content": f"You are {composer.role}. {composer.backstory}\nYour goal: {composer.goal}"},
+            {"role": "user", "content": f"{compose_task.description}\n\nExpected output: {compose_task.expected_output}"
+                                        f"\n\n=== CONTEXT ===\n{brief}"},
+        ]
+        self._bind_llm([composer])
+        pieces = []
+        with get_metrics().stage("llm.compose") as record:
+            record["tokens_in"] = self.budget.measure("personalize", messages[0]["content"] + "\n" + messages[1]["content"])
+            for piece in self.llm.stream(messages):
+                pieces.append(piece)
+                yield piece
+            output = "".join(pieces)
+            record["tokens_out"] = count_tokens(output, self.budget.model)
+            record["cost_usd"] = self._estimate_cost(record["tokens_in"], record["tokens_out"])
+
+        if key is not None:
+            self.cache.put(key, output, model=os.getenv("OPENAI_MODEL_NAME"))
+
+    def run_streamed_personalization(self, recipient, master_digest):
+        """
+        Consumes stream_personalization_phase with code fences stripped as chunks
+        arrive. Like run_personalization_phase, falls back to the master digest if
+        the brief or the stream fails, discarding any partial output.
+        """
+        try:
+            return "".join(strip_fences(self.stream_personalization_phase(recipient, master_digest)))
+        except Exception as e:
+            logger.error(f"Streaming Personalization Failed: {e}. Falling back to Master Digest.")
+            return master_digest
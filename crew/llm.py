@@ -0,0 +1,118 @@
+import threading
+from contextlib import contextmanager
+from crewai import LLM
+from config.llm_config import PROVIDERS, current_provider, current_llm_settings, failover_llm, get_scheduler
+from services.token_budget import count_tokens
+
+_meter = threading.local()
+
+def _prompt_text(messages):
+    if isinstance(messages, str):
+        return messages
+    return "\n".join(str(message.get("content", "")) for message in messages)
+
+@contextmanager
+def metered_prompts(measure):
+    """
+    Within the block, measure(text) gets the full prompt of every LLM call made from
+    this thread: system prompt, task and the context crewai passes between tasks.
+    A sequential crew runs its calls in the thread that kicked it off.
+    """
+    previous = getattr(_meter, "measure", None)
+    _meter.measure = measure
+    try:
+        yield
+    finally:
+        _meter.measure = previous
+
+def meter_prompt(text):
+    """
+    Reports a prompt about to be sent to the active metered_prompts block, if any.
+    """
+    measure = getattr(_meter, "measure", None)
+    if measure is not None:
+        measure(text)
+
+class ScheduledLLM(LLM):
+    """
+    LLM whose calls go through the shared scheduler (rate limits, token accounting,
+    retries). When a provider keeps failing, switches to the next one in the chain
+    and repeats the call there.
+    """
+
+    def _use(self, settings):
+        self.model = settings["model"]
+        self.api_key = settings["api_key"]
+        self.base_url = settings["base_url"]
+
+    def call(self, messages, *args, **kwargs):
+        # Another agent may have failed over already
+        settings = current_llm_settings()
+        if settings["model"] and settings["model"] != self.model:
+            self._use(settings)
+
+        prompt = _prompt_text(messages)
+        meter_prompt(prompt)
+        tokens_in = count_tokens(prompt, self.model)
+        for attempt in range(len(PROVIDERS)):
+            provider, model = current_provider(), self.model
+            try:
+                return get_scheduler().call(
+                    lambda: super(ScheduledLLM, self).call(messages, *args, **kwargs),
+                    provider=provider, model=model, tokens_in=tokens_in,
+                    count_output=lambda output: count_tokens(str(output), model)
+                )
+            except Exception as e:
+                if attempt == len(PROVIDERS) - 1 or not failover_llm(e, failed=provider):
+                    raise
+                self._use(current_llm_settings())
+
+    def stream(self, messages):
+        """
+        Yields completion text as it arrives. The request is scheduled and fails over
+        like call(); completion tokens are accounted once the stream ends.
+        """
+        import litellm
+
+        settings = current_llm_settings()
+        if settings["model"] and settings["model"] != self.model:
+            self._use(settings)
+
+        prompt = _prompt_text(messages)
+        meter_prompt(prompt)
+        tokens_in = count_tokens(prompt, self.model)
+        for attempt in range(len(PROVIDERS)):
+            provider, model = current_provider(), self.model
+            try:
+                response = get_scheduler().call(
+                    lambda: litellm.completion(model=model, messages=messages, api_key=self.api_key,
+                                               base_url=self.base_url, stream=True),
+                    provider=provider, model=model, tokens_in=tokens_in
+                )
+                break
+            except Exception as e:
+                if attempt == len(PROVIDERS) - 1 or not failover_llm(e, failed=provider):
+                    raise
+                self._use(current_llm_settings())
+
+        pieces = []
+        try:
+            for chunk in response:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    pieces.append(delta)
+                    yield delta
+        finally:
+            get_scheduler().charge(provider, model, count_tokens("".join(pieces), model))
+
+def scheduled_llm():
+    """
+    A ScheduledLLM for the active provider, or None when no provider is active.
+    It is always litellm-backed, so crewai can't swap in a native provider client
+    whose calls skip ScheduledLLM.call.
+    """
+    settings = current_llm_settings()
+    if not settings["model"]:
+        return None
+    return ScheduledLLM(model=settings["model"], api_key=settings["api_key"], base_url=settings["base_url"],
+                        is_litellm=True)
@@ -1,23 +1,12 @@
 from crewai import Task
 
 class LogisticsCrewTasks:
-    def fetch_news_task(self, agent, topics):
-        return Task(
-            description=f"""
-                Search for the high-impact news articles for the following mandatory logistics sections: {topics}.
-                Focus on reliable trade journals, major news outlets, and Indian financial news.
-                Return a raw list of articles grouped by section.
-            """,
-            expected_output="A structured list of raw news articles grouped by the 5 sections.",
-            agent=agent
-        )
-
     def _create_analysis_task(self, agent, section_name, context, specific_instruction):
         return Task(
             description=f"""
                 You are responsible for the '{section_name}' section of the intelligence brief.
                 
-                Using the provided raw news (from previous task context):
+                Using the provided raw news (appended below or from previous task context):
                 1. Select the top 2 most critical stories for this section. (You MUST select exactly 2 stories. If fewer than 2 are obviously critical, include the next best relevant stories to meet the count of 2.)
                 2. {specific_instruction}
                 3. STRICT OUTPUT FORMAT for each selected story:
@@ -77,7 +66,7 @@ class LogisticsCrewTasks:
         # Master Digest Compilation
         return Task(
             description="""
-                Aggregate the outputs from all 5 analysis agents.
+                Aggregate the outputs from all 5 analysis agents (appended below, one block per section).
                 Format them into a single coherent Master Digest text block.
                 Ensure the 5-section structure is preserved exactly.
             """,
@@ -100,12 +89,36 @@ class LogisticsCrewTasks:
                 4. Sign off this intro section with "Hope you find this effort worthwhile."
                 5. Then, append the COMPLETE Master Digest exactly as provided.
                 6. CRITICAL: DO NOT REMOVE ANY STORIES.
+                7. If the name above is a placeholder such as [[RECIPIENT_NAME]], copy it verbatim wherever the name appears.
             """,
             expected_output=f"A text block starting with Dear {recipient['name']}, followed by the philosophical intro, the topics summary, and then the full digest.",
             agent=agent,
             context=context
         )
 
+    def personalize_batch_task(self, agent, profiles):
+        readers = "\n".join(
+            f"                - {key}: {profile['role']}; interests: {profile['interests']}; tone: {profile['tone']}"
+            for key, profile in profiles.items()
+        )
+        return Task(
+            description=f"""
+                You are preparing the opening of this edition for several readers at once:
+{readers}
+
+                For EACH reader, using the Master Digest below:
+                1. Start with "<p>Dear [[RECIPIENT_NAME]],</p>" (keep the placeholder verbatim).
+                2. Write a warm, slightly philosophical opening paragraph (approx 50 words) about resilience, strategy, or the current year (2025), in the reader's tone and with their interests in mind. Be human.
+                3. Follow with EXACTLY this sentence structure: "This edition offers insights on [List the 5 key headlines/topics from the digest], and [Last Topic]."
+                4. Sign off with "Hope you find this effort worthwhile."
+                Format each intro as simple HTML paragraphs. Do NOT include the digest itself; it is attached separately.
+
+                Output ONLY a JSON object mapping each reader id ({", ".join(profiles)}) to their intro HTML string.
+            """,
+            expected_output='A JSON object like {"r1": "<p>Dear [[RECIPIENT_NAME]],</p><p>...</p>", ...} with one entry per reader.',
+            agent=agent
+        )
+
     def compose_email_task(self, agent, recipient, context):
         return Task(
             description=f"""
@@ -120,6 +133,7 @@ class LogisticsCrewTasks:
                 - Closing Insight
                 
                 Output ONLY the raw HTML content. DO NOT exclude the "This edition offers insights on..." sentence.
+                If the name above is a placeholder such as [[RECIPIENT_NAME]], keep it verbatim in the greeting.
             """,
             expected_output="A complete HTML string.",
             agent=agent,
@@ -1,7 +1,7 @@
-import feedparser
 import time
 from datetime import datetime, timedelta
 from urllib.parse import quote
+from services.news_fetcher import NewsFetcher
 
 def test_feed():
     query = "Red Sea shipping OR Suez Canal blockage OR Panama Canal drought"
@@ -9,7 +9,9 @@ def test_feed():
     rss_url = f"https://news.google.com/rss/search?q={encoded_topic}&hl=en-US&gl=US&ceid=US:en"
     print(f"Fetching: {rss_url}")
     
-    feed = feedparser.parse(rss_url)
+    # Goes through the feed cache: repeated runs send a conditional GET and reuse
+    # the stored entries on 304 (set FEED_CACHE_MAX_AGE_MINUTES to skip the request).
+    feed = NewsFetcher()._load_feed(rss_url)
     print(f"Feed entries: {len(feed.entries)}")
     
     lookback_hours = 48
@@ -1,12 +1,13 @@
 import os
-import yaml
+import json
+import argparse
 import logging
-from dotenv import load_dotenv
 import datetime
-from crew.crew import NewsCuratorCrew
-from services.mailer import Mailer
-from jinja2 import Environment, FileSystemLoader
-from config.llm_config import configure_llm
+from dotenv import load_dotenv
+
+# NOTE: Subsystems (crewai/litellm, feedparser, jinja2, requests) are imported inside
+# the functions that need them, so commands like verify-template, fetch or send never
+# load the LLM stack. Keep new imports here cheap (see benchmarks/import_time.py).
 
 # Load environment variables
 load_dotenv()
@@ -18,97 +19,377 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+TEMPLATE_PATH = 'email/templates/newsletter.html'
+SUBJECT = "Tirwin Pulse | Logistics Intelligence Brief"
+
 def load_config(path):
+    import yaml
     with open(path, 'r') as f:
         return yaml.safe_load(f)
 
-def render_email(template_path, context):
-    env = Environment(loader=FileSystemLoader(os.path.dirname(template_path)))
-    template = env.get_template(os.path.basename(template_path))
-    return template.render(context)
+def log_link_stats():
+    from services.news_fetcher import NewsFetcher
+    link_stats = NewsFetcher.link_cache_stats()
+    if link_stats:
+        logger.info(f"Link cache: {link_stats['hits']} hits, {link_stats['misses']} misses, {link_stats['domain_hits']} dead-domain skips")
+    resolver_stats = NewsFetcher.url_resolver_stats()
+    if resolver_stats:
+        logger.info(f"URL resolver: {resolver_stats['hits']} cached, {resolver_stats['decoded']} decoded, "
+                    f"{resolver_stats['learned']} learned from link checks, {resolver_stats['unresolved']} unresolved")
 
-def main():
-    logger.info("Starting Logistics Intelligence Radar...")
-    
-    # Configure LLM Provider (Fallback Logic)
-    configure_llm()
+def open_run_store(args, command):
+    """
+    Opens the checkpoint directory for this run (a new one, or --resume RUN_ID).
+    """
+    from services.run_store import RunStore
 
-    # Load Configs
-    topics_config = load_config('config/topics.yaml')
-    recipients_config = load_config('config/recipients.yaml')
+    run_store = RunStore(os.getenv("RUNS_DIR", "runs"), run_id=args.resume, resume=bool(args.resume))
+    meta = run_store.read_json("run.json")
+    if meta is None:
+        meta = {"command": command, "fast": args.fast}
+        run_store.write_json("run.json", meta)
+    elif args.fast != meta.get("fast", False):
+        # A resumed run keeps the mode it was started with
+        logger.info(f"Run {run_store.run_id} was started with fast={meta.get('fast')}; keeping that mode.")
+        args.fast = meta.get("fast", False)
+    logger.info(f"Run {run_store.run_id} (resume with --resume {run_store.run_id}), checkpoints in {run_store.path}")
+    return run_store
 
-    topics = topics_config['topics']
-    # We pass the full topics config description/keywords if needed, but the agents handle it.
-    
-    recipients = recipients_config['recipients']
+def finish_report(run_store=None, **extra):
+    """
+    Logs the per-stage summary table and writes the JSON run report
+    (RUN_REPORT_PATH, or report.json in the run directory).
+    """
+    from services.metrics import get_metrics
 
-    logger.info(f"Loaded {len(topics)} mandatory sections.")
+    metrics = get_metrics()
+    logger.info("Run summary:\n" + metrics.summary_table())
+    path = os.getenv("RUN_REPORT_PATH") or (os.path.join(run_store.path, "report.json") if run_store is not None else None)
+    if path:
+        metrics.write(path, **extra)
+        logger.info(f"Run report written to {path}")
+
+def build_fast_digest(topics, run_store=None):
+    """
+    FAST MODE: no LLM calls, fetched articles rendered directly into the digest.
+    """
+    from services.news_fetcher import NewsFetcher
+    from services.digest_renderer import render_store_digest
+    from services.segments import NAME_PLACEHOLDER
+
+    logger.info("Fast mode: rendering digest directly from fetched articles...")
+    store = run_store.load_articles() if run_store is not None else None
+    if store is None:
+        store = NewsFetcher().build_article_store(topics)
+        if run_store is not None:
+            run_store.save_articles(store)
+    return render_store_digest(store, greeting_name=NAME_PLACEHOLDER)
+
+def edition_articles(store, master_digest):
+    """
+    Articles from store that made it into master_digest (matched by their link).
+    """
+    from html import escape
+
+    if store is None:
+        return []
+    return [a for a in store if a.url in master_digest or escape(a.url) in master_digest]
+
+def deliver(recipients, master_digest, news_crew=None, run_store=None, history=None, edition=()):
+    """
+    PHASE 2: Personalization & Delivery.
+    Without a crew, every recipient gets master_digest as-is (with their name filled in).
+    With a run_store, segment content, rendered emails (both keyed on master_digest)
+    and send status are checkpointed, and recipients already sent to in that run are skipped.
+    With an article history, the edition articles are recorded per recipient on send,
+    and recipients who already received every one of them are skipped.
+    """
+    from services.mailer import Mailer
+    from services.delivery import DeliveryPipeline, BatchRunner
+    from services.renderer import EmailShell
+    from services.run_store import RunStore
+    from services.digest_renderer import to_html
+    from services.segments import NAME_PLACEHOLDER, group_recipients, segment_key, segment_profile, apply_recipient
+
+    if run_store is not None:
+        pending = [r for r in recipients if not run_store.was_sent(r)]
+        if len(pending) < len(recipients):
+            logger.info(f"Skipping {len(recipients) - len(pending)} recipients already sent in run {run_store.run_id}")
+        recipients = pending
 
-    # Initialize Crew
-    news_crew = NewsCuratorCrew()
+    if history is not None and edition:
+        urls = [a.url for a in edition]
+        pending = [r for r in recipients if len(history.sent_to(r['email'], urls)) < len(urls)]
+        if len(pending) < len(recipients):
+            logger.info(f"Skipping {len(recipients) - len(pending)} recipients who already received this edition")
+        recipients = pending
 
-    # PHASE 1: Research & Master Digest
-    logger.info("Starting Phase 1: Global Research & Master Digest...")
-    try:
-        # In this new flow, run_research_phase returns the COMPILED Master Digest string
-        master_digest = news_crew.run_research_phase(topics)
-        logger.info("Master Digest Analysis Completed.")
-    except Exception as e:
-        logger.error(f"Research Phase Failed: {e}")
-        return
+    if not recipients:
+        logger.info("Nothing left to deliver.")
+        return []
 
-    # PHASE 2: Personalization & Delivery
     mailer = Mailer()
-    template_path = 'email/templates/newsletter.html'
+    today_str = datetime.datetime.now().strftime("%d-%B")
+    # The template is rendered once; each email only fills in its body
+    shell = EmailShell(TEMPLATE_PATH, {
+        'name': NAME_PLACEHOLDER,
+        'subject': SUBJECT,
+        'date': today_str
+    })
+    stream_compose = news_crew is not None and os.getenv("COMPOSE_STREAMING", "false").lower() == "true"
+
+    segments = group_recipients(recipients)
+    logger.info(f"{len(recipients)} recipients share {len(segments)} distinct profiles.")
+
+    # The digest as email HTML, rendered once and shared by batched and fallback bodies
+    digest_html = to_html(master_digest) if news_crew is not None else None
+
+    # Batched mode: one call writes the intros for several profiles, and every email
+    # carries the same master digest after its intro
+    batches = None
+    batch_size = int(os.getenv("PERSONALIZE_BATCH_SIZE", "0"))
+    if news_crew is not None and batch_size > 1:
+        profiles = {key: segment_profile(members[0]) for key, members in segments}
+        keys = [key for key, _ in segments
+                if run_store is None or not run_store.has(RunStore.segment_name(key, str(master_digest)))]
+        batches = BatchRunner(
+            keys, batch_size,
+            lambda batch: news_crew.run_batch_personalization([profiles[key] for key in batch], str(master_digest)),
+            max_workers=int(os.getenv("PERSONALIZE_CONCURRENCY", "2"))
+        )
+        logger.info(f"Personalizing {len(keys)} profiles in {len(batches)} batched calls.")
+
+    def personalize(recipient):
+        if news_crew is None:
+            # Everyone gets the same digest
+            return master_digest
+
+        # Runs once per segment (role, interests, tone), with a placeholder name
+        checkpoint = RunStore.segment_name(segment_key(recipient), str(master_digest))
+        if run_store is not None and run_store.has(checkpoint):
+            return run_store.read_text(checkpoint)
+
+        intro = batches.get(segment_key(recipient)) if batches is not None else None
+        if intro is not None:
+            content = f"{to_html(intro)}\n{digest_html}"
+            if run_store is not None:
+                run_store.write_text(checkpoint, content)
+            return content
+
+        # Unbatched, or the batch reply had no intro for this profile
+        profile = segment_profile(recipient)
+        logger.info(f"Processing Brief for segment: {profile['role']} / {profile['tone']}")
+        # The agent returns the CONTENT BLOCK (HTML formatted but inside the body),
+        # which is injected into our Jinja template as the "body".
+        if stream_compose:
+            # Code fences are stripped chunk by chunk while the composer is still writing
+            content = news_crew.run_streamed_personalization(profile, str(master_digest)).strip()
+        else:
+            p_result = news_crew.run_personalization_phase(profile, str(master_digest))
 
-    logger.info("Starting Phase 2: Personalization & Delivery...")
-    for recipient in recipients:
-        logger.info(f"Processing Brief for: {recipient['name']} ({recipient['role']})")
-        try:
-            # Generate Personalized Body (HTML Fragment or Full HTML)
-            # The agent is returning "Complete HTML string".
-            # BUT our template wrapper needs just the body content if we want to wrap it consistently.
-            # OR we let the agent control the whole thing.
-            # Let's assume the agent returns the CONTENT BLOCK (HTML formatted but inside the body).
-            # To be safe, let's treat the output as the "body" to be injected into our Jinja template.
-            
-            p_result = news_crew.run_personalization_phase(recipient, str(master_digest))
-            
             # Since CrewAI kickoff returns an object, we cast to str.
             personalized_content = str(p_result)
-            
+
             # Clean up markdown code blocks if present
-            personalized_content = personalized_content.replace('```html', '').replace('```', '').strip()
-
-            # Render final email with Wrapper
-            today_str = datetime.datetime.now().strftime("%d-%B")
-            final_email_html = render_email(template_path, {
-                'name': recipient['name'],
-                'subject': "Tirwin Pulse | Logistics Intelligence Brief", 
-                'body': personalized_content,
-                'date': today_str
-            })
-            
-            subject = "Tirwin Pulse | Logistics Intelligence Brief"
-            
-            # Sending
-            success = mailer.send_email(
-                to_email=recipient['email'],
-                subject=subject,
-                html_body=final_email_html,
-                text_body="Please enable HTML to view this intelligence brief."
-            )
-            
-            if success:
-                logger.info(f"Brief sent to {recipient['email']}")
-            else:
-                logger.error(f"Failed to send brief to {recipient['email']}")
-
-        except Exception as e:
-            logger.error(f"Error processing for {recipient['name']}: {e}")
-            continue
+            content = personalized_content.replace('```html', '').replace('```', '').strip()
+        # The crew falls back to the master digest on failure; don't pin that for resumes
+        if content == master_digest.strip():
+            return digest_html
+        if run_store is not None:
+            run_store.write_text(checkpoint, content)
+        return content
+
+    def render(recipient, segment_content):
+        checkpoint = RunStore.recipient_name(recipient, str(master_digest))
+        if run_store is not None and run_store.has(checkpoint):
+            return run_store.read_text(checkpoint)
+
+        # Per-person substitution, then wrap with the pre-rendered template
+        html = shell.fill(apply_recipient(segment_content, recipient, expect_placeholder=news_crew is not None)).replace(NAME_PLACEHOLDER, recipient['name'])
+        if run_store is not None:
+            run_store.write_text(checkpoint, html)
+        return html
+
+    def send(recipient, final_email_html):
+        sent = mailer.send_email(
+            to_email=recipient['email'],
+            subject=SUBJECT,
+            html_body=final_email_html,
+            text_body="Please enable HTML to view this intelligence brief."
+        )
+        if run_store is not None:
+            run_store.mark_sent(recipient, sent, None if sent else "send failed")
+        if sent and history is not None and edition:
+            history.record_sent(recipient['email'], edition)
+        return sent
+
+    logger.info("Starting Phase 2: Personalization & Delivery...")
+    pipeline = DeliveryPipeline(
+        personalize, render, send,
+        personalize_limit=int(os.getenv("PERSONALIZE_CONCURRENCY", "2")),
+        render_limit=int(os.getenv("RENDER_CONCURRENCY", "4")),
+        send_limit=int(os.getenv("SEND_CONCURRENCY", "2")),
+        segment_key=segment_key if news_crew is not None else (lambda recipient: "all")
+    )
+    results = pipeline.run(recipients)
+    if batches is not None:
+        batches.close()
+    mailer.close()
+    return results
 
+def run(args):
+    """
+    Full run: research (or fast digest), then personalization and delivery.
+    """
+    from services.metrics import get_metrics
+    from services.news_fetcher import NewsFetcher
+
+    logger.info("Starting Logistics Intelligence Radar...")
+
+    # Load Configs
+    topics = load_config('config/topics.yaml')['topics']
+    # We pass the full topics config description/keywords if needed, but the agents handle it.
+    recipients = load_config('config/recipients.yaml')['recipients']
+
+    logger.info(f"Loaded {len(topics)} mandatory sections.")
+
+    run_store = open_run_store(args, "run")
+    master_digest = run_store.read_text("master_digest.html")
+    if master_digest is not None:
+        logger.info("Using checkpointed master digest, skipping Phase 1.")
+
+    news_crew = None
+    # Fallback digests are not checkpointed, so --resume retries the LLM research
+    fallback = False
+    if args.fast:
+        if master_digest is None:
+            with get_metrics().stage("phase.research"):
+                master_digest = build_fast_digest(topics, run_store)
+    else:
+        from config.llm_config import configure_llm
+        from crew.crew import NewsCuratorCrew
+
+        # Configure LLM Provider (Fallback Logic)
+        configure_llm()
+
+        # Initialize Crew
+        news_crew = NewsCuratorCrew(use_cache=not args.no_cache, run_store=run_store)
+
+        if master_digest is None:
+            # PHASE 1: Research & Master Digest
+            logger.info("Starting Phase 1: Global Research & Master Digest...")
+            try:
+                with get_metrics().stage("phase.research"):
+                    # In this new flow, run_research_phase returns the COMPILED Master Digest string
+                    master_digest, fallback = news_crew.run_research_phase(topics)
+                logger.info("Master Digest Analysis Completed.")
+            except Exception as e:
+                logger.error(f"Research Phase Failed: {e}")
+                finish_report(run_store, run_id=run_store.run_id, error=str(e))
+                return
+    if not fallback:
+        run_store.write_text("master_digest.html", str(master_digest))
+
+    log_link_stats()
+
+    # Stories in this edition are remembered so later runs skip them
+    history = NewsFetcher.get_article_history()
+    edition = edition_articles(run_store.load_articles(), str(master_digest)) if history is not None else []
+
+    with get_metrics().stage("phase.delivery"):
+        results = deliver(recipients, master_digest, news_crew, run_store, history=history, edition=edition)
+
+    extra = {
+        "run_id": run_store.run_id,
+        "fast": args.fast,
+        "sent": sum(1 for r in results if r["sent"]),
+        "failed": sum(1 for r in results if not r["sent"]),
+    }
+    if history is not None:
+        extra["article_history"] = history.stats()
+    if news_crew is not None:
+        token_report = news_crew.budget.report()
+        logger.info(f"Prompt tokens sent: {token_report['total_prompt_tokens']} ({token_report['prompt_tokens']}); "
+                    f"saved by compaction: {token_report['total_saved_tokens']} ({token_report['saved_tokens']})")
+        extra["token_budget"] = token_report
+
+        from config.llm_config import get_scheduler
+        extra["llm_scheduler"] = get_scheduler().stats()
+
+        if news_crew.cache is not None:
+            llm_stats = news_crew.cache.stats()
+            logger.info(f"LLM cache: {llm_stats['hits']} hits, {llm_stats['misses']} misses")
+            extra["llm_cache"] = llm_stats
+
+    finish_report(run_store, **extra)
     logger.info("Logistics Radar Run Completed.")
 
+def fetch(args):
+    """
+    Fetch-only: builds the article store and prints (or saves) it. No LLM involved.
+    """
+    from dataclasses import asdict
+    from services.news_fetcher import NewsFetcher
+
+    topics = load_config('config/topics.yaml')['topics']
+    store = NewsFetcher().build_article_store(topics)
+    sections = {section["name"]: [asdict(a) for a in store.route(section["name"])] for section in store.sections}
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(sections, f, indent=2)
+        logger.info(f"Saved {len(store)} articles to {args.output}")
+    else:
+        for name, articles in sections.items():
+            print(f"\n== {name} ({len(articles)}) ==")
+            for article in articles:
+                print(f"- {article['title']} | {article['source']}\n  {article['url']}")
+    log_link_stats()
+    finish_report(articles=len(store))
+
+def send(args):
+    """
+    Send-only: delivers a ready-made body (HTML fragment) to every recipient.
+    The body may contain [[RECIPIENT_NAME]] for per-person greetings.
+    """
+    with open(args.body, 'r') as f:
+        body = f.read()
+    recipients = load_config('config/recipients.yaml')['recipients']
+    run_store = open_run_store(args, "send")
+    results = deliver(recipients, body, run_store=run_store)
+    finish_report(run_store, run_id=run_store.run_id,
+                  sent=sum(1 for r in results if r["sent"]), failed=sum(1 for r in results if not r["sent"]))
+
+def verify_template_command(args):
+    from verify_template import verify
+    verify()
+
+COMMANDS = {
+    "run": run,
+    "fetch": fetch,
+    "send": send,
+    "verify-template": verify_template_command,
+}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Logistics Intelligence Radar")
+    parser.add_argument("command", nargs="?", default="run", choices=sorted(COMMANDS),
+                        help="run (default): full pipeline; fetch: articles only; send: deliver --body; verify-template: render a sample email.")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached LLM outputs and call the providers again.")
+    parser.add_argument("--fast", action="store_true",
+                        help="Skip the LLM crews: render fetched headlines straight into the newsletter (e.g. breaking-news sends).")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="run/send: continue the run in runs/RUN_ID, skipping checkpointed stages and recipients already sent to.")
+    parser.add_argument("--output", help="fetch: write the articles as JSON to this file.")
+    parser.add_argument("--body", help="send: HTML fragment to deliver.")
+    args = parser.parse_args(argv)
+    if args.command == "send" and not args.body:
+        parser.error("send requires --body")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    COMMANDS[args.command](args)
+
 if __name__ == "__main__":
     main()
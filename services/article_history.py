@@ -0,0 +1,136 @@
+import hashlib
+import logging
+import re
+import time
+
+from services.url_resolver import canonicalize
+from services.sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+_SOURCE_SUFFIX_RE = re.compile(r"\s+[-–—|]\s+[^-–—|]{1,40}$")
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+class ArticleHistory(SQLiteStore):
+    """
+    Persistent record of articles that went out in a sent edition, and of who got them.
+
+    Lookups go through indexes on a URL hash and a normalized title, so dedup can
+    ask "was this story mailed before?" without loading the history. Entries older
+    than the retention window are evicted when the history is opened. Only mailed
+    articles are recorded: fetching alone never hides a story from a later run.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS articles (
+            url_hash TEXT PRIMARY KEY,
+            title_key TEXT NOT NULL,
+            url TEXT NOT NULL,
+            title TEXT NOT NULL,
+            mailed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS articles_title_key ON articles (title_key);
+        CREATE INDEX IF NOT EXISTS articles_mailed_at ON articles (mailed_at);
+        CREATE TABLE IF NOT EXISTS sends (
+            recipient TEXT NOT NULL,
+            url_hash TEXT NOT NULL,
+            sent_at REAL NOT NULL,
+            PRIMARY KEY (recipient, url_hash)
+        );
+        CREATE INDEX IF NOT EXISTS sends_sent_at ON sends (sent_at);
+    """
+
+    def __init__(self, path, retention=30 * 24 * 3600):
+        self.retention = retention
+        self.hits = 0
+
+        super().__init__(path)
+        self.evict()
+
+    @staticmethod
+    def url_key(url):
+        # Mailed URLs keep their tracking parameters; compare them in canonical form
+        return hashlib.sha1(canonicalize(url.strip()).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def title_key(title):
+        """
+        Lowercased title without the trailing " - Publisher" and punctuation.
+        """
+        title = _SOURCE_SUFFIX_RE.sub("", title.strip())
+        return _NON_WORD_RE.sub(" ", title.lower()).strip()
+
+    def evict(self):
+        """
+        Drops articles and sends older than the retention window. Returns rows removed.
+        """
+        cutoff = time.time() - self.retention
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM articles WHERE mailed_at < ?", (cutoff,)).rowcount
+            removed += self._conn.execute("DELETE FROM sends WHERE sent_at < ?", (cutoff,)).rowcount
+            self._conn.commit()
+        if removed:
+            logger.info(f"Evicted {removed} article history rows older than {self.retention / 86400:.0f} days")
+        return removed
+
+    def was_mailed(self, url, title):
+        """
+        True if an article with this URL or (normalized) title was mailed within the window.
+        """
+        cutoff = time.time() - self.retention
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title FROM articles WHERE url_hash = ? AND mailed_at >= ? "
+                "UNION ALL SELECT title FROM articles WHERE title_key = ? AND mailed_at >= ? LIMIT 1",
+                (self.url_key(url), cutoff, self.title_key(title), cutoff)
+            ).fetchone()
+        if row is not None:
+            self.hits += 1
+            return True
+        return False
+
+    def record_sent(self, recipient, articles):
+        """
+        Records that recipient (an email address) was sent articles (objects with
+        url and title); the articles count as mailed from now on.
+        """
+        now = time.time()
+        rows = [(self.url_key(a.url), self.title_key(a.title), a.url, a.title, now) for a in articles]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO articles (url_hash, title_key, url, title, mailed_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (url_hash) DO UPDATE SET mailed_at = excluded.mailed_at",
+                rows
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sends (recipient, url_hash, sent_at) VALUES (?, ?, ?)",
+                [(recipient.lower(), url_hash, now) for url_hash, *_ in rows]
+            )
+            self._conn.commit()
+
+    def sent_to(self, recipient, urls):
+        """
+        Returns the subset of urls already sent to recipient within the window.
+        """
+        cutoff = time.time() - self.retention
+        keys = {self.url_key(url): url for url in urls}
+        if not keys:
+            return set()
+        with self._lock:
+            found = set()
+            key_list = list(keys)
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(key_list), 500):
+                chunk = key_list[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT url_hash FROM sends WHERE recipient = ? AND sent_at >= ? "
+                    f"AND url_hash IN ({','.join('?' * len(chunk))})",
+                    (recipient.lower(), cutoff, *chunk)
+                ).fetchall()
+                found.update(keys[row[0]] for row in rows)
+        return found
+
+    def stats(self):
+        with self._lock:
+            articles = self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+        return {"articles": articles, "hits": self.hits}
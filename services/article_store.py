@@ -0,0 +1,136 @@
+import html
+import logging
+import re
+from dataclasses import asdict, dataclass
+
+logger = logging.getLogger(__name__)
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+
+# Words that say nothing about which section a story belongs to
+_ROUTING_STOPWORDS = {"india", "indian", "in", "of", "the", "and", "for", "to", "a", "on"}
+
+def plain_text(value):
+    """
+    Strips HTML tags and entities and collapses whitespace.
+    """
+    return _SPACE_RE.sub(" ", html.unescape(_TAG_RE.sub(" ", value or ""))).strip()
+
+@dataclass(frozen=True)
+class Article:
+    title: str
+    url: str
+    source: str
+    date: str
+    content: str
+    section: str
+
+    def to_prompt(self, index, max_content_chars=300):
+        """
+        Compact text form used in desk prompts.
+        """
+        summary = plain_text(self.content)
+        # Google News summaries usually just repeat the headline and source
+        if summary.startswith(self.title) or not summary:
+            summary = ""
+        elif len(summary) > max_content_chars:
+            summary = summary[:max_content_chars].rsplit(" ", 1)[0] + "..."
+
+        text = f"{index}. {self.title} | {self.source} | {self.date}\n   URL: {self.url}"
+        if summary:
+            text += f"\n   {summary}"
+        return text
+
+class ArticleStore:
+    """
+    In-memory store of fetched articles, built once per run and shared by all desks.
+
+    Articles belong to the section whose queries found them (topic routing) and are
+    also routed to any other section whose keywords they mention (keyword routing),
+    so each desk only sees the stories relevant to it.
+    """
+
+    def __init__(self, sections):
+        # sections: list of {"name": ..., "keywords": [...]} as in config/topics.yaml
+        self.sections = [s if isinstance(s, dict) else {"name": str(s), "keywords": []} for s in sections]
+        self._articles = []
+        self._urls = set()
+        self._keyword_terms = {
+            section["name"]: [self._terms(k) for k in section.get("keywords", [])]
+            for section in self.sections
+        }
+
+    def __len__(self):
+        return len(self._articles)
+
+    def __iter__(self):
+        return iter(self._articles)
+
+    @staticmethod
+    def _terms(keyword):
+        terms = [w for w in re.findall(r"[a-z0-9]+", keyword.lower()) if w not in _ROUTING_STOPWORDS]
+        return terms
+
+    def add(self, article):
+        if article.url in self._urls:
+            return
+        self._urls.add(article.url)
+        self._articles.append(article)
+
+    def _find_section(self, name):
+        for section in self.sections:
+            if section["name"].lower() == name.lower():
+                return section["name"]
+        return None
+
+    def _mentions(self, article, section_name):
+        words = set(re.findall(r"[a-z0-9]+", f"{article.title} {plain_text(article.content)}".lower()))
+        for terms in self._keyword_terms.get(section_name, []):
+            if terms and all(term in words for term in terms):
+                return True
+        return False
+
+    def route(self, section_name):
+        """
+        Returns the articles routed to a section, own-section articles first.
+        Unknown section names get every article.
+        """
+        name = self._find_section(section_name)
+        if name is None:
+            logger.warning(f"No configured section named '{section_name}', routing all articles to it")
+            return list(self._articles)
+
+        own = [a for a in self._articles if a.section == name]
+        borrowed = [a for a in self._articles if a.section != name and self._mentions(a, name)]
+        return own + borrowed
+
+    def to_dict(self):
+        return {"sections": self.sections, "articles": [asdict(a) for a in self._articles]}
+
+    @classmethod
+    def from_dict(cls, data):
+        store = cls(data["sections"])
+        for article in data["articles"]:
+            store.add(Article(**article))
+        return store
+
+    def render_section(self, section_name, max_content_chars=300):
+        articles = self.route(section_name)
+        if not articles:
+            return f"No recent articles found for {section_name}."
+        return "\n".join(a.to_prompt(i, max_content_chars) for i, a in enumerate(articles, 1))
+
+def section_queries(section, keywords_per_query=3):
+    """
+    Splits a section's keywords into OR-queries for Google News.
+    """
+    if not isinstance(section, dict):
+        return [str(section)]
+    keywords = section.get("keywords", [])
+    if not keywords:
+        return [section.get("name", "Unknown")]
+    return [
+        " OR ".join(keywords[i:i + keywords_per_query])
+        for i in range(0, len(keywords), keywords_per_query)
+    ]
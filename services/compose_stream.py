@@ -0,0 +1,65 @@
+import re
+
+FENCE = "```html"
+
+# A backtick run at the end of a chunk, possibly the start of "```html"
+_OPEN_RUN_RE = re.compile(r"(?:`+html)*`+(?:h|ht|htm)?$")
+
+class FenceStripper:
+    """
+    Removes markdown code fences (```html / ```) and surrounding whitespace from
+    LLM output that arrives in chunks. feed() returns the text that is final so
+    far; backticks at the end of a chunk (a possible fence) and trailing whitespace
+    are held back until the next chunk or finish(). For fenced LLM output the
+    concatenated result is the same as the one-shot cleanup
+    text.replace('```html', '').replace('```', '').strip().
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self._space = ""
+        self._started = False
+
+    @staticmethod
+    def _clean(text):
+        return text.replace(FENCE, "").replace("```", "")
+
+    def _emit(self, text):
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return ""
+            self._started = True
+        body = text.rstrip()
+        out = self._space + body if body else ""
+        # Trailing whitespace is only output if more text follows it
+        self._space = text[len(body):] if body else self._space + text
+        return out
+
+    def feed(self, chunk):
+        text = self._pending + chunk
+        match = _OPEN_RUN_RE.search(text)
+        split = match.start() if match else len(text)
+        cleaned = self._clean(text[:split])
+        # Backticks left over by the cleanup may still join the next chunk into a fence
+        ticks = len(cleaned) - len(cleaned.rstrip("`"))
+        self._pending = cleaned[len(cleaned) - ticks:] + text[split:] if ticks else text[split:]
+        return self._emit(cleaned[:len(cleaned) - ticks])
+
+    def finish(self):
+        out = self._emit(self._clean(self._pending))
+        self._pending = ""
+        return out
+
+def strip_fences(chunks):
+    """
+    Yields the cleaned text of chunks as they arrive (see FenceStripper).
+    """
+    stripper = FenceStripper()
+    for chunk in chunks:
+        cleaned = stripper.feed(chunk)
+        if cleaned:
+            yield cleaned
+    tail = stripper.finish()
+    if tail:
+        yield tail
@@ -0,0 +1,127 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+
+logger = logging.getLogger(__name__)
+
+class DeliveryPipeline:
+    """
+    Runs personalize -> render -> send for every recipient on a bounded worker pool.
+
+    Each stage has its own concurrency limit, so slow LLM calls for one recipient
+    overlap with rendering and SMTP sends for others without exceeding provider or
+    mail server limits. Outcomes are logged in recipient order and summarized.
+
+    When segment_key is given, personalize runs once per distinct key and its output
+    is shared by every recipient in that segment; render then does the per-person part.
+    """
+
+    def __init__(self, personalize, render, send, personalize_limit=2, render_limit=4, send_limit=2,
+                 segment_key=None):
+        self.personalize = personalize
+        self.render = render
+        self.send = send
+        self.segment_key = segment_key
+        self._segments = {}
+        self._segments_lock = threading.Lock()
+        self._stages = {
+            "personalize": threading.BoundedSemaphore(personalize_limit),
+            "render": threading.BoundedSemaphore(render_limit),
+            "send": threading.BoundedSemaphore(send_limit),
+        }
+        self.max_workers = personalize_limit + render_limit + send_limit
+
+    def _stage(self, name, func, *args):
+        with self._stages[name]:
+            return func(*args)
+
+    def _personalize(self, recipient):
+        if self.segment_key is None:
+            return self._stage("personalize", self.personalize, recipient)
+
+        key = self.segment_key(recipient)
+        with self._segments_lock:
+            future = self._segments.get(key)
+            owner = future is None
+            if owner:
+                future = self._segments[key] = Future()
+
+        # Only the first recipient of a segment pays for personalization; the others
+        # wait for its result without holding a personalize slot.
+        if owner:
+            try:
+                future.set_result(self._stage("personalize", self.personalize, recipient))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+    def _process(self, recipient):
+        started = time.monotonic()
+        result = {"recipient": recipient, "sent": False, "error": None}
+        try:
+            content = self._personalize(recipient)
+            html = self._stage("render", self.render, recipient, content)
+            result["sent"] = bool(self._stage("send", self.send, recipient, html))
+            if not result["sent"]:
+                result["error"] = "send failed"
+        except Exception as e:
+            result["error"] = str(e)
+        result["elapsed"] = time.monotonic() - started
+        return result
+
+    def run(self, recipients):
+        """
+        Delivers to all recipients and returns one result dict per recipient, in order.
+        """
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="delivery") as executor:
+            futures = [executor.submit(self._process, recipient) for recipient in recipients]
+            for i, future in enumerate(futures, 1):
+                result = future.result()
+                results.append(result)
+                recipient = result["recipient"]
+                if result["sent"]:
+                    logger.info(f"[{i}/{len(futures)}] Brief sent to {recipient['email']} ({result['elapsed']:.1f}s)")
+                else:
+                    logger.error(f"[{i}/{len(futures)}] Failed to deliver brief to {recipient['email']}: {result['error']}")
+
+        self.log_summary(results)
+        return results
+
+    @staticmethod
+    def log_summary(results):
+        sent = [r for r in results if r["sent"]]
+        failed = [r for r in results if not r["sent"]]
+        logger.info(f"Delivery summary: {len(sent)} sent, {len(failed)} failed, {len(results)} total")
+        for r in failed:
+            logger.info(f"  FAILED {r['recipient']['name']} <{r['recipient']['email']}>: {r['error']}")
+
+class BatchRunner:
+    """
+    Splits keys into batches of batch_size and runs run_batch(keys) -> [result per key]
+    for all of them up front on a pool of max_workers threads. get(key) waits for the
+    batch holding key; a failed batch raises in every get() for its keys.
+    """
+
+    def __init__(self, keys, batch_size, run_batch, max_workers=2):
+        self._batches = [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
+        self._batch_of = {key: n for n, batch in enumerate(self._batches) for key in batch}
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="batch")
+        self._futures = [self._executor.submit(run_batch, batch) for batch in self._batches]
+
+    def __len__(self):
+        return len(self._batches)
+
+    def get(self, key):
+        """
+        Returns the result for key, or None if key was not batched.
+        """
+        n = self._batch_of.get(key)
+        if n is None:
+            return None
+        results = self._futures[n].result()
+        return results[self._batches[n].index(key)]
+
+    def close(self):
+        self._executor.shutdown(wait=True)
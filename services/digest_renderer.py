@@ -0,0 +1,111 @@
+import html
+import logging
+import re
+from services.article_store import plain_text
+from services.renderer import get_renderer
+
+logger = logging.getLogger(__name__)
+
+DIGEST_TEMPLATE_DIR = 'email/templates'
+DIGEST_TEMPLATE = 'digest_sections.html'
+
+# Block-level markup: text that has it is already HTML
+_HTML_RE = re.compile(r"<(p|div|h[1-6]|ul|ol|li|table|br|hr|section|article)\b", re.IGNORECASE)
+_FENCE_RE = re.compile(r"^[ \t]*```[\w-]*[ \t]*$\n?", re.MULTILINE)
+_HEADING_RE = re.compile(r"^(?:(#{1,4})\s+(.+?)|={2,}\s*(.+?)\s*={2,})\s*#*$")
+_BULLET_RE = re.compile(r"^\s*(?:[-*\u2022]|\d+[.)])\s+(.*)$")
+_RULE_RE = re.compile(r"^\s*(?:-{3,}|\*{3,}|_{3,})\s*$")
+_LINK_RE = re.compile(r"\[([^\]]+)\]\((https?://[^)\s]+)\)|(https?://[^\s<]+)")
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+
+def _article_view(article, max_summary_chars):
+    if not isinstance(article, dict):
+        article = vars(article)
+    summary = plain_text(article.get("content"))
+    # Google News summaries usually just repeat the headline
+    if summary.startswith(article["title"]):
+        summary = ""
+    elif len(summary) > max_summary_chars:
+        summary = summary[:max_summary_chars].rsplit(" ", 1)[0] + "..."
+    return {
+        "title": article["title"],
+        "url": article["url"],
+        "source": article.get("source", "Unknown"),
+        "date": article.get("date", ""),
+        "summary": summary,
+    }
+
+def render_digest(sections, banner=None, greeting_name=None, max_summary_chars=300):
+    """
+    Renders fetched articles straight into newsletter HTML, without any LLM.
+
+    sections is a list of (section_name, articles), where articles are dicts (as
+    returned by NewsFetcher) or Article records. All text is HTML-escaped.
+    """
+    view = [
+        {"name": name, "articles": [_article_view(a, max_summary_chars) for a in articles]}
+        for name, articles in sections
+    ]
+    renderer = get_renderer(DIGEST_TEMPLATE_DIR)
+    return renderer.render(DIGEST_TEMPLATE, {
+        "sections": view,
+        "banner": banner,
+        "greeting_name": greeting_name,
+    })
+
+def render_store_digest(store, banner=None, greeting_name=None):
+    """
+    Renders every section of an ArticleStore, using the same routing as the desks.
+    """
+    sections = [(section["name"], store.route(section["name"])) for section in store.sections]
+    return render_digest(sections, banner=banner, greeting_name=greeting_name)
+
+def _inline(text):
+    def link(match):
+        label, url = (match.group(1), match.group(2)) if match.group(2) else (match.group(3), match.group(3))
+        return f'<a href="{url}">{label}</a>'
+    return _BOLD_RE.sub(r"<strong>\1</strong>", _LINK_RE.sub(link, html.escape(text, quote=False)))
+
+def to_html(text):
+    """
+    Returns LLM text as email HTML, with code fences removed. HTML passes through;
+    plain text or light markdown (headings, bullets, bold, links) is escaped and
+    converted to paragraphs, lists and headings.
+    """
+    text = _FENCE_RE.sub("", str(text)).strip()
+    if _HTML_RE.search(text):
+        return text
+
+    blocks = []
+    paragraph, items = [], []
+
+    def flush():
+        if paragraph:
+            blocks.append("<p>" + "<br>\n".join(paragraph) + "</p>")
+            paragraph.clear()
+        if items:
+            blocks.append("<ul>\n" + "\n".join(f"<li>{item}</li>" for item in items) + "\n</ul>")
+            items.clear()
+
+    for line in text.splitlines():
+        heading = _HEADING_RE.match(line.strip())
+        bullet = _BULLET_RE.match(line)
+        if not line.strip():
+            flush()
+        elif _RULE_RE.match(line):
+            flush()
+            blocks.append("<hr>")
+        elif heading:
+            flush()
+            level = len(heading.group(1)) + 1 if heading.group(1) else 3
+            blocks.append(f"<h{level}>{_inline(heading.group(2) or heading.group(3))}</h{level}>")
+        elif bullet:
+            if paragraph:
+                flush()
+            items.append(_inline(bullet.group(1)))
+        else:
+            if items:
+                flush()
+            paragraph.append(_inline(line.strip()))
+    flush()
+    return "\n".join(blocks)
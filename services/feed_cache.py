@@ -0,0 +1,75 @@
+import logging
+import pickle
+import time
+from services.sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+class FeedCache(SQLiteStore):
+    """
+    On-disk cache of parsed feeds keyed by feed URL.
+
+    Stores the ETag / Last-Modified validators returned by the server together with
+    the parsed feed, or with the raw body of a streamed one, so the next request can
+    be conditional and a 304 reuses the stored feed without downloading it again.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS feeds (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            modified TEXT,
+            feed BLOB NOT NULL,
+            fetched_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path):
+        self.not_modified = 0
+        self.refreshed = 0
+
+        super().__init__(path)
+
+    def get(self, url):
+        """
+        Returns a dict with etag, modified, feed, body and fetched_at, or None.
+        Exactly one of feed (parsed) and body (raw bytes) is set.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, modified, feed, fetched_at FROM feeds WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            feed = pickle.loads(row[2])
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cached feed for {url}: {e}")
+            return None
+        body = feed if isinstance(feed, bytes) else None
+        return {"etag": row[0], "modified": row[1], "feed": None if body is not None else feed, "body": body,
+                "fetched_at": row[3]}
+
+    def put(self, url, feed, etag=None, modified=None):
+        """
+        feed is a parsed feed, or the raw body (bytes) to be parsed when it is replayed.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO feeds (url, etag, modified, feed, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (url, etag, modified, pickle.dumps(feed), time.time())
+            )
+            self._conn.commit()
+        self.refreshed += 1
+
+    def touch(self, url):
+        """
+        Marks a cached feed as confirmed fresh (after a 304).
+        """
+        with self._lock:
+            self._conn.execute("UPDATE feeds SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        self.not_modified += 1
+
+    def stats(self):
+        return {"not_modified": self.not_modified, "refreshed": self.refreshed}
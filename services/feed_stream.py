@@ -0,0 +1,93 @@
+import logging
+import time
+import xml.etree.ElementTree as ET
+from email.utils import parsedate_tz, mktime_tz
+
+import feedparser
+
+logger = logging.getLogger(__name__)
+
+def _local(tag):
+    # "{namespace}name" -> "name"
+    return tag.rsplit("}", 1)[-1]
+
+def _entry(item):
+    """
+    Converts an RSS <item> element into the same FeedParserDict shape feedparser
+    produces for the fields the fetcher uses.
+    """
+    entry = feedparser.FeedParserDict()
+    for child in item:
+        tag = _local(child.tag)
+        text = (child.text or "").strip()
+        if tag == "title":
+            entry["title"] = text
+        elif tag == "link":
+            entry["link"] = text
+        elif tag == "guid":
+            entry["id"] = text
+        elif tag == "description":
+            entry["summary"] = text
+        elif tag == "pubDate":
+            entry["published"] = text
+            parsed = parsedate_tz(text)
+            if parsed:
+                # feedparser normalizes dates to UTC struct_time
+                entry["published_parsed"] = time.gmtime(mktime_tz(parsed))
+        elif tag == "source":
+            entry["source"] = feedparser.FeedParserDict(title=text, href=child.get("url"))
+    return entry
+
+class FeedStream:
+    """
+    Incremental RSS reader over an iterable of byte chunks (e.g. response.iter_content()).
+
+    Entries are yielded as soon as their </item> has been read; parsed items are
+    cleared, so memory stays bounded by the entries actually consumed. Stopping
+    iteration early (or calling close()) stops reading the underlying stream.
+
+    stats: bytes read, entries yielded, and whether the stream was read to the end.
+    """
+
+    def __init__(self, chunks, on_close=None):
+        self._chunks = chunks
+        self._on_close = on_close
+        self._closed = False
+        self.bytes_read = 0
+        self.entries = 0
+        self.complete = False
+        self.error = None
+
+    def __iter__(self):
+        parser = ET.XMLPullParser(events=("start", "end"))
+        parents = []
+        try:
+            for chunk in self._chunks:
+                if not chunk:
+                    continue
+                self.bytes_read += len(chunk)
+                parser.feed(chunk)
+                for event, element in parser.read_events():
+                    if event == "start":
+                        parents.append(element)
+                        continue
+                    parents.pop()
+                    if _local(element.tag) == "item":
+                        self.entries += 1
+                        yield _entry(element)
+                        # Detach the finished item so the tree never grows with the feed
+                        if parents:
+                            parents[-1].remove(element)
+            parser.close()
+            self.complete = True
+        except ET.ParseError as e:
+            self.error = e
+            logger.warning(f"Feed stream parse error after {self.entries} entries: {e}")
+        finally:
+            self.close()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            if self._on_close is not None:
+                self._on_close()
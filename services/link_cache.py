@@ -0,0 +1,100 @@
+import logging
+import time
+from urllib.parse import urlparse
+from services.sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+# Redirector hosts front many publishers, so they never get a domain-level verdict
+REDIRECT_HOSTS = {"news.google.com"}
+
+class LinkCache(SQLiteStore):
+    """
+    On-disk cache of link validation results.
+
+    Positive and negative results have separate TTLs. Domains that keep failing
+    are remembered as dead/blocked for a while so their URLs are rejected without
+    a network round trip.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS links (
+            url TEXT PRIMARY KEY,
+            ok INTEGER NOT NULL,
+            checked_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS domains (
+            domain TEXT PRIMARY KEY,
+            failures INTEGER NOT NULL,
+            blocked_until REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path, positive_ttl=30 * 24 * 3600, negative_ttl=24 * 3600,
+                 domain_ttl=24 * 3600, domain_failure_threshold=3):
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.domain_ttl = domain_ttl
+        self.domain_failure_threshold = domain_failure_threshold
+
+        self.hits = 0
+        self.misses = 0
+        self.domain_hits = 0
+
+        super().__init__(path)
+
+    @staticmethod
+    def _domain(url):
+        return urlparse(url).netloc.lower()
+
+    def get(self, url):
+        """
+        Returns the cached verdict for url (True/False), or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT ok, checked_at FROM links WHERE url = ?", (url,)).fetchone()
+            if row is not None:
+                ok, checked_at = bool(row[0]), row[1]
+                ttl = self.positive_ttl if ok else self.negative_ttl
+                if now - checked_at < ttl:
+                    self.hits += 1
+                    return ok
+
+            domain = self._domain(url)
+            row = self._conn.execute("SELECT blocked_until FROM domains WHERE domain = ?", (domain,)).fetchone()
+            if row is not None and row[0] > now:
+                self.domain_hits += 1
+                logger.info(f"Skipping link check for {url}: domain {domain} is marked dead/blocked")
+                return False
+
+            self.misses += 1
+            return None
+
+    def put(self, url, ok, final_url=None):
+        """
+        Stores a verdict for url. Failures count against the publisher domain
+        (the final URL after redirects, when known); a success clears its record.
+        """
+        now = time.time()
+        domain = self._domain(final_url or url)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO links (url, ok, checked_at) VALUES (?, ?, ?)",
+                (url, int(ok), now)
+            )
+            if domain and domain not in REDIRECT_HOSTS:
+                if ok:
+                    self._conn.execute("DELETE FROM domains WHERE domain = ?", (domain,))
+                else:
+                    row = self._conn.execute("SELECT failures FROM domains WHERE domain = ?", (domain,)).fetchone()
+                    failures = (row[0] if row else 0) + 1
+                    blocked_until = now + self.domain_ttl if failures >= self.domain_failure_threshold else 0
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO domains (domain, failures, blocked_until) VALUES (?, ?, ?)",
+                        (domain, failures, blocked_until)
+                    )
+            self._conn.commit()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "domain_hits": self.domain_hits}
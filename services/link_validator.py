@@ -0,0 +1,96 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+class LinkValidator:
+    """
+    Validates a batch of URLs concurrently.
+
+    Checks run on a shared thread pool and borrow keep-alive sessions from a
+    small pool, so repeated requests to the same publisher reuse connections.
+    Each host gets its own concurrency cap and the whole batch is bounded by
+    an overall deadline; anything still pending at the deadline counts as invalid.
+    """
+
+    def __init__(self, max_workers=16, per_host_limit=4, deadline=20):
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.deadline = deadline
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="link-check")
+        self._sessions = queue.Queue()
+        for _ in range(max_workers):
+            self._sessions.put(self._new_session())
+
+        self._host_slots = {}
+        self._host_lock = threading.Lock()
+
+    def _new_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.per_host_limit)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _host_slot(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._host_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_slots[host]
+
+    @contextmanager
+    def session(self):
+        """
+        Borrows a pooled session for the duration of the block.
+        """
+        session = self._sessions.get()
+        try:
+            yield session
+        finally:
+            self._sessions.put(session)
+
+    def _check_one(self, url, check):
+        with self._host_slot(url):
+            with self.session() as session:
+                return check(url, session)
+
+    def validate(self, urls, check):
+        """
+        Runs check(url, session) for every URL concurrently.
+        Returns a dict mapping each URL to True/False.
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        if not unique_urls:
+            return {}
+
+        started = time.monotonic()
+        futures = {self._executor.submit(self._check_one, url, check): url for url in unique_urls}
+        done, pending = wait(futures, timeout=self.deadline)
+
+        results = {}
+        for future, url in futures.items():
+            if future in pending:
+                future.cancel()
+                logger.warning(f"Link validation deadline ({self.deadline}s) reached before checking {url}")
+                results[url] = False
+                continue
+            try:
+                results[url] = bool(future.result())
+            except Exception as e:
+                logger.warning(f"Link valid check error for {url}: {e}")
+                results[url] = False
+
+        elapsed = time.monotonic() - started
+        valid_count = sum(1 for ok in results.values() if ok)
+        logger.info(f"Validated {len(unique_urls)} links in {elapsed:.2f}s ({valid_count} valid)")
+        return results
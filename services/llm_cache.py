@@ -0,0 +1,73 @@
+import hashlib
+import json
+import logging
+import time
+from services.sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+class LLMCache(SQLiteStore):
+    """
+    Content-addressed cache of LLM outputs.
+
+    Entries are keyed by a hash of the model name and the fully rendered prompt
+    parts (task descriptions, injected context), so an identical rerun replays the
+    stored output instead of calling the provider again. Entries expire after
+    ttl seconds and the least recently used ones are evicted beyond max_entries.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            model TEXT,
+            output TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path, ttl=24 * 3600, max_entries=500):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        super().__init__(path)
+
+    @staticmethod
+    def make_key(model, *parts):
+        payload = json.dumps([model, *parts], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT output, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] >= self.ttl:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        self.hits += 1
+        return row[0]
+
+    def put(self, key, output, model=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, output, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, model, output, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM responses WHERE created_at <= ?", (now - self.ttl,))
+        self._conn.execute("""
+            DELETE FROM responses WHERE key NOT IN (
+                SELECT key FROM responses ORDER BY last_used DESC LIMIT ?
+            )
+        """, (self.max_entries,))
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,162 @@
+import logging
+import random
+import threading
+import time
+
+from services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# litellm / openai exception names worth retrying on the same provider
+RETRYABLE_ERRORS = {
+    "RateLimitError", "APIConnectionError", "ServiceUnavailableError", "InternalServerError",
+    "Timeout", "APITimeoutError",
+}
+
+def is_retryable(error):
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+def retry_after(error):
+    """
+    Seconds the provider asked us to wait (Retry-After header), or None.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after") or headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """
+    Refills at per_minute / 60 units per second, up to per_minute units.
+
+    reserve() takes the units immediately and returns how long the caller must
+    wait before using them, so concurrent callers queue in reservation order and
+    a single request bigger than the bucket still goes through (after a wait).
+    A per_minute of 0 means unlimited.
+    """
+
+    def __init__(self, per_minute, clock=time.monotonic):
+        self.per_minute = per_minute
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._level = float(per_minute)
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self._level = min(self.per_minute, self._level + (now - self._updated) * self.per_minute / 60)
+        self._updated = now
+
+    def reserve(self, amount):
+        if not self.per_minute:
+            return 0.0
+        with self._lock:
+            self._refill()
+            self._level -= amount
+            return 0.0 if self._level >= 0 else -self._level * 60 / self.per_minute
+
+    def charge(self, amount):
+        """
+        Takes units after the fact (e.g. completion tokens); later callers wait for them.
+        """
+        if self.per_minute:
+            with self._lock:
+                self._refill()
+                self._level -= amount
+
+class LLMScheduler:
+    """
+    Central gate for LLM calls.
+
+    Each (provider, model) gets a requests-per-minute and a tokens-per-minute
+    bucket from limits ({provider: {"rpm": n, "tpm": n}}, 0 = unlimited). Prompt
+    tokens are reserved before the call and completion tokens charged after it.
+    Retryable errors (rate limits, timeouts, 5xx) are retried with exponential
+    backoff and full jitter, honoring Retry-After; anything else, or the last
+    failed attempt, is raised so the caller can fail over to another provider.
+    """
+
+    def __init__(self, limits=None, max_retries=4, base_delay=1.0, max_delay=60.0,
+                 sleep=time.sleep, clock=time.monotonic):
+        self.limits = limits or {}
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._stats = {}
+
+    def _get(self, provider, model):
+        key = (provider, model)
+        with self._lock:
+            if key not in self._buckets:
+                limit = self.limits.get(provider, {})
+                self._buckets[key] = (TokenBucket(limit.get("rpm", 0), self._clock),
+                                      TokenBucket(limit.get("tpm", 0), self._clock))
+                self._stats[key] = {"calls": 0, "retries": 0, "errors": 0, "tokens_in": 0, "tokens_out": 0,
+                                    "wait_seconds": 0.0}
+            return self._buckets[key], self._stats[key]
+
+    def _backoff(self, attempt, error):
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        hinted = retry_after(error)
+        return max(delay, min(hinted, self.max_delay)) if hinted is not None else delay
+
+    def call(self, fn, provider=None, model=None, tokens_in=0, count_output=None):
+        """
+        Runs fn() within the limits of (provider, model). tokens_in is the prompt size;
+        count_output(result) returns the completion tokens to account for.
+        """
+        (rpm, tpm), stats = self._get(provider, model)
+        waited = 0.0
+        retries = 0
+        try:
+            for attempt in range(self.max_retries + 1):
+                delay = max(rpm.reserve(1), tpm.reserve(tokens_in))
+                if delay > 0:
+                    self._sleep(delay)
+                    waited += delay
+                try:
+                    result = fn()
+                except Exception as e:
+                    if attempt == self.max_retries or not is_retryable(e):
+                        with self._lock:
+                            stats["errors"] += 1
+                        raise
+                    backoff = self._backoff(attempt, e)
+                    logger.warning(f"LLM call to {provider}/{model} failed ({type(e).__name__}), "
+                                   f"retry {attempt + 1}/{self.max_retries} in {backoff:.1f}s")
+                    self._sleep(backoff)
+                    waited += backoff
+                    retries += 1
+                    continue
+
+                tokens_out = count_output(result) if count_output else 0
+                tpm.charge(tokens_out)
+                with self._lock:
+                    stats["tokens_in"] += tokens_in
+                    stats["tokens_out"] += tokens_out
+                return result
+        finally:
+            with self._lock:
+                stats["calls"] += 1
+                stats["retries"] += retries
+                stats["wait_seconds"] += waited
+            get_metrics().record("llm.schedule", waited, retries=retries)
+
+    def charge(self, provider, model, tokens_out):
+        """
+        Accounts completion tokens that arrived after call() returned (streamed responses).
+        """
+        (_, tpm), stats = self._get(provider, model)
+        tpm.charge(tokens_out)
+        with self._lock:
+            stats["tokens_out"] += tokens_out
+
+    def stats(self):
+        with self._lock:
+            return {f"{provider}/{model}": dict(entry) for (provider, model), entry in self._stats.items()}
@@ -2,43 +2,195 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
+import queue
+import threading
 import logging
+from services.metrics import get_metrics
 
 logger = logging.getLogger(__name__)
 
+def _is_connection_error(error):
+    """
+    True for errors after which the connection is unusable and the message should
+    be retried on a fresh one (drops, timeouts, 421 "service closing").
+    """
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code == 421
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+class _PooledConnection:
+    def __init__(self, server):
+        self.server = server
+        self.sent = 0
+
 class Mailer:
-    def __init__(self):
+    """
+    Sends emails over a small pool of persistent, authenticated SMTP connections.
+
+    Connections are opened lazily, reused across messages (and threads), recycled
+    after SMTP_MAX_MESSAGES_PER_CONNECTION messages, and re-established when the
+    server drops them. Call close() (or use the Mailer as a context manager) when done.
+    """
+
+    def __init__(self, pool_size=None, max_messages_per_connection=None):
         self.smtp_host = os.getenv("SMTP_HOST", "smtp.gmail.com")
         self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
         self.smtp_user = os.getenv("SMTP_USERNAME")
         self.smtp_password = os.getenv("SMTP_PASSWORD")
+        self.use_starttls = os.getenv("SMTP_STARTTLS", "true").lower() != "false"
+        self.pool_size = pool_size or int(os.getenv("SMTP_POOL_SIZE", "2"))
+        self.max_messages_per_connection = max_messages_per_connection or int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "50"))
+
+        self._idle = queue.Queue()
+        self._open_count = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _has_credentials(self):
+        return bool(self.smtp_user and self.smtp_password)
+
+    def _build_message(self, to_email, subject, html_body, text_body=None):
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = subject
+        msg["From"] = f"TirwinPulse <{self.smtp_user}>"
+        msg["To"] = to_email
+
+        if text_body:
+            part1 = MIMEText(text_body, "plain")
+            msg.attach(part1)
+
+        part2 = MIMEText(html_body, "html")
+        msg.attach(part2)
+        return msg
+
+    def _connect(self):
+        server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=30)
+        if self.use_starttls:
+            server.starttls()
+        server.login(self.smtp_user, self.smtp_password)
+        logger.info(f"Opened SMTP connection to {self.smtp_host}:{self.smtp_port}")
+        return _PooledConnection(server)
+
+    def _acquire(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                can_open = self._open_count < self.pool_size
+                if can_open:
+                    self._open_count += 1
+            if can_open:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._lock:
+                        self._open_count -= 1
+                    raise
+            # Pool is full: wait for a connection to be released (or discarded)
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue
+
+    def _release(self, conn):
+        if conn.sent >= self.max_messages_per_connection:
+            logger.info(f"SMTP connection reached {conn.sent} messages, recycling it")
+            self._discard(conn)
+        else:
+            self._idle.put(conn)
+
+    def _discard(self, conn):
+        try:
+            conn.server.quit()
+        except Exception:
+            pass
+        with self._lock:
+            self._open_count -= 1
+
+    def _send_message(self, to_email, msg):
+        """
+        Sends a prepared message on a pooled connection, reconnecting once if the
+        server dropped it.
+        """
+        payload = msg.as_string()
+        with get_metrics().stage("smtp.send", bytes=len(payload)) as record:
+            for attempt in (1, 2):
+                conn = self._acquire()
+                try:
+                    conn.server.sendmail(self.smtp_user, to_email, payload)
+                except Exception as e:
+                    if not _is_connection_error(e):
+                        # Refusals for this message leave the connection usable
+                        if isinstance(e, smtplib.SMTPException):
+                            self._idle.put(conn)
+                        else:
+                            self._discard(conn)
+                        raise
+                    self._discard(conn)
+                    if attempt == 2:
+                        raise
+                    logger.warning(f"SMTP connection lost ({e}), reconnecting")
+                    record["retries"] = record.get("retries", 0) + 1
+                    continue
+                conn.sent += 1
+                self._release(conn)
+                return
 
     def send_email(self, to_email, subject, html_body, text_body=None):
-        if not self.smtp_user or not self.smtp_password:
+        if not self._has_credentials():
             logger.warning("SMTP credentials not present. Skipping email send (dry run mode).")
             logger.info(f"Would have sent email to {to_email} with subject: {subject}")
             return False
 
         try:
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = f"TirwinPulse <{self.smtp_user}>"
-            msg["To"] = to_email
-
-            if text_body:
-                part1 = MIMEText(text_body, "plain")
-                msg.attach(part1)
-            
-            part2 = MIMEText(html_body, "html")
-            msg.attach(part2)
-
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.sendmail(self.smtp_user, to_email, msg.as_string())
-            
+            msg = self._build_message(to_email, subject, html_body, text_body)
+            self._send_message(to_email, msg)
+
             logger.info(f"Email sent successfully to {to_email}")
             return True
         except Exception as e:
             logger.error(f"Failed to send email to {to_email}: {e}")
             return False
+
+    def send_batch(self, messages):
+        """
+        Sends many messages over the pooled connections.
+        Each message is a dict with to_email, subject, html_body and optional text_body.
+        Returns one {"to_email", "sent", "error"} dict per message, in order.
+        """
+        outcomes = []
+        for message in messages:
+            to_email = message["to_email"]
+            if not self._has_credentials():
+                logger.info(f"Would have sent email to {to_email} with subject: {message['subject']}")
+                outcomes.append({"to_email": to_email, "sent": False, "error": "dry run (no SMTP credentials)"})
+                continue
+            try:
+                msg = self._build_message(to_email, message["subject"], message["html_body"], message.get("text_body"))
+                self._send_message(to_email, msg)
+                logger.info(f"Email sent successfully to {to_email}")
+                outcomes.append({"to_email": to_email, "sent": True, "error": None})
+            except Exception as e:
+                logger.error(f"Failed to send email to {to_email}: {e}")
+                outcomes.append({"to_email": to_email, "sent": False, "error": str(e)})
+        return outcomes
+
+    def close(self):
+        """
+        Closes all idle pooled connections.
+        """
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
@@ -0,0 +1,115 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Counters shown in the summary table, in column order
+COUNTERS = ("bytes", "tokens_in", "tokens_out", "cost_usd", "retries", "cache_hits", "errors")
+
+class RunMetrics:
+    """
+    Per-stage timings and counters (bytes, LLM tokens, retries, ...) for one run.
+
+    Stages may be entered concurrently from worker threads; each entry counts as a
+    call and adds its wall time, so "seconds" is busy time summed across threads
+    while the report's "wall_seconds" is the elapsed time of the whole run.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self.started_at = datetime.now()
+        self._started = time.monotonic()
+
+    def _entry(self, name):
+        entry = self._stages.get(name)
+        if entry is None:
+            entry = self._stages[name] = {"calls": 0, "seconds": 0.0, "max_seconds": 0.0}
+        return entry
+
+    def add(self, name, **counters):
+        """
+        Adds counters to a stage without counting a call.
+        """
+        with self._lock:
+            entry = self._entry(name)
+            for key, value in counters.items():
+                entry[key] = entry.get(key, 0) + value
+
+    def record(self, name, seconds, **counters):
+        """
+        Records one call of a stage that was timed by the caller.
+        """
+        with self._lock:
+            entry = self._entry(name)
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            for key, value in counters.items():
+                entry[key] = entry.get(key, 0) + value
+
+    @contextmanager
+    def stage(self, name, **counters):
+        """
+        Times one call of a stage. Yields a dict the caller can add counters to,
+        e.g. record["bytes"] = len(body). An exception counts as an error.
+        """
+        record = dict(counters)
+        started = time.monotonic()
+        try:
+            yield record
+        except Exception:
+            record["errors"] = record.get("errors", 0) + 1
+            raise
+        finally:
+            self.record(name, time.monotonic() - started, **record)
+
+    def report(self, **extra):
+        with self._lock:
+            stages = {name: dict(entry) for name, entry in sorted(self._stages.items())}
+        report = {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_seconds": round(time.monotonic() - self._started, 3),
+            "stages": stages,
+        }
+        report.update(extra)
+        return report
+
+    def summary_table(self):
+        stages = self.report()["stages"]
+        header = ["stage", "calls", "busy s", "max s"] + list(COUNTERS)
+        rows = [header]
+        for name, entry in stages.items():
+            rows.append([
+                name, str(entry["calls"]), f"{entry['seconds']:.2f}", f"{entry['max_seconds']:.2f}",
+                *(f"{entry[c]:g}" if c in entry else "-" for c in COUNTERS),
+            ])
+        widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+        lines = ["  ".join(cell.ljust(w) if i == 0 else cell.rjust(w) for i, (cell, w) in enumerate(zip(row, widths)))
+                 for row in rows]
+        lines.insert(1, "-" * len(lines[0]))
+        return "\n".join(lines)
+
+    def write(self, path, **extra):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.report(**extra), f, indent=2)
+
+_metrics = RunMetrics()
+
+def get_metrics():
+    """
+    Returns the process-wide metrics collector.
+    """
+    return _metrics
+
+def reset_metrics():
+    global _metrics
+    _metrics = RunMetrics()
+    return _metrics
@@ -1,52 +1,218 @@
 import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import feedparser
 import requests
 from datetime import datetime, timedelta
 import time
-from urllib.parse import quote
+from itertools import islice
+from urllib.parse import quote, urlsplit
 import logging
-import difflib
+from services.link_validator import LinkValidator
+from services.link_cache import LinkCache, REDIRECT_HOSTS
+from services.article_history import ArticleHistory
+from services.url_resolver import URLResolver, canonicalize, decode_google_news_url
+from services.title_index import TitleIndex
+from services.feed_cache import FeedCache
+from services.article_store import Article, ArticleStore, section_queries
+from services.metrics import get_metrics
+from services.feed_stream import FeedStream
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
+# Bytes per read when streaming or replaying a feed body
+FEED_CHUNK_SIZE = 16 * 1024
+
+class _Primed:
+    """
+    A lazy feed whose first entry has already been read.
+    """
+
+    def __init__(self, first, rest):
+        self._first = first
+        self._rest = rest
+
+    def __iter__(self):
+        yield self._first
+        yield from self._rest
+
+    def close(self):
+        if hasattr(self._rest, "close"):
+            self._rest.close()
+
 class NewsFetcher:
     # Class-level sets to persist across different tool instantiations
     _seen_urls = set()
     _seen_titles = set()
+    _title_index = TitleIndex(threshold=0.85)
+
+    # Shared validator so keep-alive connections survive across tool instantiations
+    _link_validator = None
+
+    # Persistent link validation cache (shared across topics and runs)
+    _link_cache = None
+
+    # Redirect link -> canonical publisher URL (persistent, shared across runs)
+    _url_resolver = None
+
+    # Articles mailed in earlier runs (persistent, shared across runs)
+    _article_history = None
+
+    # Feed cache for conditional GETs (ETag / Last-Modified)
+    _feed_cache = None
+
+    # Session for streamed feed downloads
+    _feed_session = None
+
+    # Max articles kept per topic
+    max_articles = 10
 
     def __init__(self):
         pass
 
-    def _is_link_valid(self, url):
+    @classmethod
+    def _get_link_validator(cls):
+        if cls._link_validator is None:
+            cls._link_validator = LinkValidator(
+                max_workers=int(os.getenv("LINK_CHECK_WORKERS", "16")),
+                per_host_limit=int(os.getenv("LINK_CHECK_PER_HOST", "4")),
+                deadline=float(os.getenv("LINK_CHECK_DEADLINE", "20"))
+            )
+        return cls._link_validator
+
+    @classmethod
+    def _get_link_cache(cls):
+        if cls._link_cache is None:
+            path = os.getenv("LINK_CACHE_PATH", ".cache/link_cache.sqlite")
+            if not path:
+                return None
+            cls._link_cache = LinkCache(
+                path,
+                positive_ttl=float(os.getenv("LINK_CACHE_POSITIVE_TTL_HOURS", "720")) * 3600,
+                negative_ttl=float(os.getenv("LINK_CACHE_NEGATIVE_TTL_HOURS", "24")) * 3600
+            )
+        return cls._link_cache
+
+    @classmethod
+    def link_cache_stats(cls):
+        """
+        Returns the hit/miss counters of the link cache (empty if disabled).
+        """
+        return cls._link_cache.stats() if cls._link_cache else {}
+
+    @classmethod
+    def _get_url_resolver(cls):
+        if cls._url_resolver is None:
+            path = os.getenv("URL_RESOLVER_PATH", ".cache/url_resolver.sqlite")
+            if not path:
+                return None
+            cls._url_resolver = URLResolver(path)
+        return cls._url_resolver
+
+    @classmethod
+    def url_resolver_stats(cls):
+        """
+        Returns the counters of the URL resolver (empty if disabled).
+        """
+        return cls._url_resolver.stats() if cls._url_resolver else {}
+
+    def _resolved_url(self, url):
+        """
+        Publisher URL for url (Google News redirects resolved when known), as it
+        should be mailed. Never touches the network.
+        """
+        resolver = self._get_url_resolver()
+        if resolver is not None:
+            return resolver.resolve(url)
+        return decode_google_news_url(url) or url
+
+    def _canonical_url(self, url):
+        """
+        Dedup key for url: the resolved publisher URL with tracking parameters stripped.
+        """
+        return canonicalize(self._resolved_url(url))
+
+    @classmethod
+    def get_article_history(cls):
+        """
+        Returns the persistent history of mailed articles (None if disabled).
+        """
+        if cls._article_history is None:
+            path = os.getenv("ARTICLE_HISTORY_PATH", ".cache/article_history.sqlite")
+            if not path:
+                return None
+            cls._article_history = ArticleHistory(
+                path,
+                retention=float(os.getenv("ARTICLE_HISTORY_RETENTION_DAYS", "30")) * 86400
+            )
+        return cls._article_history
+
+    def _is_link_valid(self, url, session=None):
         """
         Verifies if the link is accessible (returns 200 OK).
+        Results are served from the persistent link cache when fresh.
+        A pooled requests.Session can be passed in to reuse connections.
+        """
+        cache = self._get_link_cache()
+        if cache is not None:
+            cached = cache.get(url)
+            if cached is not None:
+                return cached
+
+        valid, final_url = self._check_link(url, session)
+
+        # Remember where a redirect link leads, so later runs check the publisher URL directly
+        resolver = self._get_url_resolver()
+        target = resolver.remember(url, final_url) if resolver is not None else None
+
+        if cache is not None:
+            cache.put(url, valid, final_url)
+            if target is not None:
+                cache.put(target, valid, final_url)
+        return valid
+
+    def _check_link(self, url, session=None):
+        """
+        Performs the network check for a link.
         Uses a short timeout to avoid slowing down the process too much.
+        Returns (is_valid, final_url) where final_url is the URL after redirects, if known.
         """
+        http = session or requests
         try:
             # We use a User-Agent to avoid being blocked by some servers that reject empty/bot UAs
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
             # Try HEAD first as it's lighter
-            response = requests.head(url, headers=headers, timeout=5, allow_redirects=True)
+            response = http.head(url, headers=headers, timeout=5, allow_redirects=True)
             
             # Some servers might not support HEAD or return 405 Method Not Allowed, retry with GET
             if response.status_code == 405:
-                response = requests.get(url, headers=headers, timeout=5, stream=True)
+                response = http.get(url, headers=headers, timeout=5, stream=True)
+                response.close()
                 
+            final_url = getattr(response, 'url', None)
+            if not isinstance(final_url, str):
+                final_url = None
+
             if response.status_code == 200:
-                return True
+                return True, final_url
             else:
                 logger.warning(f"Link valid check failed for {url}: Status {response.status_code}")
-                return False
+                return False, final_url
         except Exception as e:
             logger.warning(f"Link valid check error for {url}: {e}")
-            return False
+            return False, None
 
     def _is_duplicate(self, title, url):
         """
-        Checks if the article is a duplicate based on URL or fuzzy title matching.
+        Checks if the article is a duplicate based on URL or fuzzy title matching,
+        or was already mailed in a previous edition.
+        URLs are compared in canonical form (see _canonical_url).
         """
+        url = self._canonical_url(url)
+
         # 1. Check URL exact match
         if url in self._seen_urls:
             logger.info(f"Duplicate URL found: {url}")
@@ -57,79 +223,442 @@ class NewsFetcher:
             logger.info(f"Duplicate Title found: {title}")
             return True
 
-        # 3. Fuzzy Title Match
-        # Check against all seen titles for high similarity
-        # This might be slow if _seen_titles grows very large, but for a daily run it's fine.
-        for seen_title in self._seen_titles:
-            similarity = difflib.SequenceMatcher(None, title.lower(), seen_title.lower()).ratio()
-            if similarity > 0.85: # 85% similarity threshold
-                logger.info(f"Fuzzy duplicate found: '{title}' is similar to '{seen_title}' ({similarity:.2f})")
-                return True
+        # 3. Mailed in an earlier edition (indexed lookup by URL hash / normalized title)
+        history = self.get_article_history()
+        if history is not None and history.was_mailed(url, title):
+            logger.info(f"Already mailed in a previous edition: {title}")
+            return True
+
+        # 4. Fuzzy Title Match
+        # The trigram index only compares against titles that can clear the 85% similarity threshold.
+        match = self._title_index.find_similar(title)
+        if match:
+            seen_title, similarity = match
+            logger.info(f"Fuzzy duplicate found: '{title}' is similar to '{seen_title}' ({similarity:.2f})")
+            return True
 
         return False
 
+    def _validate_links(self, urls):
+        """
+        Validates a batch of URLs concurrently over the shared session pool.
+        Returns a dict mapping each URL to True/False.
+        """
+        return self._get_link_validator().validate(urls, self._is_link_valid)
+
     def _register_article(self, title, url):
         """
         Registers the article in the seen sets.
         """
-        self._seen_urls.add(url)
-        self._seen_titles.add(title)
+        self._seen_urls.add(self._canonical_url(url))
+        if title not in self._seen_titles:
+            self._seen_titles.add(title)
+            self._title_index.add(title)
+
+    def _rss_url(self, topic):
+        encoded_topic = quote(topic)
+        return f"https://news.google.com/rss/search?q={encoded_topic}&hl=en-US&gl=US&ceid=US:en"
+
+    @classmethod
+    def _get_feed_cache(cls):
+        if cls._feed_cache is None:
+            path = os.getenv("FEED_CACHE_PATH", ".cache/feed_cache.sqlite")
+            if not path:
+                return None
+            cls._feed_cache = FeedCache(path)
+        return cls._feed_cache
+
+    def _cached_feed(self, rss_url):
+        """
+        Looks rss_url up in the feed cache before a request.
+        Returns (cache, cached, headers); headers is None when the cached feed is still
+        within FEED_CACHE_MAX_AGE_MINUTES and no request is needed, otherwise the request
+        headers, conditional on the cached validators.
+        """
+        cache = self._get_feed_cache()
+        cached = cache.get(rss_url) if cache is not None else None
+        headers = {'User-Agent': 'Mozilla/5.0 (compatible; NewsCurator/1.0)'}
+
+        if cached:
+            max_age = float(os.getenv("FEED_CACHE_MAX_AGE_MINUTES", "0")) * 60
+            if time.time() - cached["fetched_at"] < max_age:
+                logger.info(f"Using cached feed for {rss_url} (fetched within {max_age / 60:.0f} min)")
+                get_metrics().add("fetch.download", cache_hits=1)
+                return cache, cached, None
+            if cached.get("etag"):
+                headers['If-None-Match'] = cached["etag"]
+            if cached.get("modified"):
+                headers['If-Modified-Since'] = cached["modified"]
+        return cache, cached, headers
+
+    def _not_modified(self, rss_url, cache):
+        logger.info(f"Feed not modified, reusing cached entries: {rss_url}")
+        cache.touch(rss_url)
+
+    def _store_feed(self, rss_url, cache, feed, headers):
+        lowered = {k.lower(): v for k, v in headers.items()}
+        try:
+            cache.put(rss_url, feed, etag=lowered.get('etag'), modified=lowered.get('last-modified'))
+        except Exception as e:
+            logger.warning(f"Failed to cache feed {rss_url}: {e}")
+
+    def _download_feed(self, rss_url, headers):
+        """
+        Downloads a feed over the shared session pool.
+        Returns (status, body, headers); status is None if the download failed.
+        """
+        with get_metrics().stage("fetch.download") as record:
+            try:
+                with self._get_link_validator().session() as session:
+                    response = session.get(rss_url, headers=headers, timeout=15)
+                if response.status_code == 304:
+                    record["cache_hits"] = 1
+                    return 304, None, dict(response.headers)
+                response.raise_for_status()
+                record["bytes"] = len(response.content)
+                return response.status_code, response.content, dict(response.headers)
+            except Exception as e:
+                logger.warning(f"Failed to download feed {rss_url}: {e}")
+                record["errors"] = 1
+                return None, None, {}
+
+    @classmethod
+    def _get_feed_session(cls):
+        if cls._feed_session is None:
+            size = int(os.getenv("FEED_FETCH_CONCURRENCY", "8"))
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=size, pool_maxsize=size))
+            session.mount("http://", HTTPAdapter(pool_connections=size, pool_maxsize=size))
+            cls._feed_session = session
+        return cls._feed_session
+
+    def _open_feed(self, rss_url):
+        """
+        Returns the entries of rss_url as a lazy iterable, parsed as the caller consumes it.
+
+        A fresh cached feed, or one confirmed by a 304, is replayed from the feed cache.
+        A 200 response is parsed incrementally as it arrives.
+        Feeds are read on a dedicated session so open streams never hold the sessions
+        link validation needs.
+        """
+        cache, cached, headers = self._cached_feed(rss_url)
+        if headers is None:
+            return self._cached_entries(cached)
+
+        with get_metrics().stage("fetch.download") as record:
+            try:
+                response = self._get_feed_session().get(rss_url, headers=headers, timeout=15, stream=True)
+                if response.status_code == 304 and cached:
+                    response.close()
+                    record["cache_hits"] = 1
+                    self._not_modified(rss_url, cache)
+                    return self._cached_entries(cached)
+                response.raise_for_status()
+            except Exception as e:
+                logger.warning(f"Failed to download feed {rss_url}: {e}")
+                record["errors"] = 1
+                return []
+
+        return self._stream_entries(rss_url, response, cache)
+
+    def _stream_entries(self, rss_url, response, cache=None):
+        """
+        Yields the entries of a streamed 200 response as they are parsed.
+
+        Parsing stops when the caller does. With a feed cache, the rest of the body is
+        then read as raw bytes, without parsing, and the whole body is stored with its
+        validators; a later 304 replays it through FeedStream, again only as far as needed.
+        """
+        source = response.iter_content(chunk_size=FEED_CHUNK_SIZE)
+        received = []
+
+        def chunks():
+            # The raw body is kept for the cache, or until the first entry for the
+            # feedparser fallback
+            for chunk in source:
+                if cache is not None or not stream.entries:
+                    received.append(chunk)
+                yield chunk
+
+        stream = FeedStream(chunks())
+        entries = iter(stream)
+        parsed = None
+        stopped = False
+        busy = 0.0
+        resumed = time.monotonic()
+        try:
+            for entry in entries:
+                busy += time.monotonic() - resumed
+                try:
+                    yield entry
+                except GeneratorExit:
+                    stopped = True
+                    raise
+                resumed = time.monotonic()
+            busy += time.monotonic() - resumed
+
+            if stream.error is not None and not stream.entries:
+                # Not parseable incrementally (e.g. HTML entities in raw XML): hand the
+                # body received so far, and the rest of it, to feedparser
+                body = b"".join(received) + b"".join(source)
+                # Only the entries are kept (a bozo exception does not pickle)
+                parsed = feedparser.FeedParserDict(entries=self._parse_feed(body, dict(response.headers)).entries)
+                yield from parsed.entries
+        finally:
+            entries.close()
+            drained = 0
+            complete = stream.complete
+            if cache is not None and stopped:
+                try:
+                    for chunk in source:
+                        received.append(chunk)
+                        drained += len(chunk)
+                    complete = True
+                except Exception as e:
+                    logger.warning(f"Failed to finish reading feed {rss_url}: {e}")
+            response.close()
+            get_metrics().record("fetch.stream", busy, bytes=stream.bytes_read + drained, entries=stream.entries)
+            logger.info(f"Parsed {stream.entries} entries ({stream.bytes_read} bytes) from {rss_url}"
+                        + (f", read the rest unparsed ({drained} bytes)" if drained else ""))
+
+            if cache is not None and parsed is not None:
+                self._store_feed(rss_url, cache, parsed, response.headers)
+            elif cache is not None and complete:
+                self._store_feed(rss_url, cache, b"".join(received), response.headers)
+
+    def _cached_entries(self, cached):
+        """
+        Entries of a cached feed. A stored raw body is parsed as the caller consumes it.
+        """
+        body = cached.get("body")
+        if body is None:
+            return cached["feed"].entries
+        return iter(FeedStream(body[i:i + FEED_CHUNK_SIZE] for i in range(0, len(body), FEED_CHUNK_SIZE)))
+
+    def _parse_feed(self, body, headers=None):
+        if body is None:
+            return feedparser.FeedParserDict(entries=[])
+        with get_metrics().stage("fetch.parse", bytes=len(body)):
+            return feedparser.parse(body, response_headers=headers or {})
+
+    def _load_feed(self, rss_url):
+        """
+        Returns the parsed feed for rss_url, going through the feed cache.
+        A 304 Not Modified reuses the stored entries without re-parsing (a raw body
+        stored by a streamed fetch is parsed once here).
+        """
+        cache, cached, headers = self._cached_feed(rss_url)
+        if headers is None:
+            return self._replayed_feed(cached)
+
+        status, body, response_headers = self._download_feed(rss_url, headers)
+        if status == 304 and cached:
+            self._not_modified(rss_url, cache)
+            return self._replayed_feed(cached)
+
+        feed = self._parse_feed(body, response_headers)
+        if cache is not None and body is not None:
+            self._store_feed(rss_url, cache, feed, response_headers)
+        return feed
+
+    def _replayed_feed(self, cached):
+        if cached.get("body") is None:
+            return cached["feed"]
+        return feedparser.FeedParserDict(entries=list(self._cached_entries(cached)))
+
+    @staticmethod
+    def _streaming():
+        return os.getenv("FEED_STREAMING", "true").lower() != "false"
+
+    def _feed_entries(self, rss_url):
+        """
+        Entries for rss_url: streamed (default) or fully downloaded and parsed.
+        """
+        if self._streaming():
+            return self._open_feed(rss_url)
+        return self._load_feed(rss_url).entries
 
     def fetch_news(self, topic, lookback_hours=48):
         """
         Fetches news for a given topic using Google News RSS.
         """
-        encoded_topic = quote(topic)
-        rss_url = f"https://news.google.com/rss/search?q={encoded_topic}&hl=en-US&gl=US&ceid=US:en"
+        rss_url = self._rss_url(topic)
         
         logger.info(f"Fetching news for topic: {topic} from {rss_url}")
         
-        feed = feedparser.parse(rss_url)
-        
-        articles = []
-        cutoff_time = datetime.now() - timedelta(hours=lookback_hours)
+        return self._select_articles(topic, self._feed_entries(rss_url), lookback_hours)
 
-        if not feed.entries:
-            logger.warning(f"No entries found for topic: {topic}")
+    async def fetch_news_many_async(self, topics, lookback_hours=48, concurrency=8):
+        """
+        Fetches several topics concurrently.
+
+        Feeds are opened (or downloaded and parsed) in worker threads, off the event loop;
+        dedup and link validation then run once, in the order the topics were given, so
+        the result does not depend on which download finished first. Streamed feeds are
+        read during that pass, only as far as each topic's quota needs.
+        Returns a dict mapping each topic to its list of articles.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def load(topic):
+            rss_url = self._rss_url(topic)
+            async with semaphore:
+                logger.info(f"Fetching news for topic: {topic} from {rss_url}")
+                entries = await asyncio.to_thread(self._feed_entries, rss_url)
+                if not isinstance(entries, list):
+                    # Wait for the response headers here, concurrently; the body is read later
+                    entries = await asyncio.to_thread(self._prime, entries)
+                return entries
+
+        unique_topics = list(dict.fromkeys(topics))
+        feeds = await asyncio.gather(*(load(topic) for topic in unique_topics))
+
+        results = {}
+        for topic, entries in zip(unique_topics, feeds):
+            # One topic at a time, in order, but parsing streamed feeds off the event loop
+            results[topic] = await asyncio.to_thread(self._select_articles, topic, entries, lookback_hours)
+        return results
+
+    @staticmethod
+    def _prime(entries):
+        """
+        Reads the first entry of a lazy feed, so connection setup and time-to-first-byte
+        overlap across topics. Returns an iterable that still yields every entry.
+        """
+        iterator = iter(entries)
+        try:
+            first = next(iterator)
+        except StopIteration:
             return []
+        return _Primed(first, iterator)
 
-        for entry in feed.entries:
-            title = entry.title
-            url = entry.link
-            
-            # Deduplication
-            if self._is_duplicate(title, url):
-                continue
-            
-            # Time filtering
-            published_parsed = entry.get('published_parsed')
-            if published_parsed:
-                published_dt = datetime.fromtimestamp(time.mktime(published_parsed))
-                if published_dt < cutoff_time:
-                    continue
-            
+    def fetch_news_many(self, topics, lookback_hours=48):
+        """
+        Synchronous wrapper around fetch_news_many_async.
+        """
+        concurrency = int(os.getenv("FEED_FETCH_CONCURRENCY", "8"))
+        coro = self.fetch_news_many_async(topics, lookback_hours, concurrency)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        # Called from inside an event loop (e.g. an async tool runner): use a private loop
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coro).result()
+
+    def build_article_store(self, sections, lookback_hours=48):
+        """
+        Fetches every section's keyword queries in one concurrent pass and returns
+        an ArticleStore of typed records tagged with the section that found them.
+        """
+        store = ArticleStore(sections)
+        plan = [(section, query) for section in store.sections for query in section_queries(section)]
+        results = self.fetch_news_many([query for _, query in plan], lookback_hours)
+
+        for section, query in plan:
+            for art in results.get(query, []):
+                store.add(Article(
+                    title=art["title"],
+                    url=art["url"],
+                    source=art["source"],
+                    date=art["date"],
+                    content=art["content"] or "",
+                    section=section["name"]
+                ))
+
+        logger.info(f"Article store built: {len(store)} articles across {len(store.sections)} sections")
+        return store
+
+    def _candidates(self, entries, cutoff_time):
+        """
+        Lazily yields the entries that pass dedup and time filtering.
+        """
+        dedup_seconds = 0.0
+        try:
+            for entry in entries:
+                started = time.monotonic()
+                # Validate and keep the publisher URL when the redirect is already resolved
+                resolved = self._resolved_url(entry.link)
+                if urlsplit(resolved).hostname not in REDIRECT_HOSTS:
+                    entry["link"] = resolved
+
+                # Deduplication
+                keep = not self._is_duplicate(entry.title, entry.link)
+
+                # Time filtering
+                published_parsed = entry.get('published_parsed')
+                if keep and published_parsed:
+                    published_dt = datetime.fromtimestamp(time.mktime(published_parsed))
+                    keep = published_dt >= cutoff_time
+                dedup_seconds += time.monotonic() - started
+
+                if keep:
+                    yield entry
+        finally:
+            get_metrics().record("fetch.dedup", dedup_seconds)
+
+    def _select_articles(self, topic, entries, lookback_hours):
+        """
+        Applies dedup, time filtering and link validation to feed entries.
+
+        entries may be a lazy stream: it is consumed only until the quota is met and
+        then closed, so the rest of the feed is never read or parsed.
+        """
+        articles = []
+        cutoff_time = datetime.now() - timedelta(hours=lookback_hours)
+
+        # Dedup and time filtering first; only the survivors are worth a network check.
+        candidates = self._candidates(entries, cutoff_time)
+        found_any = False
+        try:
             # Link Validation
-            # NOTE: Doing this sequentially for every potential article can be slow.
-            # We might want to only validate the ones we are about to keep?
-            # Current logic: Validate before adding.
-            if not self._is_link_valid(url):
-                continue
-
-            # If all checks pass, register and add
-            self._register_article(title, url)
-            
-            articles.append({
-                "title": title,
-                "url": url,
-                "source": entry.source.title if hasattr(entry, 'source') else "Unknown",
-                "date": entry.published,
-                "content": entry.summary if hasattr(entry, 'summary') else title
-            })
-            
-            # Limit to top 10 per topic
-            if len(articles) >= 10:
-                break
-                
+            # Candidates are validated concurrently in waves sized to the remaining quota,
+            # then kept in feed order so the result matches a sequential pass.
+            while len(articles) < self.max_articles:
+                wave_size = 2 * (self.max_articles - len(articles))
+                wave = list(islice(candidates, wave_size))
+                if not wave:
+                    break
+                found_any = True
+                with get_metrics().stage("fetch.validate") as record:
+                    validity = self._validate_links([entry.link for entry in wave])
+                    record["errors"] = sum(1 for ok in validity.values() if not ok)
+
+                for entry in wave:
+                    title = entry.title
+
+                    if not validity.get(entry.link):
+                        continue
+
+                    # Validation may have just resolved a redirect link
+                    url = self._resolved_url(entry.link)
+
+                    # Re-check against articles registered earlier in this pass
+                    if self._is_duplicate(title, url):
+                        continue
+
+                    # If all checks pass, register and add
+                    self._register_article(title, url)
+
+                    articles.append({
+                        "title": title,
+                        "url": url,
+                        "source": entry.source.title if hasattr(entry, 'source') else "Unknown",
+                        "date": entry.published,
+                        "content": entry.summary if hasattr(entry, 'summary') else title
+                    })
+
+                    # Limit to top 10 per topic
+                    if len(articles) >= self.max_articles:
+                        break
+        finally:
+            # Stops reading a streamed feed once the quota is met
+            candidates.close()
+            if hasattr(entries, "close"):
+                entries.close()
+
+        if not found_any:
+            logger.warning(f"No new entries found for topic: {topic}")
         logger.info(f"Found {len(articles)} unique & valid articles for {topic}")
         return articles
 
@@ -167,16 +696,24 @@ class NewsFetcher:
                 logger.warning(f"No articles key in GNews response for {topic}")
                 return []
 
-            for entry in data["articles"]:
+            # Deduplication
+            candidates = [
+                entry for entry in data["articles"]
+                if not self._is_duplicate(entry["title"], entry["url"])
+            ]
+
+            # Link Validation (concurrent)
+            validity = self._validate_links([entry["url"] for entry in candidates])
+
+            for entry in candidates:
                 title = entry["title"]
-                url = entry["url"]
 
-                # Deduplication
-                if self._is_duplicate(title, url):
+                if not validity.get(entry["url"]):
                     continue
+                url = self._resolved_url(entry["url"])
 
-                # Link Validation
-                if not self._is_link_valid(url):
+                # Re-check against articles registered earlier in this pass
+                if self._is_duplicate(title, url):
                     continue
                 
                 # Register
@@ -0,0 +1,70 @@
+import os
+import threading
+import logging
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+from services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+class EmailRenderer:
+    """
+    Jinja environment built once per template directory.
+
+    Compiled templates stay in memory (and in an on-disk bytecode cache across
+    runs); a template is only re-read and recompiled when its file changes.
+    """
+
+    def __init__(self, template_dir, bytecode_cache_dir=None):
+        bytecode_cache = None
+        if bytecode_cache_dir:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+
+        self.env = Environment(
+            loader=FileSystemLoader(template_dir),
+            auto_reload=True,
+            bytecode_cache=bytecode_cache
+        )
+
+    def render(self, template_name, context):
+        return self.env.get_template(template_name).render(context)
+
+_renderers = {}
+_renderers_lock = threading.Lock()
+
+def get_renderer(template_dir):
+    """
+    Returns the shared renderer for template_dir, creating it on first use.
+    """
+    key = os.path.abspath(template_dir)
+    with _renderers_lock:
+        if key not in _renderers:
+            cache_dir = os.getenv("TEMPLATE_CACHE_DIR", ".cache/jinja")
+            _renderers[key] = EmailRenderer(template_dir, bytecode_cache_dir=cache_dir or None)
+        return _renderers[key]
+
+def render_email(template_path, context):
+    renderer = get_renderer(os.path.dirname(template_path))
+    with get_metrics().stage("render") as record:
+        html = renderer.render(os.path.basename(template_path), context)
+        record["bytes"] = len(html)
+    return html
+
+class EmailShell:
+    """
+    A template rendered once around a marker body; fill() then only concatenates,
+    so a streamed body can be wrapped without another template pass per message.
+    """
+    BODY_MARKER = "<!--email-body-->"
+
+    def __init__(self, template_path, context):
+        html = render_email(template_path, dict(context, body=self.BODY_MARKER))
+        if html.count(self.BODY_MARKER) != 1:
+            raise ValueError(f"{template_path} must output the body exactly once")
+        self.head, self.tail = html.split(self.BODY_MARKER)
+
+    def fill(self, body):
+        with get_metrics().stage("render") as record:
+            html = self.head + body + self.tail
+            record["bytes"] = len(html)
+        return html
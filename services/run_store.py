@@ -0,0 +1,117 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from services.article_store import ArticleStore
+
+logger = logging.getLogger(__name__)
+
+def _slug(value):
+    """
+    Filesystem-safe name with a short hash, so distinct values never collide.
+    """
+    text = value if isinstance(value, str) else repr(value)
+    readable = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:40]
+    return f"{readable}-{hashlib.sha1(text.encode('utf-8')).hexdigest()[:8]}"
+
+def _digest_dir(digest):
+    if digest is None:
+        return ""
+    return hashlib.sha1(digest.encode("utf-8")).hexdigest()[:12] + "/"
+
+class RunStore:
+    """
+    Checkpoints each stage of a run under <root>/<run_id>/ so a failed run can be
+    resumed without redoing finished work:
+
+        run.json                 run options (e.g. fast mode)
+        articles.json            fetched article store
+        desks/<desk>.txt         per-desk analyses
+        master_digest.html       editor output
+        segments/<digest>/<segment>.html  personalized content per recipient segment
+        recipients/<digest>/<email>.html  final rendered email per recipient
+        status.json              send status per recipient email
+
+    Segment and recipient checkpoints are kept under a hash of the master digest
+    they were made from, so a resumed run that produces a new digest (e.g. after
+    the research fell back) never mails content built from the old one.
+
+    Writes are atomic (temp file + rename), so a crash never leaves a half-written
+    checkpoint behind.
+    """
+
+    def __init__(self, root, run_id=None, resume=False):
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(root, self.run_id)
+        if resume and not os.path.isdir(self.path):
+            raise FileNotFoundError(f"No run directory to resume at {self.path}")
+        os.makedirs(self.path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._status = self.read_json("status.json") or {}
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def has(self, name):
+        return os.path.exists(self._file(name))
+
+    def read_text(self, name):
+        try:
+            with open(self._file(name), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write_text(self, name, text):
+        path = self._file(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def read_json(self, name):
+        text = self.read_text(name)
+        return json.loads(text) if text is not None else None
+
+    def write_json(self, name, data):
+        self.write_text(name, json.dumps(data, indent=2))
+
+    def load_articles(self):
+        data = self.read_json("articles.json")
+        if data is None:
+            return None
+        logger.info(f"Using {len(data['articles'])} checkpointed articles from run {self.run_id}")
+        return ArticleStore.from_dict(data)
+
+    def save_articles(self, store):
+        self.write_json("articles.json", store.to_dict())
+
+    # Stage-specific names
+    @staticmethod
+    def desk_name(desk):
+        return f"desks/{_slug(desk)}.txt"
+
+    @staticmethod
+    def segment_name(key, digest=None):
+        return f"segments/{_digest_dir(digest)}{_slug(key)}.html"
+
+    @staticmethod
+    def recipient_name(recipient, digest=None):
+        return f"recipients/{_digest_dir(digest)}{_slug(recipient['email'])}.html"
+
+    def was_sent(self, recipient):
+        with self._lock:
+            return self._status.get(recipient["email"], {}).get("sent", False)
+
+    def mark_sent(self, recipient, sent, error=None):
+        with self._lock:
+            self._status[recipient["email"]] = {
+                "sent": bool(sent),
+                "error": error,
+                "at": datetime.now().isoformat(timespec="seconds"),
+            }
+            self.write_json("status.json", self._status)
@@ -0,0 +1,74 @@
+import functools
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Stands in for the recipient's name in segment-level personalization output
+NAME_PLACEHOLDER = "[[RECIPIENT_NAME]]"
+
+# Recipient fields that change what the personalization LLM writes
+PROFILE_FIELDS = ("role", "interests", "tone")
+
+def segment_key(recipient):
+    """
+    Returns a hashable key shared by recipients who would get identical LLM output.
+    """
+    key = []
+    for field in PROFILE_FIELDS:
+        value = recipient.get(field)
+        if isinstance(value, list):
+            value = tuple(value)
+        key.append(value)
+    return tuple(key)
+
+def segment_profile(recipient):
+    """
+    Returns the recipient profile used for the segment's LLM pass: the
+    personalization fields plus a placeholder name.
+    """
+    profile = {field: recipient.get(field) for field in PROFILE_FIELDS}
+    profile["name"] = NAME_PLACEHOLDER
+    return profile
+
+def group_recipients(recipients):
+    """
+    Groups recipients by segment, keeping first-seen order.
+    Returns a list of (key, members).
+    """
+    segments = {}
+    for recipient in recipients:
+        segments.setdefault(segment_key(recipient), []).append(recipient)
+    return list(segments.items())
+
+@functools.lru_cache(maxsize=256)
+def _warn_no_placeholder(content):
+    # Cached per body, so a segment shared by many recipients warns once
+    logger.warning("Segment output has no name placeholder; its recipients get it unchanged")
+
+def apply_recipient(content, recipient, expect_placeholder=True):
+    """
+    Cheap per-person step: fills the recipient's name into segment output.
+    expect_placeholder=False (e.g. master-digest-only sends) skips the missing-placeholder warning.
+    """
+    if expect_placeholder and NAME_PLACEHOLDER not in content:
+        _warn_no_placeholder(content)
+    return content.replace(NAME_PLACEHOLDER, recipient["name"])
+
+def parse_intros(text, keys):
+    """
+    Extracts {key: intro HTML} from a batched personalization reply: a JSON object,
+    possibly fenced or surrounded by prose. Unknown keys and empty values are dropped.
+    """
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        return {}
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        logger.warning("Batch personalization reply is not valid JSON")
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {key: value.strip() for key, value in data.items()
+            if key in keys and isinstance(value, str) and value.strip()}
@@ -0,0 +1,24 @@
+import os
+import sqlite3
+import threading
+
+class SQLiteStore:
+    """
+    Base for the on-disk caches: one SQLite connection shared by every thread and
+    serialized with self._lock. The tables in SCHEMA are created when the store is
+    opened. Use ":memory:" as the path for a throwaway store (e.g. in tests).
+    """
+
+    # CREATE ... IF NOT EXISTS statements, run as one script
+    SCHEMA = ""
+
+    def __init__(self, path):
+        self.path = path
+
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(self.SCHEMA)
+        self._conn.commit()
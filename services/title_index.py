@@ -0,0 +1,168 @@
+import difflib
+import math
+from collections import Counter
+from itertools import chain
+
+class TitleIndex:
+    """
+    Near-duplicate index for article titles.
+
+    Answers "is there a seen title whose difflib ratio with this one is above the
+    threshold?" with the same results as comparing against every seen title, but
+    only runs SequenceMatcher on a handful of candidates.
+
+    If two strings of lengths la + lb = T have ratio 2M/T > threshold, their M
+    matching characters sit in at most (T - 2M + 1) blocks, so at least
+    5M - 2T - 2 trigrams of the query lie inside a block and also occur in the
+    other string. Measured from the middle of each string, a block's copy is
+    shifted by at most T - 2M (in doubled positions), so trigrams are indexed by
+    that position bucket and a query only probes the buckets inside the window.
+
+    Shared trigrams are counted for all seen titles at once from the posting
+    lists. Titles that reach the minimum count for their length then need a
+    longest common subsequence of at least M (it bounds what SequenceMatcher
+    can match), computed bit-parallel for all of them together; only the
+    survivors are compared. Titles so short that they may match without any
+    shared trigram are kept in length buckets and scanned directly.
+    """
+
+    # Width, in characters, of the trigram position buckets
+    BUCKET = 8
+
+    def __init__(self, threshold=0.85):
+        self.threshold = threshold
+        self._titles = []           # original titles, by id
+        self._lowered = []          # lowercased titles, by id
+        self._masks = []            # character -> bitmask of its positions (lane bytes), by id
+        self._lanes = []            # all-ones lane bytes, by id
+        self._postings = {}         # (trigram, bucket of doubled offset from the middle) -> list of ids
+        self._by_length = {}        # length -> ids, for titles short enough to share no trigram
+
+    def __len__(self):
+        return len(self._titles)
+
+    def _min_matches(self, total_length):
+        """
+        Smallest number of matching characters that clears the threshold.
+        """
+        # Rounded down a hair so float error can only widen the search
+        return math.ceil(self.threshold * total_length / 2 - 1e-9)
+
+    def _min_shared(self, total_length):
+        """
+        Lower bound on in-block trigrams shared by a pair above the threshold.
+        """
+        return 5 * self._min_matches(total_length) - 2 * total_length - 2
+
+    def _length_range(self, length):
+        """
+        Partner lengths that can clear the threshold on length alone.
+        """
+        low = math.floor(length * self.threshold / (2 - self.threshold))
+        high = math.ceil(length * (2 - self.threshold) / self.threshold)
+        return range(low, high + 1)
+
+    def add(self, title):
+        lowered = title.lower()
+        title_id = len(self._titles)
+
+        self._titles.append(title)
+        self._lowered.append(lowered)
+        # Byte-aligned lanes leave at least one zero guard bit above the title
+        width = len(lowered) // 8 + 1
+        masks = {}
+        for i, char in enumerate(lowered):
+            masks[char] = masks.get(char, 0) | 1 << i
+        self._masks.append({char: bits.to_bytes(width, "little") for char, bits in masks.items()})
+        self._lanes.append(((1 << len(lowered)) - 1).to_bytes(width, "little"))
+        for i in range(len(lowered) - 2):
+            ids = self._postings.setdefault((lowered[i:i + 3], (2 * i - len(lowered)) // (2 * self.BUCKET)), [])
+            if not ids or ids[-1] != title_id:
+                ids.append(title_id)
+
+        # Short titles may match with zero shared trigrams; they are scanned directly.
+        if any(self._min_shared(len(lowered) + la) < 1 for la in self._length_range(len(lowered))):
+            self._by_length.setdefault(len(lowered), []).append(title_id)
+
+    def _candidates(self, query):
+        """
+        Ids of seen titles that pass the length, shared trigram and common
+        subsequence bounds, in insertion order.
+        """
+        la = len(query)
+        # Per partner length: matching characters needed, and in-block trigrams implied
+        matches = {lb: self._min_matches(la + lb) for lb in self._length_range(la)}
+        min_shared = {lb: 5 * m - 2 * (la + lb) - 2 for lb, m in matches.items()}
+
+        # Largest shift of a block, in doubled positions from the middle of each title
+        span = max(la + lb - 2 * m for lb, m in matches.items())
+
+        postings = self._postings
+        bucket_width = 2 * self.BUCKET
+        counts = Counter(chain.from_iterable(
+            postings.get((query[i:i + 3], bucket), ())
+            for i in range(la - 2)
+            for bucket in range((2 * i - la - span) // bucket_width, (2 * i - la + span) // bucket_width + 1)
+        ))
+
+        needed = min(min_shared.values())
+        candidates = set()
+        for title_id, shared in counts.most_common():
+            if shared < needed:
+                break
+            if shared >= min_shared.get(len(self._lowered[title_id]), shared + 1):
+                candidates.add(title_id)
+        for lb, shared in min_shared.items():
+            if shared < 1:
+                candidates.update(self._by_length.get(lb, ()))
+
+        candidates = sorted(candidates)
+        return [
+            title_id for title_id, common in zip(candidates, self._lcs(query, candidates))
+            if common >= matches[len(self._lowered[title_id])]
+        ]
+
+    def _lcs(self, query, ids):
+        """
+        Lengths of the longest common subsequence of query and each seen title in
+        ids: an upper bound on the characters SequenceMatcher can match.
+
+        Bit-parallel (Allison-Dix) for all titles at once: each title has its own
+        byte-aligned lane in one integer, and the zero guard bits above every
+        title absorb the carries of the addition.
+        """
+        lanes = [self._lanes[title_id] for title_id in ids]
+        zeros = [bytes(len(lane)) for lane in lanes]
+        masks = {}
+        for char in set(query):
+            masks[char] = int.from_bytes(b"".join([
+                self._masks[title_id].get(char, zero) for title_id, zero in zip(ids, zeros)
+            ]), "little")
+
+        full = int.from_bytes(b"".join(lanes), "little")
+        row = full
+        for char in query:
+            matched = row & masks[char]
+            row = ((row + matched) | (row - matched)) & full
+
+        packed = row.to_bytes(sum(len(lane) for lane in lanes), "little")
+        common = []
+        start = 0
+        for title_id, lane in zip(ids, lanes):
+            end = start + len(lane)
+            common.append(len(self._lowered[title_id]) - int.from_bytes(packed[start:end], "little").bit_count())
+            start = end
+        return common
+
+    def find_similar(self, title):
+        """
+        Returns (seen_title, ratio) for the first seen title above the threshold,
+        or None.
+        """
+        query = title.lower()
+        for title_id in self._candidates(query):
+            similarity = difflib.SequenceMatcher(None, query, self._lowered[title_id]).ratio()
+            if similarity > self.threshold:
+                return self._titles[title_id], similarity
+
+        return None
@@ -0,0 +1,165 @@
+import html
+import logging
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+_LINK_RE = re.compile(r"<a\s[^>]*href=[\"']([^\"']+)[\"'][^>]*>(.*?)</a>", re.IGNORECASE | re.DOTALL)
+_BLOCK_TAG_RE = re.compile(r"<\s*(br|/p|/li|/h[1-6]|/div|/tr|hr)\b[^>]*>", re.IGNORECASE)
+_TAG_RE = re.compile(r"<[^>]+>")
+_INLINE_SPACE_RE = re.compile(r"[ \t\xa0]+")
+_TAG_SPLIT_RE = re.compile(r"(<[^>]*>)")
+
+_encodings = {}
+_encodings_lock = threading.Lock()
+
+def _encoding(model=None):
+    """
+    Returns a tiktoken encoding for model (cl100k_base if unknown), or None if
+    tiktoken is unavailable.
+    """
+    with _encodings_lock:
+        if model not in _encodings:
+            try:
+                import tiktoken
+                try:
+                    _encodings[model] = tiktoken.encoding_for_model(model.split("/")[-1]) if model else tiktoken.get_encoding("cl100k_base")
+                except KeyError:
+                    _encodings[model] = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                logger.warning(f"tiktoken unavailable ({e}); estimating tokens from length")
+                _encodings[model] = None
+        return _encodings[model]
+
+def count_tokens(text, model=None):
+    encoding = _encoding(model)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+def strip_html(text):
+    """
+    Converts HTML to compact plain text, keeping link targets and line structure.
+    """
+    text = _LINK_RE.sub(lambda m: f"{m.group(2)} ({m.group(1)})", text)
+    text = _BLOCK_TAG_RE.sub("\n", text)
+    text = html.unescape(_TAG_RE.sub("", text))
+    lines = [_INLINE_SPACE_RE.sub(" ", line).strip() for line in text.splitlines()]
+    return "\n".join(line for line in lines if line)
+
+def dedupe_lines(text):
+    """
+    Drops repeated non-trivial lines (boilerplate that every section repeats).
+    """
+    seen = set()
+    kept = []
+    for line in text.splitlines():
+        key = line.strip().lower()
+        if len(key) > 20 and key in seen:
+            continue
+        seen.add(key)
+        kept.append(line)
+    return "\n".join(kept)
+
+def truncate_long_lines(text, max_chars):
+    """
+    Shortens long lines (article content summaries); lines with URLs are kept whole.
+    In HTML only the text between tags is shortened, so the markup stays intact.
+    """
+    def shorten(run):
+        lines = []
+        for line in run.split("\n"):
+            if len(line) > max_chars and "http" not in line:
+                line = line[:max_chars].rsplit(" ", 1)[0] + "..."
+            lines.append(line)
+        return "\n".join(lines)
+
+    parts = _TAG_SPLIT_RE.split(text)
+    return "".join(part if i % 2 else shorten(part) for i, part in enumerate(parts))
+
+class TokenBudget:
+    """
+    Measures the prompts the crew sends and keeps injected inputs under per-task
+    token budgets.
+
+    Oversized inputs are compacted step by step (HTML stripping, boilerplate
+    dedup, shortening long summaries, and finally truncation) until they fit.
+    Inputs of LOSSLESS_TASKS (whole digests and desk reports, where every story
+    must survive) only get dedup and summary shortening; if that is not enough
+    they are sent over budget with a warning.
+    Tokens before and after are recorded so the run can report what was saved.
+    """
+
+    DEFAULT_BUDGETS = {"desk": 3000, "editor": 6000, "personalize": 6000}
+    LOSSLESS_TASKS = {"editor", "personalize"}
+
+    def __init__(self, budgets=None, model=None):
+        self.budgets = dict(self.DEFAULT_BUDGETS)
+        self.budgets.update(budgets or {})
+        self.model = model
+        self._lock = threading.Lock()
+        self.prompt_tokens = {}     # task -> tokens sent (after compaction)
+        self.saved_tokens = {}      # task -> tokens removed by compaction
+
+    def count(self, text):
+        return count_tokens(text, self.model)
+
+    def _record(self, table, task, tokens):
+        with self._lock:
+            table[task] = table.get(task, 0) + tokens
+
+    def measure(self, task, prompt):
+        """
+        Records the size of a prompt about to be sent and returns its token count.
+        """
+        tokens = self.count(prompt)
+        self._record(self.prompt_tokens, task, tokens)
+        return tokens
+
+    def fit(self, task, text):
+        """
+        Returns text compacted to the task's budget (unchanged if it already fits).
+        """
+        budget = self.budgets.get(task)
+        original = self.count(text)
+        if budget is None or original <= budget:
+            return text
+
+        lossless = task in self.LOSSLESS_TASKS
+        steps = [
+            dedupe_lines,
+            lambda t: truncate_long_lines(t, 400),
+            lambda t: truncate_long_lines(t, 200),
+        ]
+        if not lossless:
+            steps.insert(0, strip_html)
+        compacted = text
+        tokens = original
+        for step in steps:
+            compacted = step(compacted)
+            tokens = self.count(compacted)
+            if tokens <= budget:
+                break
+
+        if tokens > budget and lossless:
+            logger.warning(f"{task} input is {tokens} tokens after compaction, over its budget of {budget}; "
+                           f"sending it without cutting content")
+        elif tokens > budget:
+            # Last resort: keep the head of the text, cut at a line boundary
+            ratio = budget / tokens
+            compacted = compacted[:int(len(compacted) * ratio * 0.95)].rsplit("\n", 1)[0]
+            compacted += "\n[... truncated to fit token budget ...]"
+            tokens = self.count(compacted)
+
+        logger.info(f"Compacted {task} input from {original} to {tokens} tokens (budget {budget})")
+        self._record(self.saved_tokens, task, original - tokens)
+        return compacted
+
+    def report(self):
+        return {
+            "prompt_tokens": dict(self.prompt_tokens),
+            "saved_tokens": dict(self.saved_tokens),
+            "total_prompt_tokens": sum(self.prompt_tokens.values()),
+            "total_saved_tokens": sum(self.saved_tokens.values()),
+        }
@@ -0,0 +1,156 @@
+import base64
+import logging
+import time
+from urllib.parse import urlsplit, urlunsplit, unquote_plus
+
+from services.link_cache import REDIRECT_HOSTS
+from services.sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only identify the campaign / click, never the article
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "_ga", "_gl",
+    "cmpid", "ocid", "icid", "ito", "smid", "sr_share", "ref_src", "ref_url", "taid", "ncid",
+    "soc_src", "soc_trk", "guccounter", "guce_referrer", "guce_referrer_sig", "mbid", "ftag",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_")
+
+# Google News appends these to article redirects (e.g. ?oc=5); they don't change the target
+REDIRECT_PARAMS = {"oc", "hl", "gl", "ceid"}
+
+def canonicalize(url):
+    """
+    Normalizes url for comparison: lowercase scheme and host, no default port,
+    no fragment, and no tracking parameters. The remaining parameters are kept
+    byte for byte. This is a dedup/cache key; mail the URL it came from.
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return url
+
+    host = parts.hostname
+    netloc = host if parts.port in (None, 80, 443) else f"{host}:{parts.port}"
+    drop = REDIRECT_PARAMS if host in REDIRECT_HOSTS else ()
+    query = []
+    for param in parts.query.split("&"):
+        key = unquote_plus(param.split("=", 1)[0])
+        if param and key not in drop and key.lower() not in TRACKING_PARAMS \
+                and not key.lower().startswith(TRACKING_PREFIXES):
+            query.append(param)
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path or "/", "&".join(query), ""))
+
+def _varint(data, pos):
+    value = shift = 0
+    while pos < len(data):
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+    raise ValueError("truncated varint")
+
+def decode_google_news_url(url):
+    """
+    Returns the publisher URL embedded in a Google News article link, or None.
+
+    Older article ids ("CBMi...") are base64 protobuf messages that carry the
+    target URL in field 4; newer opaque ids can only be resolved over the network.
+    """
+    parts = urlsplit(url)
+    if parts.hostname not in REDIRECT_HOSTS or "/articles/" not in parts.path:
+        return None
+    article_id = parts.path.rsplit("/", 1)[-1]
+    try:
+        data = base64.urlsafe_b64decode(article_id + "=" * (-len(article_id) % 4))
+        pos = 0
+        if data[pos:pos + 1] == b"\x08":
+            _, pos = _varint(data, pos + 1)
+        if data[pos:pos + 1] != b"\x22":
+            return None
+        length, pos = _varint(data, pos + 1)
+        target = data[pos:pos + length].decode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return target if target.startswith(("http://", "https://")) else None
+
+class URLResolver(SQLiteStore):
+    """
+    Maps article links to publisher URLs.
+
+    Links on redirector hosts (news.google.com) are resolved from the article id
+    when possible, otherwise from redirects seen while validating links
+    (remember()); mappings are cached on disk (keyed by the canonical link) so
+    each redirect is followed once. Other links are returned unchanged.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS redirects (
+            url TEXT PRIMARY KEY,
+            target TEXT NOT NULL,
+            resolved_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path, ttl=90 * 24 * 3600):
+        self.ttl = ttl
+
+        self.hits = 0
+        self.decoded = 0
+        self.learned = 0
+        self.unresolved = 0
+
+        super().__init__(path)
+
+    def _store(self, url, target):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO redirects (url, target, resolved_at) VALUES (?, ?, ?)",
+                (url, target, time.time())
+            )
+            self._conn.commit()
+
+    def resolve(self, url):
+        """
+        Returns the publisher URL for url without touching the network. Redirect
+        links that can't be resolved yet come back unchanged.
+        """
+        key = canonicalize(url)
+        if urlsplit(key).hostname not in REDIRECT_HOSTS:
+            return url
+
+        with self._lock:
+            row = self._conn.execute("SELECT target, resolved_at FROM redirects WHERE url = ?", (key,)).fetchone()
+        if row is not None and time.time() - row[1] < self.ttl:
+            self.hits += 1
+            return row[0]
+
+        target = decode_google_news_url(key)
+        if target is not None:
+            self.decoded += 1
+            self._store(key, target)
+            return target
+
+        self.unresolved += 1
+        return url
+
+    def remember(self, url, final_url):
+        """
+        Records where a redirect link ended up (e.g. the final URL of a link check).
+        Returns final_url, or None if url isn't a redirect or didn't leave it.
+        """
+        key = canonicalize(url)
+        if not final_url or urlsplit(key).hostname not in REDIRECT_HOSTS:
+            return None
+        if urlsplit(canonicalize(final_url)).hostname in REDIRECT_HOSTS:
+            return None
+        self.learned += 1
+        self._store(key, final_url)
+        return final_url
+
+    def stats(self):
+        return {"hits": self.hits, "decoded": self.decoded, "learned": self.learned, "unresolved": self.unresolved}
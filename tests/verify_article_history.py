@@ -0,0 +1,73 @@
+import time
+import unittest
+from unittest.mock import patch
+from services.article_history import ArticleHistory
+from services.article_store import Article
+
+def make_article(title, url):
+    return Article(title=title, url=url, source="Wire", date="", content="", section="Ports")
+
+class TestArticleHistory(unittest.TestCase):
+    def setUp(self):
+        self.history = ArticleHistory(":memory:")
+
+    def test_title_key_ignores_source_suffix_and_punctuation(self):
+        self.assertEqual(ArticleHistory.title_key("Port of Mumbai: Congestion Eases - Reuters"),
+                         ArticleHistory.title_key("port of mumbai congestion eases — The Loadstar"))
+        self.assertNotEqual(ArticleHistory.title_key("Congestion eases in Mumbai"),
+                            ArticleHistory.title_key("Congestion spikes in Mumbai"))
+
+    def test_only_mailed_articles_are_remembered(self):
+        self.assertFalse(self.history.was_mailed("http://example.com/1", "Freight rates climb - Reuters"))
+
+        self.history.record_sent("Ann@example.com", [make_article("Freight rates climb - Reuters", "http://example.com/1")])
+
+        self.assertTrue(self.history.was_mailed("http://example.com/1", "Something else"))
+        self.assertTrue(self.history.was_mailed("http://other.com/2", "Freight rates climb - Bloomberg"))
+        self.assertEqual(self.history.stats(), {"articles": 1, "hits": 2})
+
+    def test_sent_to_is_per_recipient(self):
+        articles = [make_article(f"Story {i}", f"http://example.com/{i}") for i in range(3)]
+        self.history.record_sent("ann@example.com", articles[:2])
+
+        urls = [a.url for a in articles]
+        self.assertEqual(self.history.sent_to("ANN@example.com", urls), {urls[0], urls[1]})
+        self.assertEqual(self.history.sent_to("bob@example.com", urls), set())
+
+    def test_entries_expire_after_retention(self):
+        history = ArticleHistory(":memory:", retention=3600)
+        with patch("services.article_history.time.time", return_value=time.time() - 7200):
+            history.record_sent("ann@example.com", [make_article("Old story", "http://example.com/old")])
+
+        self.assertFalse(history.was_mailed("http://example.com/old", "Old story"))
+        self.assertEqual(history.evict(), 2)
+        self.assertEqual(history.stats()["articles"], 0)
+
+    def test_deliver_records_edition_and_skips_recipients_who_have_it(self):
+        import main
+
+        history = ArticleHistory(":memory:")
+        edition = [make_article("Story A", "http://example.com/a"), make_article("Story B", "http://example.com/b")]
+        history.record_sent("ann@example.com", edition)
+        recipients = [{"name": n, "email": f"{n}@example.com", "role": "Ops"} for n in ("ann", "bob")]
+
+        with patch("services.mailer.Mailer") as mailer_cls:
+            mailer_cls.return_value.send_email.return_value = True
+            results = main.deliver(recipients, "<p>Hi [[RECIPIENT_NAME]]</p>", history=history, edition=edition)
+
+        self.assertEqual([r["recipient"]["email"] for r in results], ["bob@example.com"])
+        self.assertEqual(len(history.sent_to("bob@example.com", [a.url for a in edition])), 2)
+
+    def test_edition_articles_matches_links_in_digest(self):
+        import main
+        from services.article_store import ArticleStore
+
+        store = ArticleStore([{"name": "Ports"}])
+        store.add(make_article("In digest", "http://example.com/a?x=1&y=2"))
+        store.add(make_article("Left out", "http://example.com/b"))
+        digest = '<a href="http://example.com/a?x=1&amp;y=2">In digest</a>'
+
+        self.assertEqual([a.title for a in main.edition_articles(store, digest)], ["In digest"])
+
+if __name__ == "__main__":
+    unittest.main()
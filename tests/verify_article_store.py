@@ -0,0 +1,39 @@
+import unittest
+from services.article_store import Article, ArticleStore, section_queries
+
+SECTIONS = [
+    {"name": "Global Macro Radar", "keywords": ["Red Sea shipping", "Freight rates India"]},
+    {"name": "Logistics Tech Lab", "keywords": ["Warehouse Execution Systems", "Drone delivery India"]},
+]
+
+def make_article(title, url, section, content=""):
+    return Article(title=title, url=url, source="Test Wire", date="Mon, 01 Jan 2024", content=content, section=section)
+
+class TestArticleStore(unittest.TestCase):
+    def test_topic_and_keyword_routing(self):
+        store = ArticleStore(SECTIONS)
+        store.add(make_article("Red Sea shipping disruption lifts freight rates", "http://a", "Global Macro Radar"))
+        store.add(make_article("Drone delivery pilots track Red Sea shipping", "http://b", "Logistics Tech Lab"))
+        store.add(make_article("New warehouse robots", "http://c", "Logistics Tech Lab"))
+        store.add(make_article("Duplicate", "http://a", "Logistics Tech Lab"))
+
+        macro = [a.url for a in store.route("GLOBAL MACRO RADAR")]
+        tech = [a.url for a in store.route("LOGISTICS TECH LAB")]
+
+        self.assertEqual(len(store), 3)
+        self.assertEqual(macro, ["http://a", "http://b"])
+        self.assertEqual(tech, ["http://b", "http://c"])
+
+    def test_compact_prompt_drops_redundant_summary(self):
+        article = make_article(
+            "Port congestion eases", "http://a", "Global Macro Radar",
+            content='<a href="http://a">Port congestion eases</a>&nbsp;<font>Test Wire</font>'
+        )
+        self.assertEqual(article.to_prompt(1), "1. Port congestion eases | Test Wire | Mon, 01 Jan 2024\n   URL: http://a")
+
+    def test_section_queries(self):
+        self.assertEqual(section_queries(SECTIONS[0]), ["Red Sea shipping OR Freight rates India"])
+        self.assertEqual(section_queries("Talent"), ["Talent"])
+
+if __name__ == '__main__':
+    unittest.main()
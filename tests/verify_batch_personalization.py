@@ -0,0 +1,94 @@
+import os
+import unittest
+from unittest.mock import patch, MagicMock
+from services.delivery import BatchRunner
+from services.segments import parse_intros
+
+class TestParseIntros(unittest.TestCase):
+    def test_fenced_json_with_prose(self):
+        reply = 'Here you go:\n```json\n{"r1": " <p>Dear [[RECIPIENT_NAME]],</p> ", "r2": "<p>Hi</p>"}\n```'
+        self.assertEqual(parse_intros(reply, ["r1", "r2"]),
+                         {"r1": "<p>Dear [[RECIPIENT_NAME]],</p>", "r2": "<p>Hi</p>"})
+
+    def test_drops_unknown_and_empty_entries(self):
+        self.assertEqual(parse_intros('{"r1": "", "r2": 3, "r9": "x", "r3": "ok"}', ["r1", "r2", "r3"]), {"r3": "ok"})
+
+    def test_invalid_reply(self):
+        self.assertEqual(parse_intros("no json here", ["r1"]), {})
+        self.assertEqual(parse_intros('{"r1": "unterminated}', ["r1"]), {})
+
+class TestBatchRunner(unittest.TestCase):
+    def test_runs_each_batch_once(self):
+        calls = []
+
+        def run_batch(keys):
+            calls.append(list(keys))
+            return [key.upper() for key in keys]
+
+        runner = BatchRunner(["a", "b", "c"], 2, run_batch)
+        self.assertEqual([runner.get(k) for k in ["c", "a", "b"]], ["C", "A", "B"])
+        self.assertIsNone(runner.get("z"))
+        runner.close()
+        self.assertEqual(sorted(calls), [["a", "b"], ["c"]])
+
+class TestBatchedDelivery(unittest.TestCase):
+    def test_one_call_for_all_profiles_and_digest_shared(self):
+        import main
+
+        recipients = [
+            {"name": "Ann", "email": "ann@example.com", "role": "CEO", "interests": ["ports"], "tone": "formal"},
+            {"name": "Bob", "email": "bob@example.com", "role": "CEO", "interests": ["ports"], "tone": "formal"},
+            {"name": "Cat", "email": "cat@example.com", "role": "Ops", "interests": ["rail"], "tone": "casual"},
+        ]
+        crew = MagicMock()
+        crew.run_batch_personalization.side_effect = lambda profiles, digest: [
+            f"<p>Dear [[RECIPIENT_NAME]], a {p['tone']} note.</p>" for p in profiles
+        ]
+
+        with patch.dict(os.environ, {"PERSONALIZE_BATCH_SIZE": "5"}), \
+             patch("services.mailer.Mailer") as mailer_cls:
+            mailer = mailer_cls.return_value
+            mailer.send_email.return_value = True
+            main.deliver(recipients, "<h2>DIGEST</h2>", crew)
+
+        crew.run_batch_personalization.assert_called_once()
+        crew.run_personalization_phase.assert_not_called()
+        bodies = {c.kwargs["to_email"]: c.kwargs["html_body"] for c in mailer.send_email.call_args_list}
+        self.assertIn("Dear Bob, a formal note.</p>\n<h2>DIGEST</h2>", bodies["bob@example.com"])
+        self.assertIn("Dear Cat, a casual note.", bodies["cat@example.com"])
+
+    def test_missing_intro_falls_back_to_segment_crew(self):
+        import main
+
+        recipients = [{"name": "Ann", "email": "ann@example.com", "role": "CEO", "interests": [], "tone": "formal"}]
+        crew = MagicMock()
+        crew.run_batch_personalization.return_value = [None]
+        crew.run_personalization_phase.return_value = "```html\n<p>Dear [[RECIPIENT_NAME]]</p>\n```"
+
+        with patch.dict(os.environ, {"PERSONALIZE_BATCH_SIZE": "5"}), \
+             patch("services.mailer.Mailer") as mailer_cls:
+            mailer_cls.return_value.send_email.return_value = True
+            main.deliver(recipients, "<h2>DIGEST</h2>", crew)
+
+        crew.run_personalization_phase.assert_called_once()
+        self.assertIn("<p>Dear Ann</p>", mailer_cls.return_value.send_email.call_args.kwargs["html_body"])
+
+    def test_plain_text_digest_and_intro_are_rendered(self):
+        import main
+
+        recipients = [{"name": "Ann", "email": "ann@example.com", "role": "CEO", "interests": [], "tone": "formal"}]
+        crew = MagicMock()
+        crew.run_batch_personalization.return_value = ["```html\n<p>Dear [[RECIPIENT_NAME]],</p>\n```"]
+
+        with patch.dict(os.environ, {"PERSONALIZE_BATCH_SIZE": "5"}), \
+             patch("services.mailer.Mailer") as mailer_cls:
+            mailer_cls.return_value.send_email.return_value = True
+            main.deliver(recipients, "=== PORTS ===\nRates <up> & rising\n- [Story](https://example.com/a?b=1&c=2)", crew)
+
+        body = mailer_cls.return_value.send_email.call_args.kwargs["html_body"]
+        self.assertIn("<p>Dear Ann,</p>\n<h3>PORTS</h3>\n<p>Rates &lt;up&gt; &amp; rising</p>", body)
+        self.assertIn('<li><a href="https://example.com/a?b=1&amp;c=2">Story</a></li>', body)
+        self.assertNotIn("```", body)
+
+if __name__ == "__main__":
+    unittest.main()
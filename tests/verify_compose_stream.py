@@ -0,0 +1,31 @@
+import random
+import unittest
+from services.compose_stream import FenceStripper, strip_fences
+
+COMPOSED = "```html\n<p>Dear [[RECIPIENT_NAME]],</p>\n<h2>Ports</h2>\n<pre>`code`</pre>\n```\n\n"
+
+def chunked(text, rng):
+    cuts = sorted(rng.sample(range(1, len(text)), rng.randint(1, 12)))
+    return [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+
+class TestFenceStripper(unittest.TestCase):
+    def test_matches_one_shot_cleanup_for_any_chunking(self):
+        expected = COMPOSED.replace('```html', '').replace('```', '').strip()
+        rng = random.Random(7)
+        for _ in range(500):
+            self.assertEqual("".join(strip_fences(chunked(COMPOSED, rng))), expected)
+
+    def test_emits_text_before_the_stream_ends(self):
+        stripper = FenceStripper()
+        self.assertEqual(stripper.feed("``"), "")
+        self.assertEqual(stripper.feed("`html\n<p>Dear"), "<p>Dear")
+        # Trailing whitespace waits for the next chunk, a lone fence start for more text
+        self.assertEqual(stripper.feed(" Ravi,</p>\n`"), " Ravi,</p>")
+        self.assertEqual(stripper.feed("``\n"), "")
+        self.assertEqual(stripper.finish(), "")
+
+    def test_plain_text_passes_through(self):
+        self.assertEqual(list(strip_fences(["<p>a</p>", " <p>b</p>"])), ["<p>a</p>", " <p>b</p>"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,239 @@
+import sys
+import threading
+import time
+import types
+import unittest
+from unittest.mock import patch, MagicMock
+from benchmarks.fakes import FakeCrew, FakeLLM
+from services.llm_scheduler import LLMScheduler
+from services.metrics import reset_metrics
+from services.news_fetcher import NewsFetcher
+
+PROFILE = {"name": "[[RECIPIENT_NAME]]", "role": "CEO", "interests": ["ports"], "tone": "formal"}
+
+class RateLimitError(Exception):
+    pass
+
+class _Record:
+    # Stand-in for crewai.Agent / crewai.Task: keeps whatever it is given
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+class StubLLM:
+    """
+    Stand-in for crewai.LLM. call() answers from replies (model -> text or exception).
+    """
+    replies = {}
+
+    def __init__(self, model=None, api_key=None, base_url=None, **kwargs):
+        if not model:
+            raise ValueError("Model must be a non-empty string")
+        self.model = model
+        self.api_key = api_key
+        self.base_url = base_url
+
+    def call(self, messages, *args, **kwargs):
+        reply = self.replies[self.model]
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+def chunk(text):
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=text))])
+
+crewai = types.ModuleType("crewai")
+crewai.Agent = _Record
+crewai.Task = _Record
+crewai.Crew = FakeCrew
+crewai.Process = types.SimpleNamespace(sequential="sequential")
+crewai.LLM = StubLLM
+litellm = types.ModuleType("litellm")
+
+# crewai / litellm are replaced for this module only; crew.* is imported against the stubs
+modules = patch.dict(sys.modules, {"crewai": crewai, "litellm": litellm})
+
+def setUpModule():
+    global crew_llm, crew_module
+    modules.start()
+    import crew.llm as crew_llm
+    import crew.crew as crew_module
+
+def tearDownModule():
+    modules.stop()
+
+class TestScheduledLLM(unittest.TestCase):
+    def setUp(self):
+        self.settings = {"model": "gemini/gemini-1.5-flash", "api_key": "g-key", "base_url": None}
+        self.provider = "gemini"
+        self.scheduler = LLMScheduler(max_retries=0)
+        self.failover = MagicMock(side_effect=self.switch_to_openai)
+        self.patches = patch.multiple(
+            crew_llm,
+            current_llm_settings=lambda: dict(self.settings),
+            current_provider=lambda: self.provider,
+            failover_llm=self.failover,
+            get_scheduler=lambda: self.scheduler
+        )
+        self.patches.start()
+        self.addCleanup(self.patches.stop)
+
+    def switch_to_openai(self, error=None, failed=None):
+        self.settings = {"model": "gpt-4o", "api_key": "o-key", "base_url": None}
+        self.provider = "openai"
+        return True
+
+    def test_no_provider_builds_no_llm(self):
+        self.settings["model"] = None
+        self.assertIsNone(crew_llm.scheduled_llm())
+
+    def test_call_fails_over_to_next_provider(self):
+        StubLLM.replies = {"gemini/gemini-1.5-flash": RateLimitError("quota"), "gpt-4o": "<p>ok</p>"}
+        llm = crew_llm.scheduled_llm()
+
+        self.assertEqual(llm.call([{"role": "user", "content": "Summarize the ports news"}]), "<p>ok</p>")
+        self.assertEqual(self.failover.call_args.kwargs["failed"], "gemini")
+        self.assertEqual((llm.model, llm.api_key), ("gpt-4o", "o-key"))
+        stats = self.scheduler.stats()
+        self.assertEqual(stats["gemini/gemini/gemini-1.5-flash"]["errors"], 1)
+        self.assertGreater(stats["openai/gpt-4o"]["tokens_in"], 0)
+
+    def test_call_raises_when_no_provider_is_left(self):
+        StubLLM.replies = {"gemini/gemini-1.5-flash": RateLimitError("quota")}
+        self.failover.side_effect = None
+        self.failover.return_value = False
+        with self.assertRaises(RateLimitError):
+            crew_llm.scheduled_llm().call("hi")
+
+    def test_stream_fails_over_and_charges_completion(self):
+        def completion(model, messages, stream, **kwargs):
+            if model.startswith("gemini/"):
+                raise RateLimitError("quota")
+            return iter([chunk("<p>Hel"), chunk(None), chunk("lo</p>")])
+
+        llm = crew_llm.scheduled_llm()
+        with patch.object(litellm, "completion", completion, create=True):
+            self.assertEqual("".join(llm.stream([{"role": "user", "content": "hi"}])), "<p>Hello</p>")
+
+        self.assertEqual(self.failover.call_args.kwargs["failed"], "gemini")
+        self.assertGreater(self.scheduler.stats()["openai/gpt-4o"]["tokens_out"], 0)
+
+DESKS = ["GLOBAL MACRO RADAR", "LOGISTICS TECH LAB", "GOVERNMENT & POLICY", "GLOBAL BEST PRACTICES",
+         "THE LOGISTICS TALENT BENCH"]
+
+class TrackingCrew(FakeCrew):
+    """
+    FakeCrew that records how many crews run at once and what the editor was given.
+    The first desk is the slowest, so desks finish out of order.
+    """
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+    editor_input = None
+    failing_desk = None
+
+    def kickoff(self):
+        description = self.tasks[-1].description
+        desk = next((name for name in DESKS if f"=== RAW NEWS: {name} ===" in description), None)
+        with self.lock:
+            TrackingCrew.active += 1
+            TrackingCrew.peak = max(TrackingCrew.peak, TrackingCrew.active)
+        try:
+            if desk is None:
+                TrackingCrew.editor_input = description
+            else:
+                time.sleep(0.15 if desk == DESKS[0] else 0.05)
+                if desk == self.failing_desk:
+                    raise RateLimitError("quota")
+            return super().kickoff()
+        finally:
+            with self.lock:
+                TrackingCrew.active -= 1
+
+class MessageCrew(FakeCrew):
+    """
+    Calls each agent's LLM with messages shaped like crewai's: a system prompt, the
+    task, and the previous task's output as context.
+    """
+    sent = []
+
+    def kickoff(self):
+        output = ""
+        for agent, task in zip(self.agents, self.tasks):
+            messages = [
+                {"role": "system", "content": f"You are {agent.role}. {agent.backstory}\nYour personal goal is: {agent.goal}"},
+                {"role": "user", "content": f"{task.description}\n\nThis is the context you're working with:\n{output}"},
+            ]
+            self.sent.append(messages)
+            output = agent.llm.call(messages)
+        return output
+
+class TestNewsCuratorCrew(unittest.TestCase):
+    def setUp(self):
+        FakeCrew.llm = FakeLLM(latency=0)
+        TrackingCrew.active = TrackingCrew.peak = 0
+        TrackingCrew.editor_input = TrackingCrew.failing_desk = None
+        self.store = MagicMock()
+        self.store.render_section.side_effect = lambda name: f"1. {name} story | Wire"
+
+    def research(self, desk_concurrency):
+        settings = {"model": "gpt-4o", "api_key": "o-key", "base_url": None}
+        with patch.object(crew_llm, "current_llm_settings", return_value=settings):
+            news_crew = crew_module.NewsCuratorCrew(desk_concurrency=desk_concurrency, use_cache=False)
+        with patch.object(crew_module, "Crew", TrackingCrew), \
+             patch.object(NewsFetcher, "build_article_store", return_value=self.store), \
+             patch.object(crew_module.NewsCuratorCrew, "_gnews_fallback", return_value="<h3>OFFLINE</h3>") as fallback:
+            return news_crew.run_research_phase(["ports"]), fallback
+
+    def test_desks_overlap_and_are_joined_in_order(self):
+        (digest, fallback), _ = self.research(desk_concurrency=2)
+
+        self.assertFalse(fallback)
+        self.assertEqual(TrackingCrew.peak, 2)
+        # The editor gets every desk report, in desk order, whichever finished first
+        positions = [TrackingCrew.editor_input.index(f"=== {name} ===") for name in DESKS]
+        self.assertEqual(positions, sorted(positions))
+        self.assertIn("<h2>GLOBAL MACRO RADAR</h2>", digest)
+
+    def test_all_desks_run_at_once_within_the_limit(self):
+        self.research(desk_concurrency=5)
+        self.assertEqual(TrackingCrew.peak, 5)
+
+    def test_failing_desk_falls_back(self):
+        TrackingCrew.failing_desk = "GOVERNMENT & POLICY"
+        result, fallback = self.research(desk_concurrency=5)
+
+        self.assertEqual(result, ("<h3>OFFLINE</h3>", True))
+        self.assertIsNone(TrackingCrew.editor_input)
+        self.assertIs(fallback.call_args[0][1], self.store)
+
+    def test_no_provider_falls_back_without_crews(self):
+        with patch.object(crew_llm, "current_llm_settings", return_value={"model": None, "api_key": None, "base_url": None}):
+            news_crew = crew_module.NewsCuratorCrew(use_cache=False)
+        self.assertIsNone(news_crew.llm)
+
+        with patch.object(NewsFetcher, "build_article_store", return_value=MagicMock()), \
+             patch.object(crew_module.NewsCuratorCrew, "_gnews_fallback", return_value="<h3>OFFLINE</h3>"):
+            self.assertEqual(news_crew.run_research_phase(["ports"]), ("<h3>OFFLINE</h3>", True))
+        self.assertEqual(news_crew.run_personalization_phase(PROFILE, "<h2>DIGEST</h2>"), "<h2>DIGEST</h2>")
+        self.assertEqual(FakeCrew.llm.calls, 0)
+
+    def test_tokens_in_counts_the_messages_sent(self):
+        settings = {"model": "gpt-4o", "api_key": "o-key", "base_url": None}
+        StubLLM.replies = {"gpt-4o": "<p>" + "Freight rates on the Asia-Europe lane rose again. " * 100 + "</p>"}
+        MessageCrew.sent = []
+        metrics = reset_metrics()
+        with patch.multiple(crew_llm, current_llm_settings=lambda: dict(settings),
+                            current_provider=lambda: "openai", get_scheduler=lambda: LLMScheduler(max_retries=0)):
+            news_crew = crew_module.NewsCuratorCrew(use_cache=False)
+            with patch.object(crew_module, "Crew", MessageCrew):
+                news_crew.run_personalization_phase(PROFILE, "<h2>DIGEST</h2>")
+
+        # Both tasks' system prompts and the brief handed to the composer are counted
+        expected = sum(news_crew.budget.count(crew_llm._prompt_text(messages)) for messages in MessageCrew.sent)
+        self.assertEqual(len(MessageCrew.sent), 2)
+        self.assertEqual(metrics.report()["stages"]["llm.personalize"]["tokens_in"], expected)
+        self.assertEqual(news_crew.budget.report()["prompt_tokens"]["personalize"], expected)
+        self.assertGreater(news_crew.budget.count(MessageCrew.sent[1][1]["content"]), 500)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,37 @@
+import os
 import unittest
+import difflib
+import random
+import time
+import feedparser
 from services.news_fetcher import NewsFetcher
+from services.link_cache import LinkCache
+from services.article_history import ArticleHistory
+from services.url_resolver import URLResolver
+from services.title_index import TitleIndex
+from services.feed_cache import FeedCache
 from unittest.mock import patch, MagicMock
 
+def make_entry(title, url):
+    return feedparser.FeedParserDict(title=title, link=url, published="Mon, 01 Jan 2024 00:00:00 GMT", summary=title)
+
 class TestNewsFetcher(unittest.TestCase):
     def setUp(self):
         # Reset class level sets before each test
         NewsFetcher._seen_urls = set()
         NewsFetcher._seen_titles = set()
+        NewsFetcher._title_index = TitleIndex(threshold=0.85)
+        NewsFetcher._link_cache = LinkCache(":memory:")
+        NewsFetcher._feed_cache = FeedCache(":memory:")
+        NewsFetcher._article_history = ArticleHistory(":memory:")
+        NewsFetcher._url_resolver = URLResolver(":memory:")
         self.fetcher = NewsFetcher()
 
+        # These tests cover the buffered download + feedparser path
+        env = patch.dict(os.environ, {"FEED_STREAMING": "false"})
+        env.start()
+        self.addCleanup(env.stop)
+
     def test_exact_deduplication(self):
         url = "http://example.com/1"
         title = "Test Article 1"
@@ -36,6 +59,48 @@ class TestNewsFetcher(unittest.TestCase):
         title3 = "Tech Industry Booms in India"
         self.assertFalse(self.fetcher._is_duplicate(title3, "http://example.com/tech1"))
 
+    def test_articles_mailed_in_previous_runs_are_duplicates(self):
+        from services.article_store import Article
+        mailed = Article(title="Freight rates climb - Reuters", url="http://example.com/old", source="Reuters",
+                         date="", content="", section="Ports")
+        NewsFetcher._article_history.record_sent("ann@example.com", [mailed])
+
+        # Fresh process state: only the persistent history knows the story
+        self.assertTrue(self.fetcher._is_duplicate("Freight rates climb - Bloomberg", "http://example.com/new"))
+        self.assertTrue(self.fetcher._is_duplicate("Unrelated", "http://example.com/old"))
+        self.assertFalse(self.fetcher._is_duplicate("Port congestion eases", "http://example.com/other"))
+
+    def test_title_index_matches_difflib_scan(self):
+        rng = random.Random(7)
+        words = ["port", "trade", "india", "freight", "rail", "red", "sea", "tariffs", "drone", "ai", "customs", "gap"]
+        index = TitleIndex(threshold=0.85)
+        seen = []
+        for _ in range(300):
+            if seen and rng.random() < 0.4:
+                # Inserted, deleted and replaced characters
+                title = list(rng.choice(seen))
+                for _ in range(rng.randint(0, 4)):
+                    position = rng.randrange(len(title) + 1)
+                    edit = rng.random()
+                    if edit < 0.5 or position == len(title):
+                        title.insert(position, rng.choice("abc !"))
+                    elif edit < 0.75:
+                        del title[position]
+                    else:
+                        title[position] = rng.choice("abc !")
+                title = "".join(title)
+            else:
+                title = " ".join(rng.choice(words) for _ in range(rng.randint(1, 8))).title()
+                if rng.random() < 0.5:
+                    # Shared source suffixes line up unrelated headlines of similar length
+                    title += rng.choice([" - Reuters", " - The Economic Times", " - Mint"])
+
+            expected = any(difflib.SequenceMatcher(None, title.lower(), s.lower()).ratio() > 0.85 for s in seen)
+            self.assertEqual(index.find_similar(title) is not None, expected, title)
+            if not expected:
+                seen.append(title)
+                index.add(title)
+
     @patch('requests.head')
     @patch('requests.get')
     def test_link_validation(self, mock_get, mock_head):
@@ -52,5 +117,78 @@ class TestNewsFetcher(unittest.TestCase):
         mock_head.return_value.status_code = 404
         self.assertFalse(self.fetcher._is_link_valid("http://bad-link.com"))
 
+    @patch('requests.head')
+    def test_link_cache(self, mock_head):
+        mock_head.return_value.status_code = 200
+        self.assertTrue(self.fetcher._is_link_valid("http://cached-link.com"))
+        self.assertTrue(self.fetcher._is_link_valid("http://cached-link.com"))
+        self.assertEqual(mock_head.call_count, 1)
+        self.assertEqual(NewsFetcher.link_cache_stats()["hits"], 1)
+
+        # Repeated failures mark the domain as dead; further URLs skip the network
+        mock_head.return_value.status_code = 404
+        for i in range(3):
+            self.assertFalse(self.fetcher._is_link_valid(f"http://dead-site.com/{i}"))
+        mock_head.reset_mock()
+        self.assertFalse(self.fetcher._is_link_valid("http://dead-site.com/new"))
+        mock_head.assert_not_called()
+
+    @patch.object(NewsFetcher, '_download_feed', return_value=(200, b"", {}))
+    @patch('feedparser.parse')
+    def test_batch_validation_keeps_feed_order(self, mock_parse, mock_download):
+        mock_parse.return_value = feedparser.FeedParserDict(entries=[
+            make_entry("Port congestion eases in Mumbai", "http://example.com/a"),
+            make_entry("Dead link story", "http://dead.example.com/b"),
+            make_entry("Port congestion eases in Mumbai!", "http://example.com/c"),
+            make_entry("New rail corridor opens", "http://example.com/d"),
+        ])
+        valid = lambda url, session=None: "dead" not in url
+
+        with patch.object(NewsFetcher, '_is_link_valid', side_effect=valid) as mock_valid:
+            articles = self.fetcher.fetch_news("ports")
+
+        # Every candidate is checked in one batch; dedup still decides what is kept
+        self.assertEqual(mock_valid.call_count, 4)
+        self.assertEqual([a["url"] for a in articles], ["http://example.com/a", "http://example.com/d"])
+
+    @patch('feedparser.parse')
+    def test_fetch_many_dedups_in_topic_order(self, mock_parse):
+        feeds = {
+            b"slow": feedparser.FeedParserDict(entries=[make_entry("Shared headline about freight", "http://example.com/shared")]),
+            b"fast": feedparser.FeedParserDict(entries=[make_entry("Shared headline about freight", "http://example.com/shared")]),
+        }
+        mock_parse.side_effect = lambda body, response_headers=None: feeds[body]
+
+        def download(rss_url, headers=None):
+            # The second topic finishes first; the first topic must still win the dedup
+            if "first" in rss_url:
+                time.sleep(0.05)
+                return 200, b"slow", {}
+            return 200, b"fast", {}
+
+        with patch.object(NewsFetcher, '_download_feed', side_effect=download), \
+             patch.object(NewsFetcher, '_is_link_valid', return_value=True):
+            results = self.fetcher.fetch_news_many(["first", "second"])
+
+        self.assertEqual(list(results), ["first", "second"])
+        self.assertEqual(len(results["first"]), 1)
+        self.assertEqual(results["second"], [])
+
+    @patch('feedparser.parse')
+    def test_conditional_get_reuses_cached_feed(self, mock_parse):
+        mock_parse.return_value = feedparser.FeedParserDict(entries=[make_entry("Suez traffic recovers", "http://example.com/suez")])
+        rss_url = self.fetcher._rss_url("suez")
+
+        with patch.object(NewsFetcher, '_download_feed', return_value=(200, b"<rss/>", {"ETag": '"v1"'})):
+            self.fetcher._load_feed(rss_url)
+
+        with patch.object(NewsFetcher, '_download_feed', return_value=(304, None, {})) as mock_download:
+            feed = self.fetcher._load_feed(rss_url)
+
+        # Second request is conditional and the 304 skips parsing entirely
+        self.assertEqual(mock_download.call_args[0][1]["If-None-Match"], '"v1"')
+        self.assertEqual(mock_parse.call_count, 1)
+        self.assertEqual(feed.entries[0].title, "Suez traffic recovers")
+
 if __name__ == '__main__':
     unittest.main()
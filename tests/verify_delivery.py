@@ -0,0 +1,84 @@
+import threading
+import time
+import unittest
+from services.delivery import DeliveryPipeline
+from services.segments import segment_key, segment_profile, apply_recipient, NAME_PLACEHOLDER
+
+class TestDeliveryPipeline(unittest.TestCase):
+    def test_stage_limits_and_ordered_results(self):
+        active = {"personalize": 0}
+        peak = {"personalize": 0}
+        lock = threading.Lock()
+
+        def personalize(recipient):
+            with lock:
+                active["personalize"] += 1
+                peak["personalize"] = max(peak["personalize"], active["personalize"])
+            # Later recipients finish first
+            time.sleep(0.05 / recipient["n"])
+            with lock:
+                active["personalize"] -= 1
+            return f"Hello {recipient['name']}"
+
+        def render(recipient, content):
+            if recipient["n"] == 3:
+                raise ValueError("template error")
+            return f"<p>{content}</p>"
+
+        def send(recipient, html):
+            return True
+
+        recipients = [{"n": n, "name": f"R{n}", "email": f"r{n}@example.com"} for n in range(1, 7)]
+        pipeline = DeliveryPipeline(personalize, render, send, personalize_limit=2, render_limit=1, send_limit=1)
+        results = pipeline.run(recipients)
+
+        self.assertLessEqual(peak["personalize"], 2)
+        self.assertEqual([r["recipient"]["n"] for r in results], [1, 2, 3, 4, 5, 6])
+        self.assertEqual([r["sent"] for r in results], [True, True, False, True, True, True])
+        self.assertEqual(results[2]["error"], "template error")
+
+    def test_personalizes_once_per_segment(self):
+        calls = []
+        lock = threading.Lock()
+
+        def personalize(recipient):
+            profile = segment_profile(recipient)
+            with lock:
+                calls.append(profile["role"])
+            time.sleep(0.02)
+            return f"Dear {profile['name']}, notes for {profile['role']}"
+
+        def render(recipient, content):
+            return apply_recipient(content, recipient)
+
+        sent = {}
+        def send(recipient, html):
+            sent[recipient["email"]] = html
+            return True
+
+        recipients = [
+            {"name": "A", "email": "a@example.com", "role": "CXO", "interests": ["Trade"], "tone": "Strategic"},
+            {"name": "B", "email": "b@example.com", "role": "COO", "interests": ["Cost"], "tone": "Operational"},
+            {"name": "C", "email": "c@example.com", "role": "CXO", "interests": ["Trade"], "tone": "Strategic"},
+            {"name": "D", "email": "d@example.com", "role": "CXO", "interests": ["Trade"], "tone": "Strategic"},
+        ]
+        pipeline = DeliveryPipeline(personalize, render, send, segment_key=segment_key)
+        results = pipeline.run(recipients)
+
+        self.assertTrue(all(r["sent"] for r in results))
+        self.assertEqual(sorted(calls), ["COO", "CXO"])
+        self.assertEqual(sent["c@example.com"], "Dear C, notes for CXO")
+        self.assertNotIn(NAME_PLACEHOLDER, sent["d@example.com"])
+
+class TestApplyRecipient(unittest.TestCase):
+    def test_missing_placeholder_warns_once_per_body(self):
+        people = [{"name": n, "email": f"{n}@example.com"} for n in "abc"]
+        with self.assertLogs("services.segments", level="WARNING") as logs:
+            for person in people:
+                apply_recipient("<p>Segment body without a name</p>", person)
+            for person in people:
+                apply_recipient("<p>Master digest</p>", person, expect_placeholder=False)
+        self.assertEqual(len(logs.records), 1)
+
+if __name__ == '__main__':
+    unittest.main()
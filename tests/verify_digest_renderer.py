@@ -0,0 +1,29 @@
+import unittest
+from services.digest_renderer import render_digest, to_html
+
+class TestDigestRenderer(unittest.TestCase):
+    def test_escapes_article_text(self):
+        html = render_digest([
+            ("Macro & Trade", [{
+                "title": "Tariffs <rise>", "url": "http://example.com/?a=1&b=2",
+                "source": "Wire", "date": "Mon", "content": "<b>Rates</b> up 5%"
+            }]),
+            ("Talent", []),
+        ], banner="OFFLINE MODE")
+
+        self.assertIn("<h4>Macro &amp; Trade</h4>", html)
+        self.assertIn("Tariffs &lt;rise&gt;", html)
+        self.assertIn('href="http://example.com/?a=1&amp;b=2"', html)
+        self.assertIn("Rates up 5%", html)
+        self.assertIn("No recent news found.", html)
+
+    def test_to_html_renders_plain_text_and_keeps_html(self):
+        self.assertEqual(to_html("```html\n<h2>Ports</h2>\n```"), "<h2>Ports</h2>")
+        self.assertEqual(
+            to_html("## Ports & **rail**\nRates up\nsee https://example.com/x\n\n- one\n- two"),
+            '<h3>Ports &amp; <strong>rail</strong></h3>\n<p>Rates up<br>\nsee <a href="https://example.com/x">https://example.com/x</a></p>\n'
+            '<ul>\n<li>one</li>\n<li>two</li>\n</ul>'
+        )
+
+if __name__ == '__main__':
+    unittest.main()
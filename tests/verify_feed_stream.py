@@ -0,0 +1,171 @@
+import hashlib
+import os
+import unittest
+from email.utils import format_datetime
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+import feedparser
+from services.article_store import plain_text
+from services import feed_stream
+from services.feed_stream import FeedStream
+from services.feed_cache import FeedCache
+from services.link_cache import LinkCache
+from services.article_history import ArticleHistory
+from services.url_resolver import URLResolver
+from services.news_fetcher import NewsFetcher
+from services.title_index import TitleIndex
+
+def make_rss(count, start=0, age_hours=1):
+    published = format_datetime((datetime.now() - timedelta(hours=age_hours)).astimezone())
+    items = "".join(
+        f"<item><title>{hashlib.sha1(str(i).encode()).hexdigest()} freight &amp; ports - Source {i}</title>"
+        f"<link>http://example.com/{i}</link><guid>{i}</guid><pubDate>{published}</pubDate>"
+        f"<description>&lt;a href='http://example.com/{i}'&gt;Story {i}&lt;/a&gt;</description>"
+        f"<source url='http://source{i}.example.com'>Source {i}</source></item>"
+        for i in range(start, start + count)
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>t</title>{items}</channel></rss>'.encode()
+
+def chunked(body, size=256, counter=None):
+    for i in range(0, len(body), size):
+        if counter is not None:
+            counter["chunks"] += 1
+        yield body[i:i + size]
+
+class TestFeedStream(unittest.TestCase):
+    def test_matches_feedparser(self):
+        body = make_rss(5)
+        streamed = list(FeedStream(chunked(body, size=37)))
+        parsed = feedparser.parse(body).entries
+
+        self.assertEqual(len(streamed), 5)
+        for ours, theirs in zip(streamed, parsed):
+            self.assertEqual(ours.title, theirs.title)
+            self.assertEqual(ours.link, theirs.link)
+            self.assertEqual(ours.published, theirs.published)
+            self.assertEqual(tuple(ours.published_parsed), tuple(theirs.published_parsed))
+            self.assertEqual(ours.source.title, theirs.source.title)
+            self.assertEqual(plain_text(ours.summary), plain_text(theirs.summary))
+
+    def test_stops_reading_when_closed(self):
+        counter = {"chunks": 0}
+        closed = []
+        body = make_rss(500)
+        stream = FeedStream(chunked(body, counter=counter), on_close=lambda: closed.append(True))
+        for i, entry in enumerate(stream):
+            if i == 2:
+                break
+        stream.close()
+
+        self.assertEqual(closed, [True])
+        self.assertFalse(stream.complete)
+        self.assertLess(counter["chunks"], len(body) // 256 // 10)
+
+    def test_parse_error_keeps_entries_read_so_far(self):
+        body = make_rss(3).replace(b"</channel>", b"<broken></channel>")
+        stream = FeedStream(chunked(body))
+        entries = list(stream)
+        self.assertEqual(len(entries), 3)
+        self.assertFalse(stream.complete)
+
+class TestStreamingFetch(unittest.TestCase):
+    def setUp(self):
+        NewsFetcher._seen_urls = set()
+        NewsFetcher._seen_titles = set()
+        NewsFetcher._title_index = TitleIndex(threshold=0.85)
+        NewsFetcher._link_cache = LinkCache(":memory:")
+        NewsFetcher._feed_cache = FeedCache(":memory:")
+        NewsFetcher._article_history = ArticleHistory(":memory:")
+        NewsFetcher._url_resolver = URLResolver(":memory:")
+        NewsFetcher._feed_session = MagicMock()
+        self.addCleanup(setattr, NewsFetcher, "_feed_session", None)
+        self.fetcher = NewsFetcher()
+
+    def response(self, body, counter, status=200, headers=None):
+        response = MagicMock(status_code=status, headers=headers or {})
+        response.iter_content.side_effect = lambda chunk_size: chunked(body, size=512, counter=counter)
+        return response
+
+    def test_fetch_stops_at_quota(self):
+        counter = {"chunks": 0}
+        body = make_rss(400)
+        response = self.response(body, counter)
+        NewsFetcher._feed_session.get.return_value = response
+        NewsFetcher._feed_cache = None
+
+        with patch.dict(os.environ, {"FEED_CACHE_PATH": ""}), \
+             patch.object(NewsFetcher, '_is_link_valid', return_value=True):
+            articles = self.fetcher.fetch_news_many(["ports"])["ports"]
+
+        self.assertEqual([a["url"] for a in articles], [f"http://example.com/{i}" for i in range(10)])
+        self.assertEqual(articles[0]["source"], "Source 0")
+        response.close.assert_called()
+        # Without a feed cache only the head of the feed is read
+        self.assertLess(counter["chunks"], len(body) // 512 // 4)
+
+    def test_feed_stopped_at_quota_is_cached_unparsed_and_revalidated(self):
+        rss_url = self.fetcher._rss_url("ports")
+        body = make_rss(100)
+        NewsFetcher._feed_session.get.return_value = self.response(body, {"chunks": 0}, headers={"ETag": '"v1"'})
+        with patch('services.feed_stream._entry', wraps=feed_stream._entry) as parsed, \
+             patch.object(NewsFetcher, '_is_link_valid', return_value=True):
+            articles = self.fetcher.fetch_news_many(["ports"])["ports"]
+
+        self.assertEqual(len(articles), 10)
+        # The rest of the body is stored as read, not parsed
+        self.assertLess(parsed.call_count, 25)
+        self.assertEqual(NewsFetcher._feed_cache.get(rss_url)["body"], body)
+
+        NewsFetcher._feed_session.get.return_value = self.response(b"", {"chunks": 0}, status=304)
+        with patch('services.feed_stream._entry', wraps=feed_stream._entry) as parsed, \
+             patch.object(NewsFetcher, '_is_link_valid', return_value=True):
+            articles = self.fetcher.fetch_news_many(["ports"])["ports"]
+
+        self.assertEqual(NewsFetcher._feed_session.get.call_args.kwargs["headers"]["If-None-Match"], '"v1"')
+        # The stored body is replayed as a stream, past the entries already taken
+        self.assertEqual(articles[0]["url"], "http://example.com/10")
+        self.assertLess(parsed.call_count, 50)
+
+    def test_unparseable_stream_falls_back_to_the_same_body(self):
+        body = make_rss(3).replace(b"freight &amp; ports", b"freight&nbsp;ports")
+        NewsFetcher._feed_session.get.return_value = self.response(body, {"chunks": 0})
+
+        with patch.object(NewsFetcher, '_is_link_valid', return_value=True):
+            articles = self.fetcher.fetch_news("ports")
+
+        self.assertEqual(len(articles), 3)
+        self.assertEqual(NewsFetcher._feed_session.get.call_count, 1)
+        self.assertEqual(len(NewsFetcher._feed_cache.get(self.fetcher._rss_url("ports"))["feed"].entries), 3)
+
+    def test_stale_and_duplicate_entries_filtered_inline(self):
+        NewsFetcher._seen_urls.add("http://example.com/1")
+        body = make_rss(2, age_hours=100)[:-len(b"</channel></rss>")] + make_rss(3, start=0)[make_rss(3).index(b"<item>"):]
+        NewsFetcher._feed_session.get.return_value = self.response(body, {"chunks": 0})
+
+        with patch.object(NewsFetcher, '_is_link_valid', return_value=True) as mock_valid:
+            articles = self.fetcher.fetch_news("ports")
+
+        self.assertEqual([a["url"] for a in articles], ["http://example.com/0", "http://example.com/2"])
+        # Stale and already-seen entries never reach link validation
+        self.assertEqual(mock_valid.call_count, 2)
+
+    def test_complete_stream_is_cached_and_revalidated(self):
+        rss_url = self.fetcher._rss_url("narrow")
+        body = make_rss(3)
+        NewsFetcher._feed_session.get.return_value = self.response(body, {"chunks": 0}, headers={"ETag": '"v1"'})
+        with patch.object(NewsFetcher, '_is_link_valid', return_value=True):
+            self.fetcher.fetch_news("narrow")
+        self.assertEqual(NewsFetcher._feed_cache.get(rss_url)["body"], body)
+
+        NewsFetcher._seen_urls = set()
+        NewsFetcher._seen_titles = set()
+        NewsFetcher._title_index = TitleIndex(threshold=0.85)
+        NewsFetcher._feed_session.get.return_value = self.response(b"", {"chunks": 0}, status=304)
+        with patch.object(NewsFetcher, '_is_link_valid', return_value=True):
+            articles = self.fetcher.fetch_news("narrow")
+
+        self.assertEqual(NewsFetcher._feed_session.get.call_args.kwargs["headers"]["If-None-Match"], '"v1"')
+        self.assertEqual(len(articles), 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from unittest.mock import patch
+from services.llm_cache import LLMCache
+
+class TestLLMCache(unittest.TestCase):
+    def test_replays_identical_prompts_only(self):
+        cache = LLMCache(":memory:")
+        key = LLMCache.make_key("gpt-4o", "Analyze macro news", "raw news A")
+        cache.put(key, "MACRO BRIEF", model="gpt-4o")
+
+        self.assertEqual(cache.get(LLMCache.make_key("gpt-4o", "Analyze macro news", "raw news A")), "MACRO BRIEF")
+        self.assertIsNone(cache.get(LLMCache.make_key("gpt-4o", "Analyze macro news", "raw news B")))
+        self.assertIsNone(cache.get(LLMCache.make_key("gemini/gemini-1.5-flash", "Analyze macro news", "raw news A")))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2})
+
+    def test_ttl_and_size_eviction(self):
+        cache = LLMCache(":memory:", ttl=60, max_entries=2)
+        with patch("time.time", return_value=1000):
+            cache.put("a", "A")
+        with patch("time.time", return_value=1001):
+            cache.put("b", "B")
+        with patch("time.time", return_value=1002):
+            cache.get("a")
+            cache.put("c", "C")
+
+        with patch("time.time", return_value=1003):
+            # "b" was least recently used when the cache overflowed
+            self.assertIsNone(cache.get("b"))
+            self.assertEqual(cache.get("a"), "A")
+        with patch("time.time", return_value=1070):
+            self.assertIsNone(cache.get("c"))
+
+if __name__ == '__main__':
+    unittest.main()
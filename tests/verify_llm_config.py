@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from config.llm_config import ProviderRegistry
+
+KEYS = {"GEMINI_API_KEY": "g-key", "OPENAI_API_KEY": "o-key", "OPENROUTER_API_KEY": "r-key"}
+
+def fake_get(statuses):
+    def get(url, **kwargs):
+        for host, status in statuses.items():
+            if host in url:
+                return MagicMock(status_code=status, text="")
+        raise AssertionError(f"unexpected check: {url}")
+    return get
+
+class RateLimitError(Exception):
+    pass
+
+class TestProviderRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.tmp.name, "llm_health.json")
+        self.env = patch.dict(os.environ, KEYS)
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmp.cleanup()
+
+    @patch('requests.get')
+    def test_skips_failed_check_and_remembers_winner(self, mock_get):
+        mock_get.side_effect = fake_get({"googleapis": 404, "openai.com": 200})
+        self.assertEqual(ProviderRegistry(self.state_path).select(), "openai")
+        self.assertEqual(os.environ["OPENAI_MODEL_NAME"], "gpt-4o")
+
+        # Next run trusts the cached winner without any check
+        mock_get.reset_mock()
+        checked_at = ProviderRegistry(self.state_path).state["last_good_at"]
+        self.assertEqual(ProviderRegistry(self.state_path).select(), "openai")
+        mock_get.assert_not_called()
+
+        # Trusted runs don't renew the window: once it expires, the provider is checked again
+        self.assertEqual(ProviderRegistry(self.state_path).state["last_good_at"], checked_at)
+        with patch('time.time', return_value=checked_at + 3601):
+            self.assertEqual(ProviderRegistry(self.state_path).select(), "openai")
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('requests.get')
+    def test_failover_on_real_failure(self, mock_get):
+        mock_get.side_effect = fake_get({"googleapis": 200, "openai.com": 200})
+        registry = ProviderRegistry(self.state_path)
+        self.assertEqual(registry.select(), "gemini")
+
+        self.assertFalse(registry.failover(ValueError("bad prompt")))
+        self.assertTrue(registry.failover(RateLimitError("429"), failed="gemini"))
+        self.assertEqual(registry.current, "openai")
+
+        # A second thread failing on gemini does not fail over again
+        self.assertTrue(registry.failover(RateLimitError("429"), failed="gemini"))
+        self.assertEqual(registry.current, "openai")
+
+if __name__ == '__main__':
+    unittest.main()
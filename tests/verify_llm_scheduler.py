@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import MagicMock
+from services.llm_scheduler import LLMScheduler, TokenBucket
+
+class RateLimitError(Exception):
+    pass
+
+class AuthenticationError(Exception):
+    pass
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class TestTokenBucket(unittest.TestCase):
+    def test_waits_once_the_minute_is_used_up(self):
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock)
+        self.assertEqual([bucket.reserve(30), bucket.reserve(30)], [0.0, 0.0])
+        # 60 per minute refills one unit per second
+        self.assertAlmostEqual(bucket.reserve(10), 10.0)
+        clock.now += 20
+        self.assertEqual(bucket.reserve(5), 0.0)
+
+    def test_oversized_request_still_goes_through(self):
+        bucket = TokenBucket(100, FakeClock())
+        self.assertAlmostEqual(bucket.reserve(250), 90.0)
+
+    def test_zero_means_unlimited(self):
+        bucket = TokenBucket(0, FakeClock())
+        self.assertEqual(bucket.reserve(10 ** 9), 0.0)
+
+class TestLLMScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def scheduler(self, limits=None, **kwargs):
+        return LLMScheduler(limits or {}, sleep=self.clock.sleep, clock=self.clock, **kwargs)
+
+    def test_requests_per_minute_paces_calls(self):
+        scheduler = self.scheduler({"gemini": {"rpm": 2, "tpm": 0}})
+        for _ in range(3):
+            scheduler.call(lambda: "ok", provider="gemini", model="flash")
+        # Third request waits for a refill (2 per minute = one every 30s)
+        self.assertEqual(self.clock.sleeps, [30.0])
+
+    def test_completion_tokens_count_against_later_calls(self):
+        scheduler = self.scheduler({"openai": {"rpm": 0, "tpm": 600}})
+        scheduler.call(lambda: "x" * 500, provider="openai", model="gpt-4o", tokens_in=100, count_output=len)
+        scheduler.call(lambda: "ok", provider="openai", model="gpt-4o", tokens_in=60)
+        self.assertEqual(self.clock.sleeps, [6.0])
+        stats = scheduler.stats()["openai/gpt-4o"]
+        self.assertEqual((stats["tokens_in"], stats["tokens_out"], stats["calls"]), (160, 500, 2))
+
+    def test_limits_are_per_provider_and_model(self):
+        scheduler = self.scheduler({"gemini": {"rpm": 1, "tpm": 0}})
+        scheduler.call(lambda: "ok", provider="gemini", model="flash")
+        scheduler.call(lambda: "ok", provider="gemini", model="pro")
+        scheduler.call(lambda: "ok", provider="openai", model="gpt-4o")
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_retries_rate_limits_with_backoff(self):
+        scheduler = self.scheduler(base_delay=1.0, max_delay=8.0)
+        error = RateLimitError("429")
+        error.response = MagicMock(headers={"retry-after": "5"})
+        fn = MagicMock(side_effect=[RateLimitError("429"), error, "done"])
+
+        self.assertEqual(scheduler.call(fn, provider="gemini", model="flash"), "done")
+        self.assertEqual(fn.call_count, 3)
+        first, second = self.clock.sleeps
+        self.assertTrue(0 <= first <= 1.0)
+        # Retry-After is honored over a shorter jittered delay
+        self.assertEqual(second, 5.0)
+        self.assertEqual(scheduler.stats()["gemini/flash"]["retries"], 2)
+
+    def test_gives_up_after_max_retries(self):
+        scheduler = self.scheduler(max_retries=2)
+        fn = MagicMock(side_effect=RateLimitError("429"))
+        with self.assertRaises(RateLimitError):
+            scheduler.call(fn, provider="gemini", model="flash")
+        self.assertEqual(fn.call_count, 3)
+
+    def test_non_retryable_errors_raise_immediately(self):
+        scheduler = self.scheduler()
+        fn = MagicMock(side_effect=AuthenticationError("bad key"))
+        with self.assertRaises(AuthenticationError):
+            scheduler.call(fn, provider="openai", model="gpt-4o")
+        self.assertEqual(fn.call_count, 1)
+        self.assertEqual(scheduler.stats()["openai/gpt-4o"]["errors"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
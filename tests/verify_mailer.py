@@ -0,0 +1,61 @@
+import os
+import smtplib
+import unittest
+from unittest.mock import patch, MagicMock
+from services.mailer import Mailer
+
+SMTP_ENV = {"SMTP_HOST": "localhost", "SMTP_PORT": "2525", "SMTP_USERNAME": "bot@example.com", "SMTP_PASSWORD": "secret"}
+
+class TestMailer(unittest.TestCase):
+    def make_batch(self, count):
+        return [
+            {"to_email": f"r{i}@example.com", "subject": "Brief", "html_body": "<p>Hi</p>", "text_body": "Hi"}
+            for i in range(count)
+        ]
+
+    @patch.dict(os.environ, SMTP_ENV)
+    @patch('smtplib.SMTP')
+    def test_batch_reuses_one_connection(self, mock_smtp):
+        mailer = Mailer(pool_size=1)
+        outcomes = mailer.send_batch(self.make_batch(5))
+        mailer.close()
+
+        self.assertTrue(all(o["sent"] for o in outcomes))
+        self.assertEqual(mock_smtp.call_count, 1)
+        self.assertEqual(mock_smtp.return_value.login.call_count, 1)
+        self.assertEqual(mock_smtp.return_value.sendmail.call_count, 5)
+
+    @patch.dict(os.environ, SMTP_ENV)
+    @patch('smtplib.SMTP')
+    def test_recycles_connection_after_message_limit(self, mock_smtp):
+        mailer = Mailer(pool_size=1, max_messages_per_connection=2)
+        mailer.send_batch(self.make_batch(5))
+        self.assertEqual(mock_smtp.call_count, 3)
+
+    @patch.dict(os.environ, SMTP_ENV)
+    @patch('smtplib.SMTP')
+    def test_reconnects_after_server_drop(self, mock_smtp):
+        dropped = MagicMock()
+        dropped.sendmail.side_effect = smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        healthy = MagicMock()
+        mock_smtp.side_effect = [dropped, healthy]
+
+        mailer = Mailer(pool_size=1)
+        self.assertTrue(mailer.send_email("r@example.com", "Brief", "<p>Hi</p>"))
+        self.assertEqual(healthy.sendmail.call_count, 1)
+
+    @patch.dict(os.environ, SMTP_ENV)
+    @patch('smtplib.SMTP')
+    def test_reports_per_message_failures(self, mock_smtp):
+        mock_smtp.return_value.sendmail.side_effect = [
+            None,
+            smtplib.SMTPRecipientsRefused({"r1@example.com": (550, b"No such user")}),
+            None,
+        ]
+        outcomes = Mailer(pool_size=1).send_batch(self.make_batch(3))
+
+        self.assertEqual([o["sent"] for o in outcomes], [True, False, True])
+        self.assertIsNotNone(outcomes[1]["error"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+from services.metrics import RunMetrics, reset_metrics, get_metrics
+
+class TestRunMetrics(unittest.TestCase):
+    def test_stage_counts_calls_and_counters(self):
+        metrics = RunMetrics()
+
+        def work(n):
+            with metrics.stage("fetch.download") as record:
+                record["bytes"] = n
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(work, range(1, 101)))
+        metrics.add("fetch.download", cache_hits=2)
+
+        entry = metrics.report()["stages"]["fetch.download"]
+        self.assertEqual(entry["calls"], 100)
+        self.assertEqual(entry["bytes"], 5050)
+        self.assertEqual(entry["cache_hits"], 2)
+        self.assertGreaterEqual(entry["seconds"], entry["max_seconds"])
+
+    def test_exception_counts_as_error(self):
+        metrics = RunMetrics()
+        with self.assertRaises(ValueError):
+            with metrics.stage("render"):
+                raise ValueError("boom")
+        self.assertEqual(metrics.report()["stages"]["render"]["errors"], 1)
+
+    def test_report_and_table(self):
+        metrics = RunMetrics()
+        with metrics.stage("llm.desk", tokens_in=1200) as record:
+            record["tokens_out"] = 300
+        table = metrics.summary_table()
+        self.assertIn("llm.desk", table)
+        self.assertIn("1200", table)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "report.json")
+            metrics.write(path, run_id="abc")
+            with open(path) as f:
+                report = json.load(f)
+        self.assertEqual(report["run_id"], "abc")
+        self.assertEqual(report["stages"]["llm.desk"]["tokens_out"], 300)
+
+    def test_mailer_records_send_and_reconnect(self):
+        import smtplib
+        from services.mailer import Mailer
+
+        reset_metrics()
+        dropped = MagicMock()
+        dropped.sendmail.side_effect = smtplib.SMTPServerDisconnected("gone")
+        with patch.dict(os.environ, {"SMTP_USERNAME": "u", "SMTP_PASSWORD": "p"}), \
+                patch("smtplib.SMTP", side_effect=[dropped, MagicMock()]):
+            mailer = Mailer(pool_size=1)
+            self.assertTrue(mailer.send_email("a@example.com", "Subject", "<p>Hi</p>"))
+
+        entry = get_metrics().report()["stages"]["smtp.send"]
+        self.assertEqual(entry["calls"], 1)
+        self.assertEqual(entry["retries"], 1)
+        self.assertGreater(entry["bytes"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
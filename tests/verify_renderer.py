@@ -0,0 +1,45 @@
+import os
+import tempfile
+import time
+import unittest
+from services.renderer import EmailRenderer, EmailShell, render_email
+
+class TestEmailRenderer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.template_path = os.path.join(self.tmp.name, "brief.html")
+        with open(self.template_path, "w") as f:
+            f.write("<p>Hello {{ name }}</p>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_compiles_once_and_reloads_on_change(self):
+        renderer = EmailRenderer(self.tmp.name, bytecode_cache_dir=os.path.join(self.tmp.name, "cache"))
+        first = renderer.env.get_template("brief.html")
+        self.assertEqual(renderer.render("brief.html", {"name": "Ravi"}), "<p>Hello Ravi</p>")
+        self.assertIs(renderer.env.get_template("brief.html"), first)
+
+        with open(self.template_path, "w") as f:
+            f.write("<p>Dear {{ name }}</p>")
+        mtime = time.time() + 5
+        os.utime(self.template_path, (mtime, mtime))
+
+        self.assertEqual(renderer.render("brief.html", {"name": "Ravi"}), "<p>Dear Ravi</p>")
+
+    def test_shell_matches_full_render(self):
+        with open(self.template_path, "w") as f:
+            f.write("<html><h1>{{ date }}</h1>{{ body|safe }}<footer>{{ date }}</footer></html>")
+        context = {"date": "18-October"}
+        shell = EmailShell(self.template_path, context)
+        body = "<p>Dear Ravi,</p><p>Brief</p>"
+        self.assertEqual(shell.fill(body), render_email(self.template_path, dict(context, body=body)))
+
+    def test_shell_requires_a_single_body(self):
+        with open(self.template_path, "w") as f:
+            f.write("<p>{{ date }}</p>")
+        with self.assertRaises(ValueError):
+            EmailShell(self.template_path, {"date": "18-October"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from services.article_store import Article, ArticleStore
+from services.run_store import RunStore
+
+class TestRunStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_checkpoints_survive_resume(self):
+        run = RunStore(self.root)
+        store = ArticleStore([{"name": "Macro", "keywords": []}])
+        store.add(Article("Port strike", "https://example.com/a", "Reuters", "Mon", "<p>x</p>", "Macro"))
+        run.save_articles(store)
+        run.write_text(RunStore.desk_name("GLOBAL MACRO RADAR"), "desk output")
+        run.mark_sent({"email": "a@example.com"}, True)
+
+        resumed = RunStore(self.root, run_id=run.run_id, resume=True)
+        articles = resumed.load_articles()
+        self.assertEqual([a.title for a in articles.route("Macro")], ["Port strike"])
+        self.assertEqual(resumed.read_text(RunStore.desk_name("GLOBAL MACRO RADAR")), "desk output")
+        self.assertTrue(resumed.was_sent({"email": "a@example.com"}))
+        self.assertFalse(resumed.was_sent({"email": "b@example.com"}))
+
+    def test_resume_unknown_run(self):
+        with self.assertRaises(FileNotFoundError):
+            RunStore(self.root, run_id="missing", resume=True)
+
+    def test_distinct_names_do_not_collide(self):
+        self.assertNotEqual(RunStore.recipient_name({"email": "a.b@x.com"}), RunStore.recipient_name({"email": "a-b@x.com"}))
+        self.assertNotEqual(RunStore.segment_name(("CEO", ("ports",), "formal")), RunStore.segment_name(("CEO", ("ports",), "casual")))
+
+    def test_deliver_skips_recipients_already_sent(self):
+        import main
+
+        run = RunStore(self.root)
+        recipients = [{"name": n, "email": f"{n}@example.com", "role": "Ops"} for n in ("ann", "bob", "cat")]
+        run.mark_sent(recipients[0], True)
+        digest = "<p>Hi [[RECIPIENT_NAME]]</p>"
+        run.write_text(RunStore.recipient_name(recipients[1], digest), "<html>stored for bob</html>")
+
+        with patch("services.mailer.Mailer") as mailer_cls:
+            mailer = mailer_cls.return_value
+            mailer.send_email.side_effect = lambda to_email, **kwargs: to_email != "cat@example.com"
+            results = main.deliver(recipients, digest, run_store=run)
+
+        sent_to = {call.kwargs["to_email"]: call.kwargs["html_body"] for call in mailer.send_email.call_args_list}
+        self.assertEqual(set(sent_to), {"bob@example.com", "cat@example.com"})
+        self.assertEqual(sent_to["bob@example.com"], "<html>stored for bob</html>")
+        self.assertIn("Hi cat", sent_to["cat@example.com"])
+        self.assertEqual([r["sent"] for r in results], [True, False])
+
+        # A second resume only retries the failed recipient
+        resumed = RunStore(self.root, run_id=run.run_id, resume=True)
+        self.assertEqual([r["email"] for r in recipients if not resumed.was_sent(r)], ["cat@example.com"])
+
+    def test_resume_with_a_new_digest_does_not_mail_old_content(self):
+        import main
+
+        run = RunStore(self.root)
+        recipients = [{"name": "ann", "email": "ann@example.com", "role": "Ops", "interests": ["ports"], "tone": "formal"}]
+        crew = MagicMock()
+        crew.run_personalization_phase.side_effect = lambda profile, digest: f"<p>Dear [[RECIPIENT_NAME]],</p>{digest}!"
+
+        with patch("services.mailer.Mailer") as mailer_cls:
+            mailer_cls.return_value.send_email.return_value = False
+            main.deliver(recipients, "<p>OFFLINE FALLBACK DIGEST</p>", crew, run_store=run)
+
+        resumed = RunStore(self.root, run_id=run.run_id, resume=True)
+        with patch("services.mailer.Mailer") as mailer_cls:
+            mailer = mailer_cls.return_value
+            mailer.send_email.return_value = True
+            main.deliver(recipients, "<p>FRESH LLM DIGEST</p>", crew, run_store=resumed)
+
+        body = mailer.send_email.call_args.kwargs["html_body"]
+        self.assertIn("FRESH LLM DIGEST", body)
+        self.assertNotIn("OFFLINE", body)
+
+if __name__ == "__main__":
+    unittest.main()
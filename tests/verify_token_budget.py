@@ -0,0 +1,49 @@
+import unittest
+from services.token_budget import TokenBudget, strip_html
+
+class TestTokenBudget(unittest.TestCase):
+    def test_strip_html_keeps_links_and_lines(self):
+        text = strip_html("<h4>Macro</h4><ul><li><a href='http://a.com/x'>Port reopens</a> &amp; more</li></ul>")
+        self.assertEqual(text, "Macro\nPort reopens (http://a.com/x) & more")
+
+    def test_fit_compacts_to_budget_and_reports_savings(self):
+        budget = TokenBudget(budgets={"desk": 200})
+        boilerplate = "<p>Nothing critical to report today for this section.</p>"
+        story = "<p>" + "Freight rates on the Asia-Europe lane rose again this week. " * 20 + "</p>"
+        digest = (boilerplate + story + "<a href='http://example.com/story'>Read More</a>") * 5
+
+        compacted = budget.fit("desk", digest)
+
+        self.assertLessEqual(budget.count(compacted), 200)
+        self.assertIn("http://example.com/story", compacted)
+        self.assertNotIn("<p>", compacted)
+        self.assertGreater(budget.report()["total_saved_tokens"], 0)
+
+    def test_fit_never_cuts_digest_content(self):
+        budget = TokenBudget(budgets={"personalize": 150})
+        sections = "".join(
+            f"<h4>Section {i}</h4>\n<p>Story {i}: {'Freight rates on the Asia-Europe lane rose again. ' * 20}</p>\n"
+            f"<a href='http://example.com/{i}'>Read More</a>\n"
+            for i in range(5)
+        )
+
+        with self.assertLogs("services.token_budget", level="WARNING"):
+            compacted = budget.fit("personalize", sections)
+
+        # Summaries are shortened, but every section and all markup survive
+        self.assertLess(budget.count(compacted), budget.count(sections))
+        for i in range(5):
+            self.assertIn(f"<h4>Section {i}</h4>", compacted)
+            self.assertIn(f"http://example.com/{i}", compacted)
+        self.assertEqual(compacted.count("<p>"), 5)
+        self.assertEqual(compacted.count("</p>"), 5)
+        self.assertNotIn("truncated", compacted)
+
+    def test_fit_leaves_small_inputs_alone(self):
+        budget = TokenBudget()
+        self.assertEqual(budget.fit("desk", "<b>short</b>"), "<b>short</b>")
+        budget.measure("desk", "some prompt text")
+        self.assertGreater(budget.report()["prompt_tokens"]["desk"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import base64
+import os
+import unittest
+from unittest.mock import patch
+import feedparser
+from services.article_history import ArticleHistory
+from services.feed_cache import FeedCache
+from services.link_cache import LinkCache
+from services.news_fetcher import NewsFetcher
+from services.title_index import TitleIndex
+from services.url_resolver import URLResolver, canonicalize, decode_google_news_url
+
+def google_link(target=None, token="AU_yqLOpaque"):
+    """
+    Google News article link; with a target, in the older format that embeds it.
+    """
+    if target is not None:
+        data = b"\x08\x13\x22" + bytes([len(target)]) + target.encode() + b"\xd2\x01\x00"
+        token = base64.urlsafe_b64encode(data).decode().rstrip("=")
+    return f"https://news.google.com/rss/articles/{token}?oc=5"
+
+def make_entry(title, url):
+    return feedparser.FeedParserDict(title=title, link=url, published="Mon, 01 Jan 2024 00:00:00 GMT", summary=title)
+
+class TestCanonicalize(unittest.TestCase):
+    def test_strips_tracking_parameters_and_fragment(self):
+        self.assertEqual(
+            canonicalize("HTTPS://WWW.Example.com:443/news/a?id=7&utm_source=rss&utm_medium=feed&fbclid=x#top"),
+            "https://www.example.com/news/a?id=7"
+        )
+
+    def test_keeps_meaningful_parameters(self):
+        self.assertEqual(canonicalize("http://example.com/story?p=2&page=3"), "http://example.com/story?p=2&page=3")
+
+    def test_keeps_parameter_encoding(self):
+        self.assertEqual(canonicalize("http://example.com/s?q=a+b&path=%2Fx&tag=1&utm_source=rss&tag=2"),
+                         "http://example.com/s?q=a+b&path=%2Fx&tag=1&tag=2")
+
+    def test_google_redirect_parameters_only_dropped_on_google(self):
+        self.assertEqual(canonicalize(google_link(token="abc")), "https://news.google.com/rss/articles/abc")
+        self.assertEqual(canonicalize("http://example.com/a?oc=5"), "http://example.com/a?oc=5")
+
+    def test_decodes_old_google_news_ids(self):
+        self.assertEqual(decode_google_news_url(google_link("https://www.example.com/news/123")),
+                         "https://www.example.com/news/123")
+        self.assertIsNone(decode_google_news_url(google_link()))
+        self.assertIsNone(decode_google_news_url("http://example.com/rss/articles/CBMi"))
+
+class TestURLResolver(unittest.TestCase):
+    def setUp(self):
+        self.resolver = URLResolver(":memory:")
+
+    def test_publisher_links_are_unchanged(self):
+        self.assertEqual(self.resolver.resolve("http://example.com/a?utm_campaign=x"), "http://example.com/a?utm_campaign=x")
+        self.assertEqual(self.resolver.stats()["unresolved"], 0)
+
+    def test_redirect_is_remembered(self):
+        link = google_link()
+        self.assertEqual(self.resolver.resolve(link), link)
+
+        target = "https://example.com/story?id=a+b&utm_source=google"
+        self.assertEqual(self.resolver.remember(link, target), target)
+        self.assertEqual(self.resolver.resolve(link.replace("oc=5", "oc=6")), target)
+        self.assertEqual(self.resolver.stats(), {"hits": 1, "decoded": 0, "learned": 1, "unresolved": 1})
+
+    def test_redirect_that_stays_on_google_is_not_remembered(self):
+        link = google_link()
+        self.assertIsNone(self.resolver.remember(link, link))
+        self.assertIsNone(self.resolver.remember("http://example.com/a", "http://example.com/b"))
+
+class TestCanonicalDedup(unittest.TestCase):
+    def setUp(self):
+        NewsFetcher._seen_urls = set()
+        NewsFetcher._seen_titles = set()
+        NewsFetcher._title_index = TitleIndex(threshold=0.85)
+        NewsFetcher._link_cache = LinkCache(":memory:")
+        NewsFetcher._feed_cache = FeedCache(":memory:")
+        NewsFetcher._article_history = ArticleHistory(":memory:")
+        NewsFetcher._url_resolver = URLResolver(":memory:")
+        self.fetcher = NewsFetcher()
+
+        env = patch.dict(os.environ, {"FEED_STREAMING": "false"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_link_check_resolves_redirect_once(self):
+        link = google_link()
+        with patch.object(NewsFetcher, '_check_link', return_value=(True, "https://example.com/story")) as mock_check:
+            self.assertTrue(self.fetcher._is_link_valid(link))
+            # The publisher URL is known and already validated: no further request
+            self.assertEqual(self.fetcher._canonical_url(link), "https://example.com/story")
+            self.assertTrue(self.fetcher._is_link_valid("https://example.com/story"))
+        self.assertEqual(mock_check.call_count, 1)
+
+    @patch.object(NewsFetcher, '_download_feed', return_value=(200, b"", {}))
+    @patch('feedparser.parse')
+    def test_same_story_through_different_links_is_kept_once(self, mock_parse, mock_download):
+        mock_parse.return_value = feedparser.FeedParserDict(entries=[
+            make_entry("Rail freight corridor opens - Reuters", google_link(token="AU_first")),
+            make_entry("Corridor opening delayed again - Mint", google_link("https://example.com/corridor?utm_source=gn")),
+        ])
+        final_urls = {google_link(token="AU_first"): "https://example.com/corridor"}
+
+        def check(url, session=None):
+            return True, final_urls.get(url)
+
+        with patch.object(NewsFetcher, '_check_link', side_effect=check) as mock_check:
+            articles = self.fetcher.fetch_news("rail")
+
+        # Resolved and decoded links both land on the same publisher URL
+        self.assertEqual([a["url"] for a in articles], ["https://example.com/corridor"])
+        self.assertEqual(len(self.fetcher._seen_urls), 1)
+        # The decoded link was validated at the publisher, never through the redirect
+        self.assertNotIn(google_link("https://example.com/corridor?utm_source=gn"),
+                         [c.args[0] for c in mock_check.call_args_list])
+
+        # A GNews result for the same article (with tracking) is a duplicate too
+        self.assertTrue(self.fetcher._is_duplicate("Different headline", "https://example.com/corridor?utm_medium=api"))
+
+    @patch.object(NewsFetcher, '_download_feed', return_value=(200, b"", {}))
+    @patch('feedparser.parse')
+    def test_mailed_url_keeps_its_query(self, mock_parse, mock_download):
+        link = "https://example.com/search?q=rail+freight&path=%2Fnews&utm_source=rss"
+        mock_parse.return_value = feedparser.FeedParserDict(entries=[make_entry("Rail freight search", link)])
+
+        with patch.object(NewsFetcher, '_check_link', return_value=(True, link)):
+            articles = self.fetcher.fetch_news("rail")
+
+        self.assertEqual([a["url"] for a in articles], [link])
+        self.assertTrue(self.fetcher._is_duplicate("Other headline", "https://example.com/search?q=rail+freight&path=%2Fnews"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,5 @@
-import os
 import datetime
-from jinja2 import Environment, FileSystemLoader
-
-def render_email(template_path, context):
-    env = Environment(loader=FileSystemLoader(os.path.dirname(template_path)))
-    template = env.get_template(os.path.basename(template_path))
-    return template.render(context)
+from services.renderer import render_email
 
 def verify():
     template_path = 'email/templates/newsletter.html'